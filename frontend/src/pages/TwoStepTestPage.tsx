@@ -15,149 +15,19 @@ export const TwoStepTestPage: React.FC<TwoStepTestPageProps> = ({ apiKey, addDeb
   const [activeResponseTab, setActiveResponseTab] = useState<ResponseTabType>('planner');
   const [isLoading, setIsLoading] = useState(false);
 
-  // MCP 도구 실행 함수 (공통)
-  const executeMcpTools = async (toolCalls: any[], userPrompt: string, apiKey: string) => {
-    addDebugLog(`🚀 MCP 도구 실행 시작 - ${toolCalls.length}개 도구`);
-    setWorkerResponse("MCP 도구들을 실행하고 있습니다...");
+  // 텍스트를 20ms 간격으로 한 글자씩 표시
+  const streamText = async (text: string, setText: (value: string) => void) => {
+    setText('');
+    let currentText = "";
     
-    try {
-      const mcpResults = [];
-      
-      for (const toolCall of toolCalls) {
-        const toolName = toolCall.tool_name || toolCall.tool || toolCall.function?.name || toolCall.name;
-        const toolArgs = toolCall.parameters || toolCall.function?.arguments || toolCall.arguments;
-        
-        // toolName이 undefined인 경우 처리
-        if (!toolName) {
-          addDebugLog(`❌ MCP 도구 이름이 undefined입니다: ${JSON.stringify(toolCall)}`);
-          continue; // 다음 도구로 건너뛰기
-        }
-        
-        addDebugLog(`🔧 MCP 도구 실행: ${toolName} - ${JSON.stringify(toolArgs)}`);
-        
-        // MCP 표준 도구 이름에서 functions. 접두사 제거
-        const cleanToolName = toolName.replace('functions.', '');
-        addDebugLog(`🔗 MCP 도구 실행: ${toolName} → ${cleanToolName}`);
-        
-        // toolArgs가 undefined인 경우 빈 객체로 처리
-        let safeToolArgs = toolArgs || {};
-        
-        // GitHub 도구인 경우 사용자명과 토큰을 실제 값으로 대체
-        if (cleanToolName === "github_repository_info") {
-          safeToolArgs = {
-            ...safeToolArgs,
-            username: "hli.yohan.lee",
-            password: githubToken
-          };
-          addDebugLog(`🔧 GitHub 도구 - 사용자명: hli.yohan.lee, 토큰: ${githubToken ? '설정됨' : '설정되지 않음'}`);
-        }
-        
-        // MCP 표준 엔드포인트로 도구 실행
-        const mcpResponse = await fetch(`http://localhost:9001/mcp/call`, {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({
-            tool: cleanToolName,
-            arguments: safeToolArgs
-          }),
-        });
-        
-        if (mcpResponse.ok) {
-          const mcpData = await mcpResponse.json();
-          addDebugLog(`✅ MCP 도구 실행 성공: ${toolName}`);
-          addDebugLog(`📊 응답 데이터: ${JSON.stringify(mcpData, null, 2)}`);
-          
-          // MCP 호출 결과를 mcpCalls 상태에 추가
-          const mcpCall: MCPCall = {
-            id: Date.now().toString(),
-            action: cleanToolName,
-            args: safeToolArgs,
-            response: mcpData,
-            timestamp: new Date().toISOString(),
-            status: mcpData.error ? "error" : "success"
-          };
-          setMcpCalls(prev => [mcpCall, ...prev]);
-          
-          mcpResults.push({
-            tool: toolName,
-            args: safeToolArgs,
-            result: mcpData
-          });
-        } else {
-          addDebugLog(`❌ MCP 도구 실행 실패: ${toolName} - ${mcpResponse.status}`);
-          const errorText = await mcpResponse.text();
-          addDebugLog(`❌ 에러 응답: ${errorText}`);
-          
-          // MCP 호출 실패도 mcpCalls 상태에 추가
-          const mcpCall: MCPCall = {
-            id: Date.now().toString(),
-            action: cleanToolName,
-            args: safeToolArgs,
-            response: { error: `HTTP ${mcpResponse.status}: ${errorText}` },
-            timestamp: new Date().toISOString(),
-            status: "error"
-          };
-          setMcpCalls(prev => [mcpCall, ...prev]);
-          
-          mcpResults.push({
-            tool: toolName,
-            args: safeToolArgs,
-            result: { error: `HTTP ${mcpResponse.status}` }
-          });
-        }
-      }
-      
-      // MCP 결과를 GPT에게 전달해서 Worker가 최종 답변 생성
-      addDebugLog(`🤖 Worker 실행 시작 - MCP 결과와 함께 최종 답변 생성`);
-      
-      const workerRequestData = {
-        question: userPrompt,
-        api_key: apiKey,
-        mode: "worker",
-        mcp_results: mcpResults
-      };
-      
-      addDebugLog(`📤 Worker 요청 데이터: ${JSON.stringify(workerRequestData, null, 2)}`);
-      
-      const workerResponse = await fetch("http://localhost:9000/ask", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify(workerRequestData),
-      });
-      
-      if (workerResponse.ok) {
-        const workerData = await workerResponse.json();
-        
-        if (workerData.error) {
-          setWorkerResponse(`❌ Worker 에러: ${workerData.error}`);
-          return;
-        }
-        
-        // Worker 응답을 스트리밍으로 표시
-        const workerText = workerData.answer || workerData.worker_response || "Worker 응답이 비어있습니다.";
-        setWorkerResponse('');
-        let currentWorkerText = "";
-        
-        for (let i = 0; i < workerText.length; i++) {
-          currentWorkerText += workerText[i];
-          setWorkerResponse(currentWorkerText);
-          await new Promise(resolve => setTimeout(resolve, 20)); // 20ms 딜레이
-        }
-        
-        addDebugLog(`✅ Worker 최종 답변 스트리밍 완료 - ${workerText.length}자`);
-      } else {
-        setWorkerResponse(`❌ Worker HTTP 에러: ${workerResponse.status}`);
-      }
-      
-    } catch (mcpError: any) {
-      addDebugLog(`💥 MCP 도구 실행 에러: ${mcpError.message}`);
-      setWorkerResponse(`❌ MCP 도구 실행 실패: ${mcpError.message}`);
+    for (let i = 0; i < text.length; i++) {
+      currentText += text[i];
+      setText(currentText);
+      await new Promise(resolve => setTimeout(resolve, 20)); // 20ms 딜레이
     }
   };
 
-  // 4번 화면: 2 STEP 테스트 (Step-by-step 모드)
+  // 4번 화면: 2 STEP 테스트 (Planner → MCP 도구 병렬 실행 → Worker를 Gateway에서 한 번에 처리)
   const handle2StepGPT = async () => {
     if (!prompt.trim() || !apiKey.trim()) return;
     
@@ -179,85 +49,24 @@ export const TwoStepTestPage: React.FC<TwoStepTestPageProps> = ({ apiKey, addDeb
     setMcpCalls([]);
     setPlannerResponse("");
     setWorkerResponse("");
+    setActiveResponseTab('planner');
     setIsLoading(true);
 
     try {
-      addDebugLog("🚀 2 STEP 테스트 시작 (Step-by-step 모드)");
-      
-      // 1단계: MCP 서버에서 실제 도구 명세 가져오기
-      addDebugLog(`🔍 MCP 서버에서 도구 명세 가져오기 시작`);
-      
-      try {
-        const schemaResponse = await fetch("http://localhost:9001/mcp/tools", {
-          method: "GET",
-          headers: { "Content-Type": "application/json" }
-        });
-        
-        if (schemaResponse.ok) {
-          const schemaData = await schemaResponse.json();
-          addDebugLog(`✅ MCP 서버 스키마 응답 수신: ${JSON.stringify(schemaData).substring(0, 200)}...`);
-          
-          // 스키마 데이터를 읽기 쉬운 형태로 변환
-          if (schemaData && Array.isArray(schemaData)) {
-            addDebugLog(`✅ MCP 도구 정보 파싱 완료 - ${schemaData.length}개 도구`);
-          } else {
-            addDebugLog(`⚠️ MCP 서버 스키마 응답 형식이 예상과 다름`);
-          }
-        } else {
-          addDebugLog(`❌ MCP 서버 스키마 요청 실패: ${schemaResponse.status}`);
-        }
-      } catch (schemaError: any) {
-        addDebugLog(`💥 MCP 서버 스키마 요청 에러: ${schemaError.message}`);
-      }
+      addDebugLog("🚀 2 STEP 테스트 시작 (Gateway 파이프라인)");
+      setPlannerResponse("Planner가 MCP 도구 호출 계획을 수립하고 있습니다...");
       
-      // 2단계: Gateway Backend의 /ask 엔드포인트 호출 (2 STEP 모드)
+      // GitHub 인증 정보는 Gateway가 github_repository_info 도구 인자에 주입
       const requestData = {
-        question: `당신은 MCP(Microservice Communication Protocol) 시스템의 Planner입니다. 사용자의 질문을 분석하여 필요한 MCP 도구들을 정확한 형식으로 호출하는 계획을 수립해야 합니다.
-
-## 📝 현재 질문
-${currentPrompt}
-
-위 질문에 답하기 위해 필요한 MCP 도구들을 정확한 tool_calls 형식으로 반환하세요.`,
+        question: currentPrompt,
         api_key: cleanApiKey,
-        mode: "2step", // 2 STEP 모드 지정
-        model: "gpt-5-mini", // GPT-5-mini 모델 사용
-        response_format: "json_object", // JSON 형태로 강제
-        functions: [ // Function Calling으로 JSON 구조 강제
-          {
-            name: "execute_mcp_tools",
-            description: "MCP 도구들을 실행하는 계획을 JSON 형태로 반환",
-            parameters: {
-              type: "object",
-              required: ["tool_calls"],
-              properties: {
-                tool_calls: {
-                  type: "array",
-                  description: "실행할 MCP 도구들의 목록",
-                  items: {
-                    type: "object",
-                    required: ["tool_name", "parameters"],
-                    properties: {
-                      tool_name: {
-                        type: "string",
-                        description: "실행할 MCP 도구의 이름"
-                      },
-                      parameters: {
-                        type: "object",
-                        description: "도구 실행에 필요한 파라미터들"
-                      }
-                    }
-                  }
-                }
-              }
-            }
-          }
-        ],
-        function_call: { name: "execute_mcp_tools" } // 이 함수만 호출하도록 강제
+        github_username: "hli.yohan.lee",
+        github_token: githubToken
       };
       
-      addDebugLog(`📤 Gateway Backend /ask 요청 (2 STEP): ${JSON.stringify(requestData, null, 2)}`);
+      addDebugLog(`📤 Gateway Backend /ask/2step 요청 - GitHub 토큰: ${githubToken ? '설정됨' : '설정되지 않음'}`);
       
-      const response = await fetch("http://localhost:9000/ask", {
+      const response = await fetch("http://localhost:9000/ask/2step", {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
@@ -269,191 +78,50 @@ ${currentPrompt}
 
       if (response.ok) {
         const data = await response.json();
-        addDebugLog(`✅ Gateway Backend 응답 수신 (2 STEP)`);
+        const trace = data.trace || {};
+        const toolTraces = trace.tools || [];
+        addDebugLog(`✅ Gateway Backend 응답 수신 (2 STEP) - 총 ${trace.total_ms ?? '-'}ms`);
+        
+        // 1단계: Planner 계획 표시
+        if (toolTraces.length > 0) {
+          const toolCallsText = toolTraces.map((tool: any, index: number) => {
+            return `${index + 1}. ${tool.tool} - ${JSON.stringify(tool.args)}`;
+          }).join('\n');
+          addDebugLog(`🧠 Planner 계획 수신 - ${toolTraces.length}개 도구 (${trace.planner?.elapsed_ms ?? '-'}ms)`);
+          await streamText(`MCP 도구 호출 계획:\n\n${toolCallsText}`, setPlannerResponse);
+        } else {
+          setPlannerResponse(data.error ? `Gateway Backend 에러: ${data.error}` : "선택된 MCP 도구가 없습니다.");
+        }
+        
+        // 2단계: MCP 도구 실행 내역 (결과 전문 대신 요약 정보)
+        const newMcpCalls: MCPCall[] = toolTraces.map((tool: any) => ({
+          id: tool.id,
+          action: tool.tool,
+          args: tool.args,
+          response: tool.error ? { error: tool.error } : { bytes: tool.bytes, elapsed_ms: tool.elapsed_ms },
+          timestamp: new Date().toISOString(),
+          status: tool.status
+        }));
+        setMcpCalls(newMcpCalls);
+        toolTraces.forEach((tool: any) => {
+          addDebugLog(`${tool.status === 'success' ? '✅' : '❌'} MCP 도구 ${tool.tool}: ${tool.elapsed_ms}ms, ${tool.bytes}B${tool.error ? ` - ${tool.error}` : ''}`);
+        });
         
         // Gateway Backend 에러 응답 확인
         if (data.error) {
           addDebugLog(`❌ Gateway Backend 에러 응답 감지: ${JSON.stringify(data.error)}`);
-          const errorMessage = `Gateway Backend 에러: ${data.error}`;
-          
-          setPlannerResponse(errorMessage);
+          setActiveResponseTab('worker');
+          setWorkerResponse(`❌ Worker 에러: ${data.error}`);
           return;
         }
         
-        // 2 STEP 모드 응답 처리
-        if (data.mode === "2step") {
-          addDebugLog(`🧠 2 STEP 모드 감지 - Planner 계획 수신`);
-          
-          // 1단계: Planner 응답 처리 (MCP 도구 호출 계획)
-          if (data.tool_calls && data.tool_calls.length > 0) {
-            addDebugLog(`🔧 tool_calls 감지 - MCP 도구 호출 계획`);
-            
-            // tool_calls를 읽기 쉬운 형태로 변환
-            const toolCallsText = data.tool_calls.map((tool: any, index: number) => {
-              const toolName = tool.tool_name || tool.tool || tool.function?.name || tool.name || 'unknown';
-              const toolArgs = tool.parameters || tool.function?.arguments || tool.arguments || '{}';
-              return `${index + 1}. ${toolName} - ${JSON.stringify(toolArgs)}`;
-            }).join('\n');
-            
-            const plannerText = `MCP 도구 호출 계획:\n\n${toolCallsText}`;
-            setPlannerResponse('');
-            let currentPlannerText = "";
-            
-            for (let i = 0; i < plannerText.length; i++) {
-              currentPlannerText += plannerText[i];
-              setPlannerResponse(currentPlannerText);
-              await new Promise(resolve => setTimeout(resolve, 20)); // 20ms 딜레이
-            }
-            
-            addDebugLog(`✅ Planner MCP 도구 계획 스트리밍 완료 - ${toolCallsText.length}자`);
-            
-            // Planner 완료 후 자동으로 Worker 탭으로 이동
-            setActiveResponseTab('worker');
-            
-            // 2단계: 실제 MCP 도구들 호출
-            await executeMcpTools(data.tool_calls, currentPrompt, cleanApiKey);
-            
-          } else if (data.planner_response) {
-            // 기존 planner_response가 있는 경우
-            addDebugLog(`📋 Planner 계획 수신 - 스트리밍 시작`);
-            
-            const plannerText = data.planner_response;
-            setPlannerResponse('');
-            let currentPlannerText = "";
-            
-            for (let i = 0; i < plannerText.length; i++) {
-              currentPlannerText += plannerText[i];
-              setPlannerResponse(currentPlannerText);
-              await new Promise(resolve => setTimeout(resolve, 20)); // 20ms 딜레이
-            }
-            
-            addDebugLog(`✅ Planner 계획 스트리밍 완료 - ${plannerText.length}자`);
-            
-            // Planner 완료 후 자동으로 Worker 탭으로 이동
-            setActiveResponseTab('worker');
-          }
-          
-          // 2단계: MCP 도구 실행 결과 처리 (기존 mcp_calls가 있는 경우)
-          const mcpCallsData = data.mcp_calls || [];
-          if (mcpCallsData.length > 0) {
-            addDebugLog(`🔧 기존 MCP 도구 실행 결과 수신 - ${mcpCallsData.length}개 도구`);
-            
-            const newMcpCalls = mcpCallsData.map((call: any) => ({
-              id: call.id || Date.now().toString(),
-              action: call.action,
-              args: call.args,
-              response: call.response,
-              timestamp: new Date().toISOString(),
-              status: call.status
-            }));
-            
-            setMcpCalls(prev => [...newMcpCalls, ...prev]);
-          }
-          
-          addDebugLog(`✅ 2 STEP 테스트 완료 - Planner 계획 → MCP 실행 → Worker 답변`);
-        } else {
-          // 일반 응답 처리 (2 STEP 모드가 아닌 경우)
-          addDebugLog(`⚠️ 일반 응답 모드 - 2 STEP 모드가 아님`);
-          const answerText = data.answer || "응답을 받았지만 내용이 비어있습니다.";
-          
-          // JSON 추출 시도
-          try {
-            // "일반 응답:" 같은 텍스트 제거하고 JSON만 추출
-            const jsonMatch = answerText.match(/\{[\s\S]*\}/);
-            if (jsonMatch) {
-              const jsonText = jsonMatch[0];
-              const parsedData = JSON.parse(jsonText);
-              
-              if (parsedData.tool_calls && parsedData.tool_calls.length > 0) {
-                addDebugLog(`🔧 JSON에서 tool_calls 추출 성공 - ${parsedData.tool_calls.length}개`);
-                
-                // tool_calls를 읽기 쉬운 형태로 변환
-                const toolCallsText = parsedData.tool_calls.map((tool: any, index: number) => {
-                  const toolName = tool.tool_name || tool.tool || tool.function?.name || tool.name || 'unknown';
-                  const toolArgs = tool.parameters || tool.function?.arguments || tool.arguments || '{}';
-                  return `${index + 1}. ${toolName} - ${JSON.stringify(toolArgs)}`;
-                }).join('\n');
-                
-                const plannerText = `MCP 도구 호출 계획:\n\n${toolCallsText}`;
-                setPlannerResponse('');
-                let currentPlannerText = "";
-                
-                for (let i = 0; i < plannerText.length; i++) {
-                  currentPlannerText += plannerText[i];
-                  setPlannerResponse(currentPlannerText);
-                  await new Promise(resolve => setTimeout(resolve, 20)); // 20ms 딜레이
-                }
-                
-                addDebugLog(`✅ Planner MCP 도구 계획 스트리밍 완료 - ${toolCallsText.length}자`);
-                
-                // Planner 완료 후 자동으로 Worker 탭으로 이동
-                setActiveResponseTab('worker');
-                
-                // MCP 도구 실행
-                await executeMcpTools(parsedData.tool_calls, currentPrompt, cleanApiKey);
-              } else {
-                setPlannerResponse(answerText);
-              }
-            } else {
-              // JSON이 없는 경우, 텍스트에서 tool_calls 정보 추출 시도
-              addDebugLog(`🔍 JSON이 없음 - 텍스트에서 tool_calls 정보 추출 시도`);
-              
-              // "functions.xxx - {...}" 패턴 찾기
-              const toolCallMatches = answerText.match(/functions\.\w+ - \{[\s\S]*?\}/g);
-              if (toolCallMatches && toolCallMatches.length > 0) {
-                addDebugLog(`🔧 텍스트에서 tool_calls 패턴 발견 - ${toolCallMatches.length}개`);
-                
-                const extractedToolCalls = toolCallMatches.map((match: string) => {
-                  // "functions.read_pdf - {"filename":"백엔드_가이드.pdf"}" 형태 파싱
-                  const toolMatch = match.match(/functions\.(\w+) - (\{[\s\S]*\})/);
-                  if (toolMatch) {
-                    const toolName = `functions.${toolMatch[1]}`;
-                    const parameters = JSON.parse(toolMatch[2]);
-                    return {
-                      tool_name: toolName,
-                      parameters: parameters
-                    };
-                  }
-                  return null;
-                }).filter((tool: any) => tool !== null);
-                
-                if (extractedToolCalls.length > 0) {
-                  addDebugLog(`✅ 텍스트에서 tool_calls 추출 성공 - ${extractedToolCalls.length}개`);
-                  
-                  // tool_calls를 읽기 쉬운 형태로 변환
-                  const toolCallsText = extractedToolCalls.map((tool: any, index: number) => {
-                    return `${index + 1}. ${tool.tool_name} - ${JSON.stringify(tool.parameters)}`;
-                  }).join('\n');
-                  
-                  const plannerText = `MCP 도구 호출 계획:\n\n${toolCallsText}`;
-                  setPlannerResponse('');
-                  let currentPlannerText = "";
-                  
-                  for (let i = 0; i < plannerText.length; i++) {
-                    currentPlannerText += plannerText[i];
-                    setPlannerResponse(currentPlannerText);
-                    await new Promise(resolve => setTimeout(resolve, 20)); // 20ms 딜레이
-                  }
-                  
-                  addDebugLog(`✅ Planner MCP 도구 계획 스트리밍 완료 - ${toolCallsText.length}자`);
-                  
-                  // Planner 완료 후 자동으로 Worker 탭으로 이동
-                  setActiveResponseTab('worker');
-                  
-                  // MCP 도구 실행
-                  await executeMcpTools(extractedToolCalls, currentPrompt, cleanApiKey);
-                } else {
-                  setPlannerResponse(answerText);
-                }
-              } else {
-                setPlannerResponse(answerText);
-              }
-            }
-          } catch (jsonError: any) {
-            addDebugLog(`💥 JSON 파싱 에러: ${jsonError.message}`);
-            setPlannerResponse(answerText);
-          }
-        }
+        // 3단계: Worker 최종 답변 표시
+        setActiveResponseTab('worker');
+        const workerText = data.answer || "Worker 응답이 비어있습니다.";
+        await streamText(workerText, setWorkerResponse);
+        
+        addDebugLog(`✅ Worker 최종 답변 스트리밍 완료 - ${workerText.length}자 (${trace.worker?.elapsed_ms ?? '-'}ms)`);
+        addDebugLog(`✅ 2 STEP 테스트 완료 - Planner 계획 → MCP 실행 → Worker 답변`);
       } else {
         // HTTP 에러 처리
         let errorMessage = "";
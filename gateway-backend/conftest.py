@@ -0,0 +1,10 @@
+"""
+Gateway Backend 테스트 공용 설정
+
+    python -m pytest
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
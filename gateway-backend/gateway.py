@@ -1,12 +1,30 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from pathlib import Path
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+import hashlib
+import itertools
 import json
 import asyncio
+import os
+import sys
+import time
+import uuid
 import httpx
-from openai import OpenAI
+from openai import AsyncOpenAI
 
-app = FastAPI(title="MCP Gateway Backend", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # 종료 시 MCP 서버 연결과 공용 HTTP 클라이언트 정리
+    if mcp_stream_client is not None:
+        await mcp_stream_client.close()
+    await close_mcp_http_client()
+    await openai_client_pool.close()
+
+app = FastAPI(title="MCP Gateway Backend", version="1.0.0", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -20,72 +38,325 @@ app.add_middleware(
 # MCP 서버 엔드포인트
 MCP_ENDPOINT = "http://localhost:9001"
 
-# OpenAI 클라이언트 (API 키는 요청에서 받음)
-def get_openai_client(api_key: str) -> OpenAI:
-    import httpx
+# MCP 서버 전송 방식: http(기본), unix(Unix 도메인 소켓), stdio(하위 프로세스)
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "http")
+MCP_UNIX_SOCKET = os.getenv("MCP_UNIX_SOCKET", "/tmp/mcp-server.sock")
+MCP_SERVER_PATH = Path(os.getenv("MCP_SERVER_PATH", str(Path(__file__).parent.parent / "mcp-server" / "app.py")))
+MCP_STREAM_LIMIT = int(os.getenv("MCP_STREAM_LIMIT", str(64 * 1024 * 1024)))
+
+class MCPStreamClient:
+    """줄 단위 JSON-RPC 클라이언트 (Unix 소켓 또는 stdio 하위 프로세스)
     
-    # SSL 검증 비활성화한 httpx 클라이언트 생성
-    http_client = httpx.Client(verify=False)
+    연결 하나를 유지하면서 여러 요청을 동시에 보내고, 요청 id로 응답을 짝지음
+    """
     
-    return OpenAI(
-        api_key=api_key,
-        http_client=http_client
-    )
+    def __init__(self, transport: str):
+        self.transport = transport
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.process = None
+        self.reader_task = None
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.ids = itertools.count(1)
+        self.connect_lock = asyncio.Lock()
+        self.write_lock = asyncio.Lock()
+    
+    async def connect(self):
+        async with self.connect_lock:
+            if self.writer is not None:
+                return
+            if self.transport == "unix":
+                self.reader, self.writer = await asyncio.open_unix_connection(MCP_UNIX_SOCKET, limit=MCP_STREAM_LIMIT)
+                print(f"MCP 서버 연결 (Unix 소켓): {MCP_UNIX_SOCKET}")
+            else:
+                self.process = await asyncio.create_subprocess_exec(
+                    sys.executable, str(MCP_SERVER_PATH), "--stdio",
+                    stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, limit=MCP_STREAM_LIMIT
+                )
+                self.reader, self.writer = self.process.stdout, self.process.stdin
+                print(f"MCP 서버 프로세스 시작 (stdio): pid={self.process.pid}")
+            self.reader_task = asyncio.create_task(self._read_loop(self.reader))
+    
+    async def _read_loop(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                for item in message if isinstance(message, list) else [message]:
+                    if item.get("method") == "notifications/tools/list_changed":
+                        # 서버 도구 목록이 바뀌면 다음 요청 때 다시 조회
+                        tool_schema_cache.invalidate()
+                        continue
+                    future = self.pending.pop(item.get("id"), None)
+                    if future is not None and not future.done():
+                        future.set_result(item)
+        except Exception as e:
+            print(f"MCP 연결 읽기 오류: {e}")
+        finally:
+            # 연결이 끊기면 기다리던 요청은 실패 처리하고 다음 요청 때 다시 연결
+            if self.reader is reader:
+                self.reader = self.writer = None
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("MCP 서버 연결이 끊어졌습니다"))
+            self.pending.clear()
+    
+    async def send(self, message: Dict[str, Any]):
+        await self.connect()
+        async with self.write_lock:
+            self.writer.write(json.dumps(message, ensure_ascii=False).encode() + b"\n")
+            await self.writer.drain()
+    
+    async def request(self, message: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """요청 전송 후 응답 대기 (연결 안에서 겹치지 않도록 id는 클라이언트가 새로 부여)"""
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        try:
+            await self.send({**message, "id": request_id})
+            response = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            notify_mcp_cancelled(request_id, "timeout")
+            raise
+        except asyncio.CancelledError:
+            notify_mcp_cancelled(request_id, "cancelled")
+            raise
+        finally:
+            self.pending.pop(request_id, None)
+        return {**response, "id": message.get("id")}
+    
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        if self.reader_task is not None:
+            self.reader_task.cancel()
+        if self.process is not None and self.process.returncode is None:
+            self.process.terminate()
+            await self.process.wait()
+        self.reader = self.writer = self.process = None
 
-async def get_mcp_tools() -> List[Dict[str, Any]]:
+mcp_stream_client = MCPStreamClient(MCP_TRANSPORT) if MCP_TRANSPORT in ("unix", "stdio") else None
+
+# 백그라운드 전송 중인 취소 알림 (태스크가 중간에 수거되지 않도록 참조 유지)
+background_tasks: set = set()
+
+# MCP 서버 HTTP 공용 클라이언트 (도구 호출마다 새로 연결하지 않고 keep-alive 연결 재사용)
+MCP_HTTP_MAX_CONNECTIONS = int(os.getenv("MCP_HTTP_MAX_CONNECTIONS", "100"))
+MCP_HTTP_MAX_KEEPALIVE = int(os.getenv("MCP_HTTP_MAX_KEEPALIVE", "20"))
+mcp_http_client: Optional[httpx.AsyncClient] = None
+
+def get_mcp_http_client() -> httpx.AsyncClient:
+    """MCP 서버용 공용 httpx 클라이언트 (처음 사용할 때 생성, 요청별 시간 제한은 호출 시 지정)"""
+    global mcp_http_client
+    if mcp_http_client is None:
+        mcp_http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=MCP_HTTP_MAX_CONNECTIONS, max_keepalive_connections=MCP_HTTP_MAX_KEEPALIVE)
+        )
+    return mcp_http_client
+
+async def close_mcp_http_client():
+    global mcp_http_client
+    if mcp_http_client is not None:
+        await mcp_http_client.aclose()
+        mcp_http_client = None
+
+# HTTP 전송의 MCP 세션 id (MCP 서버는 같은 세션에서 보낸 취소 알림만 받아들이므로 initialize로 받아 둠)
+mcp_http_session: Dict[str, Optional[str]] = {"id": None}
+mcp_http_session_lock = asyncio.Lock()
+
+async def mcp_http_headers(client: httpx.AsyncClient) -> Dict[str, str]:
+    """MCP 세션 헤더 (세션이 없으면 initialize로 발급, 실패하면 세션 없이 진행)"""
+    if mcp_http_session["id"] is None:
+        async with mcp_http_session_lock:
+            if mcp_http_session["id"] is None:
+                try:
+                    response = await client.post(f"{MCP_ENDPOINT}/", json={
+                        "jsonrpc": "2.0",
+                        "method": "initialize",
+                        "params": {"protocolVersion": "2024-11-05", "capabilities": {}, "clientInfo": {"name": "gateway-backend", "version": "1.0.0"}},
+                        "id": "gateway_initialize"
+                    })
+                    mcp_http_session["id"] = response.headers.get("mcp-session-id")
+                except httpx.HTTPError as e:
+                    print(f"MCP 세션 발급 실패: {e}")
+    return {"Mcp-Session-Id": mcp_http_session["id"]} if mcp_http_session["id"] else {}
+
+def notify_mcp_cancelled(request_id: Any, reason: str):
+    """응답을 더 기다리지 않는 요청을 MCP 서버에 알려 업스트림 작업을 멈추게 함 (호출자를 막지 않도록 백그라운드 전송)"""
+    notification = {
+        "jsonrpc": "2.0",
+        "method": "notifications/cancelled",
+        "params": {"requestId": request_id, "reason": reason}
+    }
+    
+    async def send():
+        try:
+            if mcp_stream_client is not None:
+                await mcp_stream_client.send(notification)
+            else:
+                # 원래 요청과 같은 세션으로 보내야 취소가 적용됨
+                headers = {"Mcp-Session-Id": mcp_http_session["id"]} if mcp_http_session["id"] else {}
+                await get_mcp_http_client().post(f"{MCP_ENDPOINT}/", json=notification, headers=headers, timeout=5.0)
+            print(f"MCP 요청 취소 알림: {request_id} ({reason})")
+        except Exception as e:
+            print(f"MCP 취소 알림 실패: {e}")
+    
+    task = asyncio.ensure_future(send())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+async def send_jsonrpc(client: httpx.AsyncClient, jsonrpc_request: Dict[str, Any], timeout: float) -> Optional[Dict[str, Any]]:
+    """설정된 전송 방식으로 JSON-RPC 요청 전송 (HTTP 응답이 200이 아니면 None)"""
+    if mcp_stream_client is not None:
+        return await mcp_stream_client.request(jsonrpc_request, timeout)
+    try:
+        headers = await mcp_http_headers(client)
+        response = await client.post(f"{MCP_ENDPOINT}/", json=jsonrpc_request, headers=headers, timeout=timeout)
+        if response.status_code == 404 and headers:
+            # 세션이 만료됨 (MCP 서버 재시작 등) - 새로 발급받아 한 번만 다시 보냄
+            mcp_http_session["id"] = None
+            response = await client.post(f"{MCP_ENDPOINT}/", json=jsonrpc_request, headers=await mcp_http_headers(client), timeout=timeout)
+    except httpx.TimeoutException:
+        notify_mcp_cancelled(jsonrpc_request.get("id"), "timeout")
+        raise
+    except asyncio.CancelledError:
+        notify_mcp_cancelled(jsonrpc_request.get("id"), "cancelled")
+        raise
+    return response.json() if response.status_code == 200 else None
+
+async def run_until_disconnected(http_request: Request, coro) -> Optional[Any]:
+    """브라우저 연결이 끊기면 처리 중인 작업을 취소 (진행 중인 MCP 호출에는 취소 알림 전송)"""
+    task = asyncio.ensure_future(coro)
+    
+    async def wait_for_disconnect():
+        while True:
+            message = await http_request.receive()
+            if message["type"] == "http.disconnect":
+                return
+    
+    watcher = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+            print("클라이언트 연결 종료 - 진행 중인 작업 취소")
+    return task.result() if not task.cancelled() else None
+
+# OpenAI 클라이언트 풀 설정
+OPENAI_CLIENT_POOL_SIZE = int(os.getenv("OPENAI_CLIENT_POOL_SIZE", "32"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "20"))
+OPENAI_KEEPALIVE_SECONDS = float(os.getenv("OPENAI_KEEPALIVE_SECONDS", "30"))
+
+class OpenAIClientPool:
+    """API 키별 AsyncOpenAI 클라이언트 풀
+    
+    키는 해시로만 보관하고, 모든 클라이언트가 keep-alive 연결 풀 하나를 공유함
+    (키가 많아지면 가장 오래 안 쓴 클라이언트부터 제거)
+    """
+    
+    def __init__(self, max_clients: int):
+        self.max_clients = max(1, max_clients)
+        self.clients: "OrderedDict[str, AsyncOpenAI]" = OrderedDict()
+        self.http_client: Optional[httpx.AsyncClient] = None
+    
+    def get(self, api_key: str) -> AsyncOpenAI:
+        key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        client = self.clients.get(key)
+        if client is not None:
+            self.clients.move_to_end(key)
+            return client
+        if self.http_client is None:
+            # SSL 검증 비활성화한 공용 httpx 비동기 클라이언트 (연결 재사용)
+            self.http_client = httpx.AsyncClient(
+                verify=False,
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+                    keepalive_expiry=OPENAI_KEEPALIVE_SECONDS
+                )
+            )
+        client = AsyncOpenAI(api_key=api_key, http_client=self.http_client)
+        self.clients[key] = client
+        while len(self.clients) > self.max_clients:
+            # 공용 연결 풀은 닫지 않고 클라이언트 참조만 제거
+            evicted, _ = self.clients.popitem(last=False)
+            print(f"OpenAI 클라이언트 제거 (LRU): {evicted[:8]}")
+        return client
+    
+    async def close(self):
+        self.clients.clear()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+    
+    @property
+    def snapshot(self) -> Dict[str, Any]:
+        return {"clients": len(self.clients), "max_clients": self.max_clients}
+
+openai_client_pool = OpenAIClientPool(OPENAI_CLIENT_POOL_SIZE)
+
+# OpenAI 클라이언트 (API 키는 요청에서 받음)
+def get_openai_client(api_key: str) -> AsyncOpenAI:
+    return openai_client_pool.get(api_key)
+
+async def fetch_mcp_tools() -> List[Dict[str, Any]]:
     """MCP 서버에서 사용 가능한 도구 목록을 가져옵니다 (JSON-RPC 2.0)"""
     try:
         print("MCP 서버에서 도구 목록 조회 중 (JSON-RPC)...")
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # JSON-RPC 2.0 요청
-            jsonrpc_request = {
-                "jsonrpc": "2.0",
-                "method": "tools/list",
-                "params": {},
-                "id": 1
-            }
+        client = get_mcp_http_client()
+        # JSON-RPC 2.0 요청
+        jsonrpc_request = {
+            "jsonrpc": "2.0",
+            "method": "tools/list",
+            "params": {},
+            "id": 1
+        }
+        
+        # JSON-RPC 엔드포인트로 시도
+        try:
+            jsonrpc_response = await send_jsonrpc(client, jsonrpc_request, 10.0)
             
-            # JSON-RPC 엔드포인트로 시도
-            try:
-                response = await client.post(f"{MCP_ENDPOINT}/", json=jsonrpc_request)
-                
-                if response.status_code == 200:
-                    jsonrpc_response = response.json()
-                    
-                    if "error" in jsonrpc_response:
-                        print(f"JSON-RPC 에러: {jsonrpc_response['error']}")
-                        # 레거시 REST API로 폴백
-                        response = await client.get(f"{MCP_ENDPOINT}/mcp/tools")
-                        if response.status_code == 200:
-                            tools = response.json()
-                            print(f"MCP 도구 목록 조회 완료 (REST): {len(tools)}개")
-                            return tools
-                    else:
-                        # JSON-RPC 응답에서 도구 추출
-                        tools_data = jsonrpc_response.get("result", {}).get("tools", [])
-                        # OpenAI 형식으로 변환
-                        openai_tools = []
-                        for tool in tools_data:
-                            openai_tool = {
-                                "type": "function",
-                                "function": {
-                                    "name": tool["name"],
-                                    "description": tool["description"],
-                                    "parameters": tool.get("inputSchema", tool.get("parameters", {}))
-                                }
+            if jsonrpc_response is not None:
+                if "error" in jsonrpc_response:
+                    print(f"JSON-RPC 에러: {jsonrpc_response['error']}")
+                    # 레거시 REST API로 폴백
+                    response = await client.get(f"{MCP_ENDPOINT}/mcp/tools", timeout=10.0)
+                    if response.status_code == 200:
+                        tools = response.json()
+                        print(f"MCP 도구 목록 조회 완료 (REST): {len(tools)}개")
+                        return tools
+                else:
+                    # JSON-RPC 응답에서 도구 추출
+                    tools_data = jsonrpc_response.get("result", {}).get("tools", [])
+                    # OpenAI 형식으로 변환
+                    openai_tools = []
+                    for tool in tools_data:
+                        openai_tool = {
+                            "type": "function",
+                            "function": {
+                                "name": tool["name"],
+                                "description": tool["description"],
+                                "parameters": tool.get("inputSchema", tool.get("parameters", {}))
                             }
-                            openai_tools.append(openai_tool)
-                        print(f"MCP 도구 목록 조회 완료 (JSON-RPC): {len(openai_tools)}개")
-                        return openai_tools
-            except:
-                # JSON-RPC 실패 시 레거시 REST API 사용
-                response = await client.get(f"{MCP_ENDPOINT}/mcp/tools")
-                if response.status_code == 200:
-                    tools = response.json()
-                    print(f"MCP 도구 목록 조회 완료 (REST fallback): {len(tools)}개")
-                    return tools
-                    
+                        }
+                        openai_tools.append(openai_tool)
+                    print(f"MCP 도구 목록 조회 완료 (JSON-RPC): {len(openai_tools)}개")
+                    return openai_tools
+        except:
+            # JSON-RPC 실패 시 레거시 REST API 사용
+            response = await client.get(f"{MCP_ENDPOINT}/mcp/tools", timeout=10.0)
+            if response.status_code == 200:
+                tools = response.json()
+                print(f"MCP 도구 목록 조회 완료 (REST fallback): {len(tools)}개")
+                return tools
+                
         return []
                 
     except Exception as e:
@@ -94,82 +365,259 @@ async def get_mcp_tools() -> List[Dict[str, Any]]:
         traceback.print_exc()
         return []
 
+def decode_tool_result(result_data: Dict[str, Any]) -> Dict[str, Any]:
+    """tools/call 결과에서 도구 응답 추출"""
+    # 구조화된 결과가 있으면 텍스트 파싱 없이 바로 사용
+    if "structuredContent" in result_data:
+        return result_data["structuredContent"]
+    # content 배열이 있으면 텍스트 추출
+    content = result_data.get("content")
+    if content:
+        text = content[0].get("text", "")
+        try:
+            return json.loads(text)
+        except:
+            return {"data": text}
+    return result_data
+
+def jsonrpc_error_result(error: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-RPC 오류를 도구 결과 형식으로 변환 (-32000 과부하, -32001 업스트림 장애는 재시도 힌트 유지)"""
+    result = {"error": error.get("message", "JSON-RPC 에러"), "code": error.get("code")}
+    if isinstance(error.get("data"), dict) and "retryAfter" in error["data"]:
+        result["retryAfter"] = error["data"]["retryAfter"]
+    return result
+
 async def call_mcp_tool(tool_name: str, arguments: dict) -> dict:
     """MCP 서버의 도구를 실행합니다 (JSON-RPC 2.0)"""
     try:
         print(f"MCP 도구 실행 시작 (JSON-RPC): {tool_name}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # JSON-RPC 2.0 요청
-            jsonrpc_request = {
-                "jsonrpc": "2.0",
-                "method": "tools/call",
-                "params": {
-                    "name": tool_name,
-                    "arguments": arguments
-                },
-                "id": f"call_{tool_name}_{asyncio.get_event_loop().time()}"
-            }
+        client = get_mcp_http_client()
+        # JSON-RPC 2.0 요청
+        jsonrpc_request = {
+            "jsonrpc": "2.0",
+            "method": "tools/call",
+            "params": {
+                "name": tool_name,
+                "arguments": arguments
+            },
+            # 같은 세션에서 동시에 진행 중인 id는 서버가 거절하므로 시계가 아닌 임의 값으로 생성
+            "id": f"call_{tool_name}_{uuid.uuid4().hex}"
+        }
+        
+        # JSON-RPC 엔드포인트로 시도
+        try:
+            jsonrpc_response = await send_jsonrpc(client, jsonrpc_request, 30.0)
+            
+            if jsonrpc_response is not None:
+                if "error" in jsonrpc_response:
+                    # 서버가 처리한 오류(과부하, 업스트림 장애, 인자 오류 등)는 REST로 다시 보내지 않고 그대로 전달
+                    print(f"JSON-RPC 에러: {jsonrpc_response['error']}")
+                    return jsonrpc_error_result(jsonrpc_response["error"])
+                # JSON-RPC 응답 처리
+                print(f"도구 {tool_name} 실행 완료 (JSON-RPC)")
+                return decode_tool_result(jsonrpc_response.get("result", {}))
+        except (httpx.TimeoutException, asyncio.TimeoutError, asyncio.CancelledError):
+            # 포기한 호출은 취소 알림을 이미 보냈으므로 REST로 다시 실행하지 않음
+            raise
+        except Exception as e:
+            print(f"JSON-RPC 전송 실패: {e}")
+        
+        # JSON-RPC 전송 자체가 실패한 경우(연결 오류, 200이 아닌 응답)에만 레거시 REST API 사용
+        response = await client.post(f"{MCP_ENDPOINT}/mcp/call", json={
+            "tool": tool_name,
+            "arguments": arguments
+        }, timeout=30.0)
+        
+        if response.status_code == 200:
+            result = response.json()
+            print(f"도구 {tool_name} 실행 완료 (REST fallback)")
+            return result
+        
+        error_msg = f"MCP 서버 응답 오류"
+        print(error_msg)
+        return {"error": error_msg}
             
-            # JSON-RPC 엔드포인트로 시도
-            try:
-                response = await client.post(f"{MCP_ENDPOINT}/", json=jsonrpc_request)
-                
-                if response.status_code == 200:
-                    jsonrpc_response = response.json()
-                    
-                    if "error" in jsonrpc_response:
-                        print(f"JSON-RPC 에러: {jsonrpc_response['error']}")
-                        # 레거시 REST API로 폴백
-                        response = await client.post(f"{MCP_ENDPOINT}/mcp/call", json={
-                            "tool": tool_name,
-                            "arguments": arguments
-                        })
-                        if response.status_code == 200:
-                            result = response.json()
-                            print(f"도구 {tool_name} 실행 완료 (REST fallback)")
-                            return result
-                    else:
-                        # JSON-RPC 응답 처리
-                        result_data = jsonrpc_response.get("result", {})
-                        # content 배열이 있으면 텍스트 추출
-                        if "content" in result_data:
-                            content = result_data["content"]
-                            if content and len(content) > 0:
-                                text = content[0].get("text", "")
-                                try:
-                                    return json.loads(text)
-                                except:
-                                    return {"data": text}
-                        print(f"도구 {tool_name} 실행 완료 (JSON-RPC)")
-                        return result_data
-            except:
-                # JSON-RPC 실패 시 레거시 REST API 사용
-                response = await client.post(f"{MCP_ENDPOINT}/mcp/call", json={
-                    "tool": tool_name,
-                    "arguments": arguments
-                })
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    print(f"도구 {tool_name} 실행 완료 (REST fallback)")
-                    return result
-                    
-            error_msg = f"MCP 서버 응답 오류"
-            print(error_msg)
-            return {"error": error_msg}
-                
     except Exception as e:
         print(f"MCP 도구 실행 실패: {e}")
         import traceback
         traceback.print_exc()
         return {"error": str(e)}
 
+# LLM 도구 호출 병렬 실행 설정
+TOOL_CALL_CONCURRENCY = int(os.getenv("TOOL_CALL_CONCURRENCY", "4"))
+TOOL_CALL_TIMEOUT_SECONDS = float(os.getenv("TOOL_CALL_TIMEOUT_SECONDS", "30"))
+TOOL_CALL_BATCH = os.getenv("TOOL_CALL_BATCH", "false").lower() == "true"
+
+async def call_mcp_tools_batch(calls: List[tuple]) -> List[Dict[str, Any]]:
+    """여러 도구 호출을 JSON-RPC 배치 하나로 전송 (응답은 id로 짝지어 호출 순서대로 반환, 응답이 없는 호출은 None)"""
+    base = f"batch_{uuid.uuid4().hex}"
+    batch = [
+        {
+            "jsonrpc": "2.0",
+            "method": "tools/call",
+            "params": {"name": tool_name, "arguments": arguments},
+            "id": f"{base}_{index}"
+        }
+        for index, (tool_name, arguments) in enumerate(calls)
+    ]
+    print(f"MCP 도구 배치 실행 (JSON-RPC): {len(batch)}개")
+    
+    # 시간 초과로 연결을 끊으면 MCP 서버가 배치 전체를 취소함
+    response = await get_mcp_http_client().post(f"{MCP_ENDPOINT}/", json=batch, timeout=TOOL_CALL_TIMEOUT_SECONDS)
+    if response.status_code != 200:
+        raise RuntimeError(f"MCP 서버 배치 응답 오류: HTTP {response.status_code}")
+    
+    responses = {item.get("id"): item for item in response.json()}
+    results = []
+    for request in batch:
+        item = responses.get(request["id"])
+        if item is None:
+            # 응답이 빠진 호출은 None으로 두어 호출자가 개별 호출로 다시 실행
+            results.append(None)
+        elif "error" in item:
+            results.append(jsonrpc_error_result(item["error"]))
+        else:
+            results.append(decode_tool_result(item.get("result", {})))
+    return results
+
+SECRET_ARG_KEYS = {"password", "token", "api_key"}
+
+def redact_args(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """로그/추적용 인자 (인증 정보는 가림)"""
+    return {key: "***" if key in SECRET_ARG_KEYS and value else value for key, value in arguments.items()}
+
+async def execute_tool_calls(tool_calls: List[Any], extra_args: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """LLM 도구 호출을 동시에 실행 (동시 실행 수 제한, 호출별 시간 제한, 실패는 호출별로 격리)
+    
+    결과는 tool_calls 순서(tool_call_id 기준)대로 반환, extra_args는 도구별로 인자에 덮어씀 (인증 정보 등)
+    """
+    semaphore = asyncio.Semaphore(max(1, TOOL_CALL_CONCURRENCY))
+    loop = asyncio.get_event_loop()
+    timeout_error = {"error": f"도구 실행 시간 초과 ({TOOL_CALL_TIMEOUT_SECONDS:g}초)"}
+    
+    def parse_args(tool_call) -> Any:
+        try:
+            tool_args = json.loads(tool_call.function.arguments or "{}")
+        except json.JSONDecodeError as e:
+            return e
+        return {**tool_args, **(extra_args or {}).get(tool_call.function.name, {})}
+    
+    parsed = {tool_call.id: parse_args(tool_call) for tool_call in tool_calls}
+    valid = [tool_call for tool_call in tool_calls if not isinstance(parsed[tool_call.id], Exception)]
+    
+    def outcome(tool_call, result: Dict[str, Any], started: float) -> Dict[str, Any]:
+        tool_args = parsed[tool_call.id]
+        return {
+            "tool_call": tool_call,
+            "action": tool_call.function.name,
+            "args": {} if isinstance(tool_args, Exception) else tool_args,
+            "response": result,
+            "status": "success" if "error" not in result else "error",
+            "timestamp": loop.time(),
+            "elapsed_ms": round((loop.time() - started) * 1000)
+        }
+    
+    async def run_one(tool_call) -> Dict[str, Any]:
+        tool_name = tool_call.function.name
+        tool_args = parsed[tool_call.id]
+        started = loop.time()
+        if isinstance(tool_args, Exception):
+            return outcome(tool_call, {"error": f"도구 인자 파싱 실패: {tool_args}"}, started)
+        print(f"도구 호출: {tool_name} - {redact_args(tool_args)}")
+        async with semaphore:
+            try:
+                result = await asyncio.wait_for(call_mcp_tool(tool_name, tool_args), TOOL_CALL_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                result = dict(timeout_error)
+            except Exception as tool_error:
+                result = {"error": f"도구 실행 실패: {str(tool_error)}"}
+        print(f"도구 {tool_name} 실행 {'완료' if 'error' not in result else '실패'} ({(loop.time() - started) * 1000:.0f}ms)")
+        return outcome(tool_call, result, started)
+    
+    # HTTP 전송에서는 인자가 올바른 호출들을 배치 하나로 보낼 수 있음 (Unix 소켓/stdio는 연결 하나에서 이미 동시 처리)
+    if TOOL_CALL_BATCH and mcp_stream_client is None and len(valid) > 1:
+        started = loop.time()
+        try:
+            results = await call_mcp_tools_batch([(tool_call.function.name, parsed[tool_call.id]) for tool_call in valid])
+            by_id = {tool_call.id: outcome(tool_call, result, started) for tool_call, result in zip(valid, results) if result is not None}
+        except httpx.TimeoutException:
+            print(f"MCP 도구 배치 시간 초과 ({TOOL_CALL_TIMEOUT_SECONDS:g}초)")
+            by_id = {tool_call.id: outcome(tool_call, dict(timeout_error), started) for tool_call in valid}
+        except Exception as e:
+            print(f"MCP 도구 배치 실패, 개별 호출로 재시도: {e}")
+            by_id = {}
+        if by_id:
+            # 배치에 포함되지 않았거나 응답이 빠진 호출은 개별 호출로 동시에 실행
+            missing = [tool_call for tool_call in tool_calls if tool_call.id not in by_id]
+            for tool_call, result in zip(missing, await asyncio.gather(*(run_one(tool_call) for tool_call in missing))):
+                by_id[tool_call.id] = result
+            return [by_id[tool_call.id] for tool_call in tool_calls]
+    
+    return list(await asyncio.gather(*(run_one(tool_call) for tool_call in tool_calls)))
+
+# 도구 목록 캐시 설정
+TOOL_SCHEMA_TTL_SECONDS = float(os.getenv("TOOL_SCHEMA_TTL_SECONDS", "60"))
+
+class ToolSchemaCache:
+    """OpenAI 형식으로 변환한 MCP 도구 목록 캐시
+    
+    내용 해시를 버전으로 두고, TTL이 지나거나 tools/list_changed 알림을 받으면 다시 조회
+    (조회 실패 시에는 이전 목록을 계속 사용)
+    """
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.tools: List[Dict[str, Any]] = []
+        self.version: Optional[str] = None
+        self.expires_at = 0.0
+        self.refreshes = 0
+        self.lock = asyncio.Lock()
+    
+    def fresh(self) -> bool:
+        return bool(self.tools) and time.monotonic() < self.expires_at
+    
+    def invalidate(self):
+        self.expires_at = 0.0
+        print("MCP 도구 목록 변경 알림 - 캐시 무효화")
+    
+    async def get(self) -> List[Dict[str, Any]]:
+        if self.fresh():
+            return self.tools
+        async with self.lock:
+            # 같이 기다리던 요청은 먼저 들어간 요청이 받아온 목록을 사용
+            if self.fresh():
+                return self.tools
+            tools = await fetch_mcp_tools()
+            if tools:
+                version = hashlib.sha256(json.dumps(tools, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+                if version != self.version:
+                    print(f"MCP 도구 목록 버전 갱신: {self.version} -> {version}")
+                self.tools, self.version = tools, version
+                self.expires_at = time.monotonic() + self.ttl
+                self.refreshes += 1
+            return self.tools
+    
+    @property
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "tools": len(self.tools),
+            "fresh": self.fresh(),
+            "refreshes": self.refreshes
+        }
+
+tool_schema_cache = ToolSchemaCache(TOOL_SCHEMA_TTL_SECONDS)
+
+async def get_mcp_tools() -> List[Dict[str, Any]]:
+    """OpenAI 형식 도구 목록 (캐시에서 반환)"""
+    return await tool_schema_cache.get()
+
 # API 엔드포인트들
 @app.get("/health")
 async def health_check():
     """헬스체크"""
-    return {"status": "healthy", "service": "MCP Gateway Backend"}
+    return {"status": "healthy", "service": "MCP Gateway Backend", "openai_clients": openai_client_pool.snapshot, "tool_schema": tool_schema_cache.snapshot}
 
 @app.get("/api/mcp/tools")
 async def get_mcp_tools_endpoint():
@@ -181,7 +629,8 @@ async def get_mcp_tools_endpoint():
         return {
             "ok": True,
             "data": {
-                "tools": tools
+                "tools": tools,
+                "version": tool_schema_cache.version
             }
         }
     except Exception as e:
@@ -202,6 +651,9 @@ async def call_mcp_tool_endpoint(request: dict):
         result = await call_mcp_tool(tool_name, arguments)
         
         if "error" in result:
+            # 과부하/업스트림 장애 오류는 재시도 힌트(초)도 함께 전달
+            if "retryAfter" in result:
+                return {"ok": False, "error": result["error"], "retryAfter": result["retryAfter"]}
             return {"ok": False, "error": result["error"]}
         
         return {
@@ -212,9 +664,61 @@ async def call_mcp_tool_endpoint(request: dict):
         print(f"MCP 도구 호출 API 에러: {e}")
         return {"ok": False, "error": f"MCP 도구 실행 실패: {str(e)}"}
 
+async def run_planner(client: AsyncOpenAI, question: str, mcp_tools: List[Dict[str, Any]]) -> List[Any]:
+    """Planner - 질문에 필요한 MCP 도구 호출 목록 선택"""
+    # 도구 목록은 MCP 서버가 지금 노출하는 것만 (예: search_code는 미러 모드일 때만)
+    tool_lines = "\n".join(
+        f"{index}. {tool['function']['name']} - {tool['function'].get('description', '')}"
+        for index, tool in enumerate(mcp_tools, 1)
+    )
+    planner_prompt = f"""사용자 질문을 분석하여 필요한 MCP 도구들을 선택하세요.
+
+사용 가능한 도구:
+{tool_lines}
+
+사용자 질문: {question}
+
+필요한 도구들을 선택하여 호출하세요."""
+    
+    # OpenAI API 호출 (도구 선택)
+    completion = await client.chat.completions.create(
+        model="gpt-5-mini",
+        messages=[
+            {"role": "system", "content": "당신은 MCP 도구를 선택하는 Planner입니다. 사용자 질문에 답하기 위해 필요한 도구들을 선택하세요."},
+            {"role": "user", "content": planner_prompt}
+        ],
+        tools=mcp_tools,
+        tool_choice="required"  # 반드시 도구 호출
+    )
+    return completion.choices[0].message.tool_calls or []
+
+async def run_worker(client: AsyncOpenAI, question: str, mcp_results: List[Dict[str, Any]]) -> str:
+    """Worker - MCP 도구 실행 결과로 최종 답변 생성"""
+    # MCP 결과를 텍스트로 변환
+    results_text = "MCP 도구 실행 결과:\n\n"
+    for result in mcp_results:
+        tool_name = result.get("tool", "unknown")
+        tool_result = result.get("result", {})
+        results_text += f"도구: {tool_name}\n결과: {json.dumps(tool_result, ensure_ascii=False, indent=2)}\n\n"
+    
+    completion = await client.chat.completions.create(
+        model="gpt-5-mini",
+        messages=[
+            {"role": "system", "content": "당신은 MCP 도구 실행 결과를 바탕으로 사용자 질문에 답변하는 Worker입니다."},
+            {"role": "user", "content": f"다음 MCP 도구 실행 결과를 바탕으로 사용자 질문에 답변하세요.\n\n{results_text}\n\n사용자 질문: {question}"}
+        ]
+    )
+    return completion.choices[0].message.content
+
 @app.post("/ask")
-async def ask_agent(request: dict) -> Dict[str, Any]:
+async def ask_agent(request: dict, http_request: Request) -> Dict[str, Any]:
     """LLM에 MCP tool을 등록하여 질문에 답변합니다"""
+    # 브라우저가 연결을 끊으면 남은 MCP 호출도 취소
+    result = await run_until_disconnected(http_request, handle_ask(request))
+    return result if result is not None else {"error": "클라이언트 연결이 종료되었습니다"}
+
+async def handle_ask(request: dict) -> Dict[str, Any]:
+    """/ask 요청 처리 (모드별 분기)"""
     try:
         # request를 dict로 받아서 mode 확인
         mode = request.get("mode", "default")
@@ -231,60 +735,25 @@ async def ask_agent(request: dict) -> Dict[str, Any]:
             client = get_openai_client(api_key)
             
             # MCP 도구 목록 가져오기
-            mcp_tools_raw = await get_mcp_tools()
+            mcp_tools = await get_mcp_tools()
             
-            if not mcp_tools_raw:
+            if not mcp_tools:
                 return {
                     "mode": "2step",
                     "error": "MCP 도구를 가져올 수 없습니다.",
                     "tool_calls": []
                 }
             
-            # OpenAI tools 형식으로 변환
-            mcp_tools = []
-            for tool in mcp_tools_raw:
-                mcp_tool = {
-                    "type": "function",
-                    "function": {
-                        "name": tool["function"]["name"],
-                        "description": tool["function"]["description"],
-                        "parameters": tool["function"]["parameters"]
-                    }
-                }
-                mcp_tools.append(mcp_tool)
-            
-            print(f"MCP 도구 생성 완료: {len(mcp_tools)}개")
+            print(f"MCP 도구 준비 완료: {len(mcp_tools)}개 (버전 {tool_schema_cache.version})")
             
             # Planner 실행 - 도구 선택만 하도록
-            planner_prompt = f"""사용자 질문을 분석하여 필요한 MCP 도구들을 선택하세요.
-
-사용 가능한 도구:
-1. read_pdf - PDF 파일 읽기
-2. query_database - 데이터베이스 조회
-3. github_repository_info - GitHub 저장소 정보 조회
-4. system_health - 시스템 상태 확인
-
-사용자 질문: {question}
-
-필요한 도구들을 선택하여 호출하세요."""
-            
-            # OpenAI API 호출 (도구 선택)
-            completion = client.chat.completions.create(
-                model="gpt-5-mini",
-                messages=[
-                    {"role": "system", "content": "당신은 MCP 도구를 선택하는 Planner입니다. 사용자 질문에 답하기 위해 필요한 도구들을 선택하세요."},
-                    {"role": "user", "content": planner_prompt}
-                ],
-                tools=mcp_tools,
-                tool_choice="required"  # 반드시 도구 호출
-            )
+            planner_calls = await run_planner(client, question, mcp_tools)
             
             # tool_calls 추출
-            message = completion.choices[0].message
             tool_calls = []
             
-            if message.tool_calls:
-                for tool_call in message.tool_calls:
+            if planner_calls:
+                for tool_call in planner_calls:
                     tool_name = tool_call.function.name
                     tool_args = json.loads(tool_call.function.arguments)
                     
@@ -310,24 +779,11 @@ async def ask_agent(request: dict) -> Dict[str, Any]:
             
             mcp_results = request.get("mcp_results", [])
             
-            # MCP 결과를 텍스트로 변환
-            results_text = "MCP 도구 실행 결과:\n\n"
-            for result in mcp_results:
-                tool_name = result.get("tool", "unknown")
-                tool_result = result.get("result", {})
-                results_text += f"도구: {tool_name}\n결과: {json.dumps(tool_result, ensure_ascii=False, indent=2)}\n\n"
-            
             # 최종 답변 생성
-            completion = client.chat.completions.create(
-                model="gpt-5-mini",
-                messages=[
-                    {"role": "system", "content": "당신은 MCP 도구 실행 결과를 바탕으로 사용자 질문에 답변하는 Worker입니다."},
-                    {"role": "user", "content": f"다음 MCP 도구 실행 결과를 바탕으로 사용자 질문에 답변하세요.\n\n{results_text}\n\n사용자 질문: {question}"}
-                ]
-            )
+            answer = await run_worker(client, question, mcp_results)
             
             return {
-                "answer": completion.choices[0].message.content,
+                "answer": answer,
                 "mode": "worker"
             }
         
@@ -336,32 +792,19 @@ async def ask_agent(request: dict) -> Dict[str, Any]:
         client = get_openai_client(api_key)
         
         # MCP 도구 목록 가져오기
-        mcp_tools_raw = await get_mcp_tools()
+        mcp_tools = await get_mcp_tools()
         
-        if not mcp_tools_raw:
+        if not mcp_tools:
             return {
                 "answer": "MCP 도구를 가져올 수 없습니다. 서버 상태를 확인해주세요.",
                 "tools_used": [],
                 "mcp_calls": []
             }
         
-        # OpenAI tools 형식으로 변환
-        mcp_tools = []
-        for tool in mcp_tools_raw:
-            mcp_tool = {
-                "type": "function",
-                "function": {
-                    "name": tool["function"]["name"],
-                    "description": tool["function"]["description"],
-                    "parameters": tool["function"]["parameters"]
-                }
-            }
-            mcp_tools.append(mcp_tool)
-        
-        print(f"MCP 도구 생성 완료: {len(mcp_tools)}개")
+        print(f"MCP 도구 준비 완료: {len(mcp_tools)}개 (버전 {tool_schema_cache.version})")
         
         # OpenAI API 호출 (MCP tools 등록)
-        completion = client.chat.completions.create(
+        completion = await client.chat.completions.create(
             model="gpt-5-mini",  # gpt-5-mini 모델 사용
             messages=[
                 {
@@ -388,62 +831,31 @@ async def ask_agent(request: dict) -> Dict[str, Any]:
                 message
             ]
             
-            for tool_call in message.tool_calls:
-                try:
-                    tool_name = tool_call.function.name
-                    tool_args = json.loads(tool_call.function.arguments)
-                    tools_used.append(tool_name)
-                    
-                    print(f"도구 호출: {tool_name} - {tool_args}")
-                    
-                    # MCP 서버로 도구 실행
-                    result = await call_mcp_tool(tool_name, tool_args)
-                    
-                    # MCP 호출 상세 정보 수집
-                    mcp_call = {
-                        "id": f"call_{len(mcp_calls) + 1}",
-                        "action": tool_name,
-                        "args": tool_args,
-                        "response": result,
-                        "timestamp": asyncio.get_event_loop().time(),
-                        "status": "success" if "error" not in result else "error"
-                    }
-                    mcp_calls.append(mcp_call)
-                    
-                    # 도구 응답을 메시지 배열에 추가
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": json.dumps(result)
-                    })
-                    
-                    print(f"도구 {tool_name} 실행 완료")
-                    
-                except Exception as tool_error:
-                    print(f"도구 {tool_name} 실행 실패: {tool_error}")
-                    
-                    # MCP 호출 실패 정보 수집
-                    mcp_call = {
-                        "id": f"call_{len(mcp_calls) + 1}",
-                        "action": tool_name,
-                        "args": tool_args,
-                        "response": {"error": f"도구 실행 실패: {str(tool_error)}"},
-                        "timestamp": asyncio.get_event_loop().time(),
-                        "status": "error"
-                    }
-                    mcp_calls.append(mcp_call)
-                    
-                    # 도구 실행 실패 시 에러 응답을 메시지에 추가
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": json.dumps({"error": f"도구 실행 실패: {str(tool_error)}"})
-                    })
+            # 도구 호출을 동시에 실행하고 tool_calls 순서대로 결과 정리
+            outcomes = await execute_tool_calls(message.tool_calls)
+            for index, outcome in enumerate(outcomes):
+                tools_used.append(outcome["action"])
+                
+                # MCP 호출 상세 정보 수집
+                mcp_calls.append({
+                    "id": f"call_{index + 1}",
+                    "action": outcome["action"],
+                    "args": outcome["args"],
+                    "response": outcome["response"],
+                    "timestamp": outcome["timestamp"],
+                    "status": outcome["status"]
+                })
+                
+                # 도구 응답을 메시지 배열에 추가
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": outcome["tool_call"].id,
+                    "content": json.dumps(outcome["response"])
+                })
             
             try:
                 # 모든 도구 응답을 포함하여 최종 답변 생성
-                final_client = get_openai_client(api_key)  # SSL 설정이 적용된 클라이언트 사용
-                final_completion = final_client.chat.completions.create(
+                final_completion = await client.chat.completions.create(
                     model="gpt-5-mini",
                     messages=messages
                 )
@@ -472,6 +884,78 @@ async def ask_agent(request: dict) -> Dict[str, Any]:
             "mcp_calls": []
         }
 
+@app.post("/ask/2step")
+async def ask_two_step(request: dict, http_request: Request) -> Dict[str, Any]:
+    """2 STEP 파이프라인 (Planner → MCP 도구 병렬 실행 → Worker)을 서버에서 한 번에 처리"""
+    # 브라우저가 연결을 끊으면 남은 MCP 호출도 취소
+    result = await run_until_disconnected(http_request, handle_two_step(request))
+    return result if result is not None else {"error": "클라이언트 연결이 종료되었습니다"}
+
+async def handle_two_step(request: dict) -> Dict[str, Any]:
+    """2 STEP 파이프라인 처리 (도구 결과 전문 대신 요약 추적 정보만 반환)"""
+    loop = asyncio.get_event_loop()
+    started = loop.time()
+    trace: Dict[str, Any] = {"tool_schema_version": None, "planner": None, "tools": [], "worker": None}
+    
+    def elapsed_ms(since: float) -> int:
+        return round((loop.time() - since) * 1000)
+    
+    try:
+        question = request.get("question", "")
+        api_key = request.get("api_key", "")
+        print(f"2 STEP 파이프라인 질문: {question}")
+        
+        client = get_openai_client(api_key)
+        mcp_tools = await get_mcp_tools()
+        trace["tool_schema_version"] = tool_schema_cache.version
+        if not mcp_tools:
+            return {"mode": "pipeline", "error": "MCP 도구를 가져올 수 없습니다.", "trace": trace}
+        
+        # 1단계: Planner
+        step_started = loop.time()
+        planner_calls = await run_planner(client, question, mcp_tools)
+        trace["planner"] = {
+            "elapsed_ms": elapsed_ms(step_started),
+            "tool_calls": [{"id": tool_call.id, "tool": tool_call.function.name} for tool_call in planner_calls]
+        }
+        print(f"Planner 도구 선택: {[tool_call.function.name for tool_call in planner_calls]}")
+        
+        # 2단계: MCP 도구 병렬 실행 (GitHub 인증 정보는 요청에서 받아 GitHub 도구 인자에 주입)
+        github_args = {
+            key: value
+            for key, value in (("username", request.get("github_username")), ("password", request.get("github_token")))
+            if value
+        }
+        outcomes = await execute_tool_calls(planner_calls, {"github_repository_info": github_args, "search_code": github_args})
+        for outcome in outcomes:
+            tool_trace = {
+                "id": outcome["tool_call"].id,
+                "tool": outcome["action"],
+                "args": redact_args(outcome["args"]),
+                "status": outcome["status"],
+                "elapsed_ms": outcome["elapsed_ms"],
+                "bytes": len(json.dumps(outcome["response"], ensure_ascii=False).encode("utf-8"))
+            }
+            if outcome["status"] == "error":
+                tool_trace["error"] = str(outcome["response"].get("error"))[:200]
+            trace["tools"].append(tool_trace)
+        
+        # 3단계: Worker
+        step_started = loop.time()
+        answer = await run_worker(client, question, [{"tool": outcome["action"], "result": outcome["response"]} for outcome in outcomes])
+        trace["worker"] = {"elapsed_ms": elapsed_ms(step_started)}
+        
+        trace["total_ms"] = elapsed_ms(started)
+        print(f"2 STEP 파이프라인 완료: {trace['total_ms']}ms (도구 {len(outcomes)}개)")
+        return {"mode": "pipeline", "answer": answer or "답변을 생성할 수 없습니다.", "trace": trace}
+    
+    except Exception as e:
+        print(f"2 STEP 파이프라인 실패: {e}")
+        import traceback
+        traceback.print_exc()
+        trace["total_ms"] = elapsed_ms(started)
+        return {"mode": "pipeline", "error": f"2 STEP 처리 중 오류가 발생했습니다: {str(e)}", "trace": trace}
+
 if __name__ == "__main__":
     import uvicorn
     print("MCP Gateway Backend 시작...")
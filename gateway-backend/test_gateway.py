@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+/ask 도구 호출 병렬 실행 오프라인 테스트 (MCP 서버 호출은 흉내, 네트워크 불필요)
+
+    python -m pytest test_gateway.py
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import gateway
+
+
+def make_tool_call(call_id: str, name: str, **arguments):
+    """OpenAI 응답의 tool_call 흉내"""
+    return SimpleNamespace(id=call_id, function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+
+
+def test_results_follow_tool_call_order(monkeypatch):
+    # 먼저 요청된 호출이 가장 늦게 끝나도 결과는 요청 순서대로
+    delays = {"read_pdf": 0.05, "query_database": 0.01, "system_health": 0.0}
+
+    async def fake_call(tool_name, arguments):
+        await asyncio.sleep(delays[tool_name])
+        return {"tool": tool_name, "arguments": arguments}
+
+    monkeypatch.setattr(gateway, "call_mcp_tool", fake_call)
+    tool_calls = [
+        make_tool_call("a", "read_pdf", filename="백엔드_가이드.pdf"),
+        make_tool_call("b", "query_database", table="users"),
+        make_tool_call("c", "system_health"),
+    ]
+    outcomes = asyncio.run(gateway.execute_tool_calls(tool_calls))
+
+    assert [outcome["tool_call"].id for outcome in outcomes] == ["a", "b", "c"]
+    assert [outcome["response"]["tool"] for outcome in outcomes] == ["read_pdf", "query_database", "system_health"]
+    assert outcomes[1]["args"] == {"table": "users"}
+    assert all(outcome["status"] == "success" for outcome in outcomes)
+
+
+def test_timeout_is_isolated(monkeypatch):
+    # 한 호출이 시간 초과되어도 나머지 호출은 정상 결과
+    cancelled = []
+
+    async def fake_call(tool_name, arguments):
+        if tool_name == "read_pdf":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(tool_name)
+                raise
+        return {"tool": tool_name}
+
+    monkeypatch.setattr(gateway, "call_mcp_tool", fake_call)
+    monkeypatch.setattr(gateway, "TOOL_CALL_TIMEOUT_SECONDS", 0.1)
+    tool_calls = [
+        make_tool_call("a", "read_pdf", filename="백엔드_가이드.pdf"),
+        make_tool_call("b", "system_health"),
+        SimpleNamespace(id="c", function=SimpleNamespace(name="query_database", arguments="{broken")),
+    ]
+    outcomes = asyncio.run(gateway.execute_tool_calls(tool_calls))
+
+    assert outcomes[0]["status"] == "error" and "시간 초과" in outcomes[0]["response"]["error"], outcomes[0]
+    assert outcomes[1]["status"] == "success" and outcomes[1]["response"] == {"tool": "system_health"}
+    assert outcomes[2]["status"] == "error" and "파싱 실패" in outcomes[2]["response"]["error"]
+    assert cancelled == ["read_pdf"]
+
+
+def test_concurrent_calls_use_unique_ids(monkeypatch):
+    # 같은 도구를 동시에 여러 번 호출해도 JSON-RPC id가 겹치지 않음 (같은 세션에서 id가 겹치면 서버가 거절)
+    sent = []
+
+    async def fake_send(client, jsonrpc_request, timeout):
+        sent.append(jsonrpc_request["id"])
+        await asyncio.sleep(0)
+        return {"jsonrpc": "2.0", "id": jsonrpc_request["id"], "result": {"structuredContent": {"ok": True}}}
+
+    async def run():
+        try:
+            return await asyncio.gather(*(gateway.call_mcp_tool("system_health", {}) for _ in range(50)))
+        finally:
+            await gateway.close_mcp_http_client()
+
+    monkeypatch.setattr(gateway, "send_jsonrpc", fake_send)
+    results = asyncio.run(run())
+
+    assert results == [{"ok": True}] * 50
+    assert len(sent) == 50 and len(set(sent)) == 50, sent
+
+
+def test_batch_falls_back_to_single_calls(monkeypatch):
+    singles = []
+
+    async def fake_call(tool_name, arguments):
+        singles.append(tool_name)
+        return {"tool": tool_name, "via": "single"}
+
+    async def batch_missing_item(calls):
+        # 두 번째 호출의 응답이 빠지고 세 번째는 서버가 처리한 오류
+        return [{"tool": calls[0][0], "via": "batch"}, None, {"error": "Server busy", "code": -32000, "retryAfter": 2.0}]
+
+    async def batch_failed(calls):
+        raise RuntimeError("MCP 서버 배치 응답 오류: HTTP 502")
+
+    tool_calls = [
+        make_tool_call("a", "read_pdf", filename="백엔드_가이드.pdf"),
+        make_tool_call("b", "query_database", table="users"),
+        make_tool_call("c", "system_health"),
+    ]
+    monkeypatch.setattr(gateway, "call_mcp_tool", fake_call)
+    monkeypatch.setattr(gateway, "TOOL_CALL_BATCH", True)
+    monkeypatch.setattr(gateway, "call_mcp_tools_batch", batch_missing_item)
+    outcomes = asyncio.run(gateway.execute_tool_calls(tool_calls))
+    # 응답이 빠진 호출만 개별로 다시 실행하고, 서버가 돌려준 오류는 그대로 전달
+    assert singles == ["query_database"], singles
+    assert [outcome["response"].get("via") for outcome in outcomes] == ["batch", "single", None]
+    assert outcomes[2]["status"] == "error" and outcomes[2]["response"]["retryAfter"] == 2.0
+
+    # 응답이 빠진 호출이 여러 개면 하나씩 기다리지 않고 동시에 실행
+    running = []
+    peak = []
+
+    async def slow_call(tool_name, arguments):
+        running.append(tool_name)
+        peak.append(len(running))
+        await asyncio.sleep(0.05)
+        running.remove(tool_name)
+        return {"tool": tool_name, "via": "single"}
+
+    async def batch_missing_two(calls):
+        return [{"tool": calls[0][0], "via": "batch"}, None, None]
+
+    monkeypatch.setattr(gateway, "call_mcp_tool", slow_call)
+    monkeypatch.setattr(gateway, "call_mcp_tools_batch", batch_missing_two)
+    outcomes = asyncio.run(gateway.execute_tool_calls(tool_calls))
+    assert max(peak) == 2, peak
+    assert [outcome["response"]["via"] for outcome in outcomes] == ["batch", "single", "single"]
+    assert [outcome["tool_call"].id for outcome in outcomes] == ["a", "b", "c"]
+
+    singles.clear()
+    monkeypatch.setattr(gateway, "call_mcp_tool", fake_call)
+    monkeypatch.setattr(gateway, "call_mcp_tools_batch", batch_failed)
+    outcomes = asyncio.run(gateway.execute_tool_calls(tool_calls))
+    # 배치 자체가 실패하면 모든 호출을 개별로 실행
+    assert sorted(singles) == ["query_database", "read_pdf", "system_health"]
+    assert [outcome["tool_call"].id for outcome in outcomes] == ["a", "b", "c"]
+    assert all(outcome["response"]["via"] == "single" for outcome in outcomes)
+
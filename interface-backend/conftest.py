@@ -0,0 +1,27 @@
+"""
+Interface Backend 테스트 공용 fixture
+
+    python -m pytest
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+@pytest.fixture
+def load_backend(monkeypatch):
+    """환경 변수를 설정하고 main 모듈을 새로 import (설정은 import 시점에 읽으므로 테스트마다 다시 로드)"""
+    def load(**env):
+        monkeypatch.setenv("MCP_SESSION_POOL_SIZE", "0")
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        sys.modules.pop("main", None)
+        import main
+        return main
+
+    yield load
+    sys.modules.pop("main", None)
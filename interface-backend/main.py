@@ -1,24 +1,57 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union, BinaryIO, Tuple
+import io
 import json
 import os
+import tempfile
+import threading
+import time
 from pathlib import Path
 import PyPDF2
 import sqlite3
 import requests
-from urllib.parse import urlparse
+from urllib.parse import urlparse, quote, unquote, parse_qs
+from collections import OrderedDict
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from contextlib import asynccontextmanager
 import base64
 import asyncio
+import anyio
+import codecs
+import hashlib
+import itertools
 import subprocess
+import sys
 from mcp import ClientSession, StdioServerParameters
+from mcp import types as mcp_types
+from mcp.client.stdio import stdio_client
 import urllib3
 
 # SSL 경고 억제 (로컬 환경에서 인증서 문제 해결)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-app = FastAPI(title="Interface Backend API", version="1.0.0")
+try:
+    import git  # gitpython (로컬 미러 모드에서만 사용)
+except ImportError:
+    git = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 시작: MCP 세션 풀과 로컬 미러 갱신 / 종료: 백그라운드 작업과 세션 정리
+    mcp_pool.start()
+    await start_git_mirrors()
+    try:
+        yield
+    finally:
+        git_mirror_task = getattr(app.state, "git_mirror_task", None)
+        if git_mirror_task is not None:
+            git_mirror_task.cancel()
+        await mcp_pool.close()
+
+app = FastAPI(title="Interface Backend API", version="1.0.0", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -94,6 +127,8 @@ class GithubRequest(BaseModel):
     username: Optional[str] = None
     password: Optional[str] = None  # 또는 personal access token
     file_path: Optional[str] = None
+    file_paths: Optional[List[str]] = None  # 여러 파일 동시 조회 (배치 모드)
+    recursive: Optional[bool] = False  # 전체 트리 재귀 조회
 
 class PDFRequest(BaseModel):
     filename: str
@@ -102,17 +137,363 @@ class DatabaseRequest(BaseModel):
     table: str
     filters: Optional[Dict[str, Any]] = None
 
+class ResourceReadRequest(BaseModel):
+    uri: str  # pdf:///{filename}?pages=2-4&bytes=0-1023, db:///{table}?rows=1-10
+
+class SearchRequest(BaseModel):
+    query: str
+    repository: Optional[str] = None  # 없으면 모든 미러 저장소 검색
+    limit: Optional[int] = None  # 최대 결과 수 (기본 CODE_SEARCH_DEFAULT_LIMIT)
+    username: Optional[str] = None  # GIT_MIRROR_ACCESS=verify일 때 필요
+    password: Optional[str] = None
+
+# GitHub 배치 조회 시 동시 요청 수 제한
+GITHUB_BATCH_CONCURRENCY = int(os.getenv("GITHUB_BATCH_CONCURRENCY", "5"))
+
+# 큰 파일 다운로드 설정 (메모리 대신 임시 파일로 스풀링)
+GITHUB_DOWNLOAD_MAX_BYTES = int(os.getenv("GITHUB_DOWNLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+GITHUB_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_MEMORY = 1024 * 1024  # 이 크기를 넘으면 디스크로 넘어감
+
+# 텍스트 디코딩 설정 (앞부분 샘플로 인코딩 추정 후 한 번만 디코딩)
+TEXT_SNIFF_BYTES = 64 * 1024
+TEXT_DECODE_CHUNK_BYTES = 64 * 1024
+TEXT_MAX_CHARS = int(os.getenv("TEXT_MAX_CHARS", "1000000"))
+TEXT_TRUNCATION_MARKER = "\n[... 내용이 너무 길어 {max_chars}자 이후는 생략되었습니다 ...]"
+# 텍스트 파일에 나올 수 있는 바이트 (나머지 제어 문자가 많으면 바이너리로 판단)
+TEXT_BYTES = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)))
+
+# 로컬 git 미러 모드 설정 (opt-in)
+GIT_MIRROR_ENABLED = os.getenv("GIT_MIRROR_ENABLED", "false").lower() == "true"
+GIT_MIRROR_PATH = Path(os.getenv("GIT_MIRROR_PATH", "mirrors")).absolute()
+GIT_MIRROR_REPOSITORIES = [r.strip() for r in os.getenv("GIT_MIRROR_REPOSITORIES", "").split(",") if r.strip()]
+GIT_MIRROR_REMOTE_URL = os.getenv("GIT_MIRROR_REMOTE_URL", "https://github.com/{repository}.git")
+GIT_MIRROR_REFRESH_SECONDS = int(os.getenv("GIT_MIRROR_REFRESH_SECONDS", "300"))
+# verify: 미러 데이터를 주기 전에 호출자 인증 정보로 GitHub 저장소 접근 권한 확인
+# shared: 확인 없이 제공 (미러 저장소를 백엔드 사용자 모두에게 공개해도 되는 경우만)
+GIT_MIRROR_ACCESS = os.getenv("GIT_MIRROR_ACCESS", "verify").lower()
+GIT_MIRROR_ACCESS_TTL_SECONDS = int(os.getenv("GIT_MIRROR_ACCESS_TTL_SECONDS", "300"))
+
+# 코드 검색 설정 (미러 저장소의 텍스트 파일만 색인)
+CODE_SEARCH_MAX_FILE_BYTES = int(os.getenv("CODE_SEARCH_MAX_FILE_BYTES", str(1024 * 1024)))
+CODE_SEARCH_DEFAULT_LIMIT = 50
+
+# GitHub 요청 스케줄러 설정
+GITHUB_SCHEDULER_WORKERS = int(os.getenv("GITHUB_SCHEDULER_WORKERS", "4"))
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", "3"))
+GITHUB_MAX_WAIT_SECONDS = float(os.getenv("GITHUB_MAX_WAIT_SECONDS", "60"))
+GITHUB_REQUEST_TIMEOUT_SECONDS = float(os.getenv("GITHUB_REQUEST_TIMEOUT_SECONDS", "30"))  # 연결/읽기 시간 제한
+GITHUB_QUEUE_TIMEOUT_SECONDS = float(os.getenv("GITHUB_QUEUE_TIMEOUT_SECONDS", "120"))  # 큐 대기(재시도 대기 포함) 시간 제한
+
+# 요청 우선순위 (숫자가 작을수록 먼저 처리)
+GITHUB_PRIORITY_HIGH = 0  # 목록/트리 조회
+GITHUB_PRIORITY_NORMAL = 1  # 단일 파일 조회
+GITHUB_PRIORITY_LOW = 2  # 배치 조회, 큰 파일 다운로드
+
+def parse_retry_after(value: str) -> Optional[float]:
+    """Retry-After 헤더를 대기할 초로 변환 (초 단위 숫자 또는 HTTP-date, 해석할 수 없으면 None)"""
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)  # "-0000" 시간대는 UTC로 간주
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+# 모든 GitHub API 호출을 통과시키는 스케줄러
+class GitHubScheduler:
+    """인증 정보별 rate limit 추적, 우선순위 큐, 중복 요청 병합, 403/429 백오프
+    
+    한도가 풀릴 때까지 기다려야 하는 요청은 워커가 잡고 있지 않고 재시도 가능 시각에 큐로 다시 넣음
+    (한 인증 정보가 한도에 걸려도 다른 인증 정보의 요청은 계속 처리됨)
+    """
+    
+    def __init__(self, workers: int, max_retries: int, max_wait: float, queue_timeout: float):
+        self.worker_count = workers
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.queue_timeout = queue_timeout
+        self.queue: Optional[asyncio.PriorityQueue] = None
+        self.workers: List[asyncio.Task] = []
+        self.inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.credentials: Dict[str, Dict[str, float]] = {}
+        self.sequence = itertools.count()
+        self.deferred = 0
+        self.stats = {"requests": 0, "coalesced": 0, "rate_limited": 0, "retries": 0, "expired": 0}
+    
+    @staticmethod
+    def credential_key(headers: Dict[str, str]) -> str:
+        """인증 헤더를 그대로 저장하지 않도록 해시로 구분"""
+        return hashlib.sha256(headers.get("Authorization", "").encode()).hexdigest()[:12]
+    
+    def _ensure_workers(self):
+        if self.queue is None:
+            self.queue = asyncio.PriorityQueue()
+            self.workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+    
+    async def get(self, url: str, headers: Dict[str, str], priority: int = GITHUB_PRIORITY_NORMAL, stream: bool = False) -> requests.Response:
+        """GET 요청을 큐에 넣고 결과를 기다림 (같은 인증 정보의 동일 URL은 한 번만 요청)"""
+        self._ensure_workers()
+        self.stats["requests"] += 1
+        dedup_key = (self.credential_key(headers), url)
+        
+        # 스트리밍 응답은 본문을 한 번만 읽을 수 있어 병합하지 않음
+        if not stream and dedup_key in self.inflight:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(self.inflight[dedup_key])
+        
+        future = asyncio.get_running_loop().create_future()
+        if not stream:
+            self.inflight[dedup_key] = future
+            future.add_done_callback(lambda _: self.inflight.pop(dedup_key, None))
+        
+        job = {
+            "url": url,
+            "headers": headers,
+            "stream": stream,
+            "priority": priority,
+            "future": future,
+            "attempt": 0,
+            "deadline": time.monotonic() + self.queue_timeout
+        }
+        self._enqueue(job)
+        try:
+            # 한 호출자가 취소되어도 병합된 다른 호출자에게는 영향이 없도록 shield
+            return await asyncio.wait_for(asyncio.shield(future), self.queue_timeout + GITHUB_REQUEST_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self._expire(job)
+            raise HTTPException(status_code=504, detail="GitHub 요청 대기 시간 초과")
+    
+    def _enqueue(self, job: Dict[str, Any]):
+        self.queue.put_nowait((job["priority"], next(self.sequence), job))
+    
+    def _expire(self, job: Dict[str, Any]):
+        """대기 시간을 넘긴 요청은 실패 처리 (큐에 남아 있어도 워커가 건너뜀)"""
+        future = job["future"]
+        if not future.done():
+            self.stats["expired"] += 1
+            future.set_exception(HTTPException(status_code=504, detail="GitHub 요청 대기 시간 초과"))
+            future.exception()  # 기다리는 호출자가 없어도 경고가 남지 않도록 확인 처리
+    
+    def _defer(self, job: Dict[str, Any], not_before: float) -> bool:
+        """not_before 시각에 큐로 다시 넣음 (최대 대기 시간이나 큐 대기 기한을 넘기면 False)"""
+        wait = max(not_before - time.time(), 0)
+        if wait > self.max_wait or time.monotonic() + wait > job["deadline"]:
+            return False
+        
+        def release():
+            self.deferred -= 1
+            if not job["future"].done():
+                self._enqueue(job)
+        
+        self.deferred += 1
+        asyncio.get_running_loop().call_later(wait, release)
+        return True
+    
+    async def _worker(self):
+        while True:
+            _, _, job = await self.queue.get()
+            future = job["future"]
+            try:
+                if future.done():
+                    continue  # 호출자가 이미 포기한 요청
+                if time.monotonic() > job["deadline"]:
+                    self._expire(job)
+                    continue
+                await self._send(job)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+    
+    async def _send(self, job: Dict[str, Any]):
+        """요청 한 번 전송 (한도에 걸리면 재시도 시각에 다시 큐에 넣고 바로 반환)"""
+        url, headers, future = job["url"], job["headers"], job["future"]
+        key = self.credential_key(headers)
+        
+        until = self._blocked_until(key)
+        if until > time.time():
+            if not self._defer(job, until):
+                raise HTTPException(status_code=429, detail=f"GitHub API 요청 한도 초과 ({int(until - time.time())}초 후 재시도 가능)")
+            return
+        
+        # SSL 검증 우회 (로컬 환경에서 인증서 문제 해결)
+        response = await asyncio.to_thread(requests.get, url, headers=headers, stream=job["stream"], timeout=GITHUB_REQUEST_TIMEOUT_SECONDS, verify=False)
+        self._update_limits(key, response)
+        
+        retry_after = self._retry_after(response, job["attempt"])
+        if retry_after is not None:
+            self.stats["rate_limited"] += 1
+            print(f"⏳ GitHub rate limit (HTTP {response.status_code}), {retry_after:.1f}초 후 재시도: {url}")
+            if job["attempt"] < self.max_retries and self._defer(job, time.time() + retry_after):
+                response.close()
+                job["attempt"] += 1
+                self.stats["retries"] += 1
+                self.credentials[key]["blocked_until"] = time.time() + retry_after
+                return
+        
+        if future.done():
+            response.close()  # 기다리는 호출자가 없음
+        else:
+            future.set_result(response)
+    
+    def _blocked_until(self, key: str) -> float:
+        """남은 요청 수가 0이거나 백오프 중이면 풀리는 시각 (아니면 0)"""
+        state = self.credentials.get(key)
+        if not state:
+            return 0
+        until = state.get("blocked_until", 0)
+        if state.get("remaining", 1) <= 0:
+            until = max(until, state.get("reset", 0))
+        return until
+    
+    def _update_limits(self, key: str, response: requests.Response):
+        state = self.credentials.setdefault(key, {})
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is not None:
+            state["remaining"] = int(remaining)
+        if reset is not None:
+            state["reset"] = float(reset)
+    
+    @staticmethod
+    def _retry_after(response: requests.Response, attempt: int) -> Optional[float]:
+        """rate limit 응답이면 대기할 초를 반환, 아니면 None"""
+        if response.status_code not in (403, 429):
+            return None
+        if response.headers.get("Retry-After"):
+            retry_after = parse_retry_after(response.headers["Retry-After"])
+            if retry_after is not None:
+                return retry_after
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            return max(float(response.headers.get("X-RateLimit-Reset", 0)) - time.time(), 1.0)
+        if response.status_code == 429 or "rate limit" in response.text.lower():
+            # 보조(secondary) rate limit: 헤더가 없으면 최소 1분부터 지수 백오프
+            return 60.0 * (2 ** attempt)
+        return None  # 권한 부족 등 일반 403
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """큐 깊이와 인증 정보별 한도 상태"""
+        now = time.time()
+        return {
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "deferred": self.deferred,
+            "in_flight": len(self.inflight),
+            "workers": self.worker_count,
+            "stats": dict(self.stats),
+            "credentials": [
+                {
+                    "key": key,
+                    "remaining": state.get("remaining"),
+                    "reset_in": max(state.get("reset", now) - now, 0),
+                    "blocked_for": max(state.get("blocked_until", now) - now, 0)
+                }
+                for key, state in self.credentials.items()
+            ]
+        }
+
+github_scheduler = GitHubScheduler(GITHUB_SCHEDULER_WORKERS, GITHUB_MAX_RETRIES, GITHUB_MAX_WAIT_SECONDS, GITHUB_QUEUE_TIMEOUT_SECONDS)
+
+def github_error_detail(response: requests.Response) -> str:
+    """GitHub 오류 응답을 사용자에게 보여줄 메시지로 변환"""
+    if GitHubScheduler._retry_after(response, 0) is not None:
+        return "GitHub API 요청 한도 초과 (잠시 후 다시 시도해주세요)"
+    return "GitHub API 오류"
+
+# 앞부분 샘플로 텍스트 인코딩 추정
+def sniff_text_encoding(sample: bytes, complete: bool) -> Optional[str]:
+    """UTF-8 -> cp949 -> latin-1 순서로 추정 (바이너리로 보이면 None)"""
+    if b"\0" in sample:
+        return None
+    if sample and len(sample.translate(None, TEXT_BYTES)) / len(sample) > 0.3:
+        return None
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    
+    for encoding in ("utf-8", "cp949"):  # cp949: 한글 Windows 인코딩
+        try:
+            # 파일 전체가 아니면 샘플 끝에서 잘린 멀티바이트 문자는 오류로 보지 않음
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=complete)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"  # 마지막 수단
+
+# 파일 객체를 한 번만 읽으면서 텍스트로 디코딩
+def decode_text_stream(file_obj: BinaryIO, max_chars: int = TEXT_MAX_CHARS) -> str:
+    """청크 단위 증분 디코딩, max_chars를 넘으면 잘라내고 표시 문구 추가"""
+    file_obj.seek(0)
+    sample = file_obj.read(TEXT_SNIFF_BYTES)
+    encoding = sniff_text_encoding(sample, complete=len(sample) < TEXT_SNIFF_BYTES)
+    if encoding is None:
+        print("⚠️ 바이너리 파일로 판단되어 디코딩 생략")
+        return "[바이너리 파일이라 텍스트로 표시할 수 없습니다]"
+    
+    print(f"📝 텍스트 인코딩 추정: {encoding}")
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    parts = []
+    total = 0
+    chunk = sample
+    while chunk:
+        text = decoder.decode(chunk)
+        if total + len(text) > max_chars:
+            parts.append(text[:max_chars - total])
+            parts.append(TEXT_TRUNCATION_MARKER.format(max_chars=max_chars))
+            print(f"✂️ 텍스트가 {max_chars}자에서 잘림")
+            return "".join(parts)
+        parts.append(text)
+        total += len(text)
+        chunk = file_obj.read(TEXT_DECODE_CHUNK_BYTES)
+    
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+# 큰 파일 스트리밍 다운로드 함수
+def download_to_spool(response: requests.Response) -> Tuple[int, Optional[BinaryIO]]:
+    """스트리밍 응답 내용을 청크 단위로 SpooledTemporaryFile에 저장 (크기 제한 적용)"""
+    with response:
+        if response.status_code != 200:
+            return response.status_code, None
+        
+        # Content-Length가 있으면 받기 전에 먼저 확인
+        content_length = int(response.headers.get("Content-Length") or 0)
+        if content_length > GITHUB_DOWNLOAD_MAX_BYTES:
+            raise ValueError(f"파일 크기 제한 초과: {content_length} > {GITHUB_DOWNLOAD_MAX_BYTES} bytes")
+        
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+        try:
+            total = 0
+            for chunk in response.iter_content(chunk_size=GITHUB_DOWNLOAD_CHUNK_SIZE):
+                total += len(chunk)
+                if total > GITHUB_DOWNLOAD_MAX_BYTES:
+                    raise ValueError(f"파일 크기 제한 초과: {GITHUB_DOWNLOAD_MAX_BYTES} bytes")
+                spool.write(chunk)
+        except Exception:
+            spool.close()
+            raise
+        
+        spool.seek(0)
+        return response.status_code, spool
 
 # 파일 내용 처리 함수 (PDF, 텍스트 등)
-async def process_file_content(file_bytes: bytes, file_path: str) -> str:
-    """파일 내용을 처리하여 텍스트로 변환"""
+async def process_file_content(file_data: Union[bytes, BinaryIO], file_path: str) -> str:
+    """파일 내용을 처리하여 텍스트로 변환 (bytes 또는 읽기 가능한 파일 객체)"""
     try:
+        # 스풀 파일 등 파일 객체는 복사 없이 그대로 읽음
+        if isinstance(file_data, (bytes, bytearray)):
+            file_obj = io.BytesIO(file_data)
+        else:
+            file_obj = file_data
+            file_obj.seek(0)
+        
         # PDF 파일인 경우 텍스트 추출
         if file_path.lower().endswith('.pdf'):
-            import io
-            import PyPDF2
-            pdf_file = io.BytesIO(file_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            pdf_reader = PyPDF2.PdfReader(file_obj)
             
             print(f"📄 PDF 페이지 수: {len(pdf_reader.pages)}")
             
@@ -131,15 +512,8 @@ async def process_file_content(file_bytes: bytes, file_path: str) -> str:
                 print("✅ 텍스트 추출 성공")
                 
         else:
-            # 텍스트 파일인 경우 디코딩 시도
-            try:
-                content = file_bytes.decode('utf-8')
-            except UnicodeDecodeError:
-                # UTF-8 디코딩 실패 시 다른 인코딩 시도
-                try:
-                    content = file_bytes.decode('cp949')  # 한글 Windows 인코딩
-                except:
-                    content = file_bytes.decode('latin-1', errors='ignore')  # 마지막 수단
+            # 텍스트 파일인 경우 인코딩 추정 후 디코딩
+            content = decode_text_stream(file_obj)
         
         return content
         
@@ -148,67 +522,133 @@ async def process_file_content(file_bytes: bytes, file_path: str) -> str:
         print(f"💥 파일 처리 오류: {str(e)}")
         return error_msg
 
+# MCP 클라이언트 설정 (stdio 서브프로세스 세션을 미리 띄워두고 재사용)
+MCP_SERVER_PATH = Path(os.getenv("MCP_SERVER_PATH", str(Path(__file__).parent.parent / "mcp-server" / "app.py")))
+MCP_SESSION_POOL_SIZE = int(os.getenv("MCP_SESSION_POOL_SIZE", "2"))
+MCP_HEALTH_CHECK_SECONDS = float(os.getenv("MCP_HEALTH_CHECK_SECONDS", "30"))
+MCP_SESSION_WAIT_SECONDS = float(os.getenv("MCP_SESSION_WAIT_SECONDS", "10"))
+MCP_RESTART_DELAY_SECONDS = 1.0
+
+class MCPSessionSlot:
+    """MCP 서버 프로세스 하나와 초기화된 ClientSession"""
+    
+    def __init__(self, index: int):
+        self.index = index
+        self.session: Optional[ClientSession] = None
+        self.inflight = 0
+        self.restarts = 0
+        self.dead = asyncio.Event()
+
+def mcp_server_params() -> StdioServerParameters:
+    """MCP 서버 하위 프로세스 실행 설정
+    
+    env를 주지 않으면 stdio_client가 최소 환경 변수만 넘기므로, GITHUB_TOKEN, INTERFACE_BACKEND_URL(S),
+    UPSTREAM_*/TOOL_*/BREAKER_* 같은 설정이 MCP 서버에 전달되도록 현재 환경을 그대로 넘김
+    """
+    return StdioServerParameters(command=sys.executable, args=[str(MCP_SERVER_PATH), "--stdio"], env={**os.environ})
+
+class MCPSessionPool:
+    """초기화된 MCP 세션 풀 (헬스체크, 프로세스 종료 시 재시작, 도구 목록 캐시)"""
+    
+    def __init__(self, size: int):
+        self.slots = [MCPSessionSlot(i) for i in range(size)]
+        self.tasks: List[asyncio.Task] = []
+        self.available = asyncio.Event()
+        self.closing = False
+        self.tools_cache: Optional[list] = None
+    
+    def start(self):
+        self.tasks = [asyncio.create_task(self._run_slot(slot)) for slot in self.slots]
+    
+    async def close(self):
+        self.closing = True
+        for slot in self.slots:
+            slot.dead.set()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+    
+    async def _on_message(self, message):
+        # 서버가 도구 목록 변경을 알리면 캐시 무효화
+        if isinstance(message, mcp_types.ServerNotification) and isinstance(message.root, mcp_types.ToolListChangedNotification):
+            print("🔄 MCP 도구 목록 변경 알림 - 캐시 초기화")
+            self.tools_cache = None
+    
+    async def _run_slot(self, slot: MCPSessionSlot):
+        """세션 하나를 유지하며 주기적으로 ping, 실패하면 프로세스를 다시 띄움"""
+        while not self.closing:
+            slot.dead.clear()
+            try:
+                async with stdio_client(mcp_server_params()) as (read_stream, write_stream):
+                    async with ClientSession(read_stream, write_stream, message_handler=self._on_message) as session:
+                        await asyncio.wait_for(session.initialize(), timeout=MCP_SESSION_WAIT_SECONDS)
+                        slot.session = session
+                        self.available.set()
+                        print(f"✅ MCP 세션 {slot.index} 준비 완료")
+                        
+                        while not self.closing:
+                            try:
+                                await asyncio.wait_for(slot.dead.wait(), timeout=MCP_HEALTH_CHECK_SECONDS)
+                                break  # 호출 중 오류 또는 종료 요청
+                            except asyncio.TimeoutError:
+                                await asyncio.wait_for(session.send_ping(), timeout=MCP_SESSION_WAIT_SECONDS)
+            except Exception as e:
+                print(f"💥 MCP 세션 {slot.index} 오류: {e}")
+            finally:
+                slot.session = None
+            
+            if not self.closing:
+                slot.restarts += 1
+                print(f"🔁 MCP 세션 {slot.index} 재시작")
+                await asyncio.sleep(MCP_RESTART_DELAY_SECONDS)
+    
+    async def _acquire(self) -> MCPSessionSlot:
+        """준비된 세션 중 처리 중인 요청이 가장 적은 것을 선택"""
+        deadline = time.monotonic() + MCP_SESSION_WAIT_SECONDS
+        while True:
+            ready = [slot for slot in self.slots if slot.session is not None and not slot.dead.is_set()]
+            if ready:
+                return min(ready, key=lambda slot: slot.inflight)
+            self.available.clear()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError("사용 가능한 MCP 세션이 없습니다")
+            try:
+                await asyncio.wait_for(self.available.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def run(self, operation):
+        """operation(session)을 풀의 세션으로 실행, 세션 오류면 해당 세션 재시작"""
+        slot = await self._acquire()
+        slot.inflight += 1
+        try:
+            return await operation(slot.session)
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError, ConnectionError):
+            slot.dead.set()
+            raise
+        finally:
+            slot.inflight -= 1
+    
+    async def list_tools(self) -> list:
+        if self.tools_cache is None:
+            result = await self.run(lambda session: session.list_tools())
+            self.tools_cache = [tool.model_dump(exclude_none=True) for tool in result.tools]
+        return self.tools_cache
+    
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [
+            {"index": slot.index, "ready": slot.session is not None, "inflight": slot.inflight, "restarts": slot.restarts}
+            for slot in self.slots
+        ]
+
+mcp_pool = MCPSessionPool(MCP_SESSION_POOL_SIZE)
+
 # MCP 클라이언트 함수들
 async def get_mcp_tools() -> list:
-    """MCP 서버에서 사용 가능한 도구 목록을 가져옵니다"""
+    """MCP 서버에서 사용 가능한 도구 목록을 가져옵니다 (list_changed 알림 전까지 캐시)"""
     try:
-        print("MCP 서버 프로세스 시작...")
-        
-        # MCP 서버 프로세스 시작 (절대 경로 사용)
-        mcp_server_path = Path(__file__).parent.parent / "mcp-server" / "app.py"
-        print(f"MCP 서버 경로: {mcp_server_path}")
-        
-        process = await asyncio.create_subprocess_exec(
-            "python", str(mcp_server_path),
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        # 프로세스가 시작될 때까지 잠시 대기
-        await asyncio.sleep(2)
-        
-        # 프로세스 상태 확인
-        if process.returncode is not None:
-            print(f"MCP 서버 프로세스 시작 실패: returncode={process.returncode}")
-            return []
-        
-        print("MCP 서버 프로세스 시작됨, stderr 확인 중...")
-        
-        # stderr에서 시작 메시지 확인
-        stderr_data = b""
-        try:
-            while True:
-                chunk = await asyncio.wait_for(process.stderr.read(1024), timeout=0.1)
-                if not chunk:
-                    break
-                stderr_data += chunk
-        except asyncio.TimeoutError:
-            pass
-        
-        if stderr_data:
-            print(f"MCP 서버 stderr: {stderr_data.decode()}")
-        
-        print("MCP ClientSession 생성 시도...")
-        
-        try:
-            # ClientSession 생성 시 write_stream과 read_stream 전달
-            async with ClientSession(
-                write_stream=process.stdin,
-                read_stream=process.stdout
-            ) as session:
-                print("MCP ClientSession 생성 성공, 도구 목록 조회 중...")
-                # 도구 목록 조회
-                tools = await session.list_tools()
-                print(f"도구 목록 조회 완료: {len(tools)}개")
-                return tools
-        finally:
-            # 프로세스 정리
-            try:
-                process.terminate()
-                await asyncio.wait_for(process.wait(), timeout=5.0)
-            except:
-                process.kill()
+        tools = await mcp_pool.list_tools()
+        print(f"도구 목록 조회 완료: {len(tools)}개")
+        return tools
     except Exception as e:
         print(f"MCP 도구 목록 조회 실패: {e}")
         import traceback
@@ -219,89 +659,600 @@ async def call_mcp_tool(tool_name: str, arguments: dict) -> dict:
     """MCP 서버의 도구를 실행합니다"""
     try:
         print(f"MCP 도구 실행 시작: {tool_name}")
+        result = await mcp_pool.run(lambda session: session.call_tool(tool_name, arguments))
+        print(f"도구 {tool_name} 실행 완료")
         
-        # MCP 서버 프로세스 시작 (절대 경로 사용)
-        mcp_server_path = Path(__file__).parent.parent / "mcp-server" / "app.py"
-        print(f"MCP 서버 경로: {mcp_server_path}")
-        
-        process = await asyncio.create_subprocess_exec(
-            "python", str(mcp_server_path),
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        # 프로세스가 시작될 때까지 잠시 대기
-        await asyncio.sleep(2)
-        
-        # 프로세스 상태 확인
-        if process.returncode is not None:
-            print(f"MCP 서버 프로세스 시작 실패: returncode={process.returncode}")
-            return {"error": "MCP 서버 프로세스 시작 실패"}
-        
-        print("MCP 서버 프로세스 시작됨, stderr 확인 중...")
-        
-        # stderr에서 시작 메시지 확인
-        stderr_data = b""
-        try:
-            while True:
-                chunk = await asyncio.wait_for(process.stderr.read(1024), timeout=0.1)
-                if not chunk:
-                    break
-                stderr_data += chunk
-        except asyncio.TimeoutError:
-            pass
-        
-        if stderr_data:
-            print(f"MCP 서버 stderr: {stderr_data.decode()}")
-        
-        print("MCP ClientSession 생성 시도...")
-        
-        try:
-            # ClientSession 생성 시 write_stream과 read_stream 전달
-            async with ClientSession(
-                write_stream=process.stdin,
-                read_stream=process.stdout
-            ) as session:
-                print(f"MCP ClientSession 생성 성공, 도구 {tool_name} 실행 중...")
-                # 도구 실행
-                result = await session.call_tool(tool_name, arguments)
-                print(f"도구 {tool_name} 실행 완료")
-                return result
-        finally:
-            # 프로세스 정리
-            try:
-                process.terminate()
-                await asyncio.wait_for(process.wait(), timeout=5.0)
-            except:
-                process.kill()
+        if result.isError:
+            texts = [item.text for item in result.content if getattr(item, "text", None)]
+            return {"error": "\n".join(texts) or f"도구 실행 오류: {tool_name}"}
+        return result.model_dump(exclude_none=True)
     except Exception as e:
         print(f"MCP 도구 실행 실패: {e}")
         import traceback
         traceback.print_exc()
         return {"error": str(e)}
 
-# PDF 읽기 함수
-def read_pdf_content(filename: str) -> str:
+# PDF 페이지별 텍스트 캐시 (파일명 -> ((수정 시각, 크기), 페이지 텍스트 목록, sha256))
+PDF_PAGE_CACHE_MAX_FILES = int(os.getenv("PDF_PAGE_CACHE_MAX_FILES", "32"))
+pdf_page_cache: "OrderedDict[str, tuple]" = OrderedDict()
+pdf_page_cache_lock = threading.Lock()
+
+def load_pdf_pages(filename: str) -> Tuple[List[str], str]:
+    """PDF 페이지별 텍스트와 파일 sha256 반환 (파일이 바뀌지 않았으면 다시 추출하지 않음)"""
     pdf_path = PDF_STORAGE_PATH / filename
-    if not pdf_path.exists():
+    if pdf_path.resolve().parent != PDF_STORAGE_PATH.resolve() or not pdf_path.is_file():
         raise HTTPException(status_code=404, detail=f"PDF 파일을 찾을 수 없습니다: {filename}")
     
+    stat = pdf_path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    with pdf_page_cache_lock:
+        entry = pdf_page_cache.get(filename)
+        if entry is not None and entry[0] == version:
+            pdf_page_cache.move_to_end(filename)
+            return entry[1], entry[2]
+    
     try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            content = ""
-            for page in pdf_reader.pages:
-                content += page.extract_text() + "\n"
-        return content.strip()
+        data = pdf_path.read_bytes()
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+        pages = [page.extract_text() or "" for page in pdf_reader.pages]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"PDF 읽기 오류: {str(e)}")
+    digest = hashlib.sha256(data).hexdigest()
+    
+    with pdf_page_cache_lock:
+        pdf_page_cache[filename] = (version, pages, digest)
+        pdf_page_cache.move_to_end(filename)
+        while len(pdf_page_cache) > PDF_PAGE_CACHE_MAX_FILES:
+            pdf_page_cache.popitem(last=False)
+    return pages, digest
+
+# PDF 읽기 함수
+def read_pdf_content(filename: str) -> str:
+    pages, _ = load_pdf_pages(filename)
+    return "\n".join(pages).strip()
+
+# MCP 리소스 (PDF 페이지, DB 테이블) - pdf:///{filename}, db:///{table}
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def parse_range(value: str, total: int, base: int) -> Tuple[int, int]:
+    """범위 문자열("3", "2-4", "5-", "-10") 해석 -> (시작, 끝) 포함 범위 (base: 1이면 페이지/행, 0이면 바이트)
+    
+    "-N"은 HTTP Range의 suffix 형식처럼 마지막 N개를 뜻함
+    """
+    last = total - 1 + base
+    start_text, _, end_text = value.partition("-")
+    try:
+        if not start_text and end_text:
+            count = int(end_text)
+            if count <= 0:
+                raise ValueError(value)
+            start, end = max(base, last - count + 1), last
+        else:
+            start = int(start_text) if start_text else base
+            end = (int(end_text) if end_text else last) if "-" in value else start
+    except ValueError:
+        raise HTTPException(status_code=416, detail=f"범위가 올바르지 않습니다: {value}")
+    end = min(end, last)
+    if start < base or start > end:
+        raise HTTPException(status_code=416, detail=f"범위가 올바르지 않습니다: {value} (전체 {total})")
+    return start, end
+
+def list_database_tables(conn: sqlite3.Connection) -> List[str]:
+    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name")
+    return [row[0] for row in cursor.fetchall()]
+
+def read_table_rows(conn: sqlite3.Connection, table: str) -> List[Dict[str, Any]]:
+    if table not in list_database_tables(conn):
+        raise HTTPException(status_code=404, detail=f"테이블을 찾을 수 없습니다: {table}")
+    cursor = conn.execute(f'SELECT * FROM "{table}" ORDER BY rowid')
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def list_resources() -> List[Dict[str, Any]]:
+    """PDF(문서 + 페이지별)와 DB 테이블 리소스 목록 (sha256으로 변경 여부 확인 가능)"""
+    resources = []
+    for pdf_path in sorted(PDF_STORAGE_PATH.glob("*.pdf")):
+        try:
+            pages, digest = load_pdf_pages(pdf_path.name)
+        except HTTPException as e:
+            print(f"PDF 리소스 목록 제외: {pdf_path.name} ({e.detail})")
+            continue
+        uri = f"pdf:///{quote(pdf_path.name)}"
+        resources.append({
+            "uri": uri,
+            "name": pdf_path.name,
+            "mimeType": "text/plain",
+            "size": pdf_path.stat().st_size,
+            "_meta": {"sha256": digest, "pages": len(pages)}
+        })
+        for number, text in enumerate(pages, start=1):
+            resources.append({
+                "uri": f"{uri}?pages={number}",
+                "name": f"{pdf_path.name} ({number}페이지)",
+                "mimeType": "text/plain",
+                "size": len(text.encode("utf-8")),
+                "_meta": {"sha256": sha256_text(text), "page": number}
+            })
+    
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        for table in list_database_tables(conn):
+            text = json.dumps(read_table_rows(conn, table), ensure_ascii=False)
+            resources.append({
+                "uri": f"db:///{table}",
+                "name": f"{table} 테이블",
+                "mimeType": "application/json",
+                "size": len(text.encode("utf-8")),
+                "_meta": {"sha256": sha256_text(text), "rows": len(json.loads(text))}
+            })
+    finally:
+        conn.close()
+    return resources
+
+def slice_bytes(text: str, byte_range: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+    """UTF-8 바이트 범위로 자르기 (범위 끝에서 잘린 문자는 버림)"""
+    data = text.encode("utf-8")
+    if not byte_range:
+        return text, {}
+    start, end = parse_range(byte_range, len(data), 0)
+    return data[start:end + 1].decode("utf-8", errors="ignore"), {"bytes": f"{start}-{end}", "totalBytes": len(data)}
+
+def read_resource(uri: str) -> List[Dict[str, Any]]:
+    """리소스 읽기 (pages/rows/bytes 범위 지원, 각 항목에 sha256 포함)"""
+    parsed = urlparse(uri)
+    name = unquote(parsed.path.lstrip("/"))
+    query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+    
+    if parsed.scheme == "pdf":
+        pages, digest = load_pdf_pages(name)
+        start, end = parse_range(query.get("pages", "1-"), len(pages), 1)
+        base_uri = f"pdf:///{quote(name)}"
+        if "bytes" not in query:
+            # 페이지마다 별도 항목으로 반환 (클라이언트가 페이지 단위로 캐시)
+            return [{
+                "uri": f"{base_uri}?pages={number}",
+                "mimeType": "text/plain",
+                "text": pages[number - 1],
+                "_meta": {"page": number, "totalPages": len(pages), "sha256": sha256_text(pages[number - 1]), "sourceSha256": digest}
+            } for number in range(start, end + 1)]
+        text, byte_meta = slice_bytes("\n".join(pages[start - 1:end]), query["bytes"])
+        return [{
+            "uri": uri,
+            "mimeType": "text/plain",
+            "text": text,
+            "_meta": {"pages": f"{start}-{end}", "totalPages": len(pages), **byte_meta, "sha256": sha256_text(text), "sourceSha256": digest}
+        }]
+    
+    if parsed.scheme == "db":
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            rows = read_table_rows(conn, name)
+        finally:
+            conn.close()
+        source_digest = sha256_text(json.dumps(rows, ensure_ascii=False))
+        meta = {"totalRows": len(rows), "sourceSha256": source_digest}
+        if "rows" in query:
+            if not rows:
+                raise HTTPException(status_code=416, detail=f"테이블이 비어 있습니다: {name}")
+            start, end = parse_range(query["rows"], len(rows), 1)
+            rows = rows[start - 1:end]
+            meta["rows"] = f"{start}-{end}"
+        text, byte_meta = slice_bytes(json.dumps(rows, ensure_ascii=False), query.get("bytes"))
+        return [{
+            "uri": uri,
+            "mimeType": "application/json",
+            "text": text,
+            "_meta": {**meta, **byte_meta, "sha256": sha256_text(text)}
+        }]
+    
+    raise HTTPException(status_code=404, detail=f"지원하지 않는 리소스입니다: {uri}")
+
+# 코드 검색용 트라이그램 역색인 (미러 저장소의 텍스트 파일 대상)
+class TrigramIndex:
+    """파일별 내용과 트라이그램 -> 경로 집합 역색인, 커밋 단위로 증분 갱신"""
+    
+    def __init__(self):
+        self.commit: Optional[str] = None
+        self.documents: Dict[str, str] = {}  # path -> 소문자 변환 전 내용
+        self.postings: Dict[str, set] = {}  # trigram -> {path}
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def trigrams(text: str) -> set:
+        text = text.lower()
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+    
+    @staticmethod
+    def read_blob_text(blob) -> Optional[str]:
+        """색인 대상 텍스트 파일이면 내용 반환 (바이너리/대용량 파일은 None)"""
+        if blob.type != "blob" or blob.size > CODE_SEARCH_MAX_FILE_BYTES:
+            return None
+        data = blob.data_stream.read()
+        if b"\0" in data[:8192]:
+            return None
+        return data.decode("utf-8", errors="replace")
+    
+    def _add(self, path: str, text: str):
+        self.documents[path] = text
+        for trigram in self.trigrams(text):
+            self.postings.setdefault(trigram, set()).add(path)
+    
+    def _remove(self, path: str):
+        text = self.documents.pop(path, None)
+        if text is None:
+            return
+        for trigram in self.trigrams(text):
+            paths = self.postings.get(trigram)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self.postings[trigram]
+    
+    def update(self, repo) -> int:
+        """HEAD 커밋 기준으로 색인 갱신 (이전 커밋과의 diff만 반영), 변경 파일 수 반환"""
+        head = repo.head.commit
+        if head.hexsha == self.commit:
+            return 0
+        
+        changes: Dict[str, Optional[str]] = {}  # path -> 새 내용 (삭제면 None)
+        if self.commit is None:
+            for item in head.tree.traverse():
+                if item.type == "blob":
+                    changes[item.path] = self.read_blob_text(item)
+        else:
+            for diff in repo.commit(self.commit).diff(head):
+                if diff.a_path:
+                    changes.setdefault(diff.a_path, None)
+                if diff.b_blob is not None:
+                    changes[diff.b_path] = self.read_blob_text(diff.b_blob)
+        
+        with self.lock:
+            for path, text in changes.items():
+                self._remove(path)
+                if text is not None:
+                    self._add(path, text)
+            self.commit = head.hexsha
+        return len(changes)
+    
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """대소문자 구분 없이 query가 포함된 줄 검색"""
+        needle = query.lower()
+        with self.lock:
+            if len(needle) < 3:
+                candidates = set(self.documents)
+            else:
+                # 가장 작은 posting부터 교집합
+                postings = sorted((self.postings.get(t, set()) for t in self.trigrams(needle)), key=len)
+                candidates = set(postings[0]).intersection(*postings[1:]) if postings else set()
+            
+            matches = []
+            for path in sorted(candidates):
+                for line_no, line in enumerate(self.documents[path].splitlines(), 1):
+                    if needle in line.lower():
+                        matches.append({"path": path, "line": line_no, "snippet": line.strip()[:200]})
+                        if len(matches) >= limit:
+                            return matches
+            return matches
+
+# 로컬 git 미러 클래스 (GitHub API 대신 bare 미러의 object database에서 읽기)
+class GitMirror:
+    """저장소 하나의 로컬 bare 미러를 관리"""
+    
+    def __init__(self, repository: str, remote_url: str, mirror_root: Path):
+        self.repository = repository
+        self.remote_url = remote_url
+        self.path = mirror_root / f"{repository.replace('/', '__')}.git"
+        self.repo = None
+        self.last_synced: Optional[float] = None
+        self.lock = threading.Lock()  # gitpython Repo 객체는 스레드 간 공유가 안전하지 않음
+        self.index = TrigramIndex()
+    
+    @property
+    def ready(self) -> bool:
+        return self.repo is not None
+    
+    def sync(self):
+        """미러가 없으면 clone --mirror, 있으면 git fetch"""
+        if self.repo is None and not self.path.exists():
+            print(f"🪞 미러 생성: {self.repository} -> {self.path}")
+            repo = git.Repo.clone_from(self.remote_url, str(self.path), mirror=True, env=mirror_git_env())
+        else:
+            repo = self.repo or git.Repo(str(self.path))
+            if repo.remotes.origin.url != self.remote_url:
+                # 이전 버전이 원격 URL(미러 config)에 넣어 둔 토큰 제거
+                repo.git.remote("set-url", "origin", self.remote_url)
+            repo.git.fetch("--prune", env=mirror_git_env())
+        
+        with self.lock:
+            self.repo = repo
+            changed = self.index.update(repo)
+        self.last_synced = time.time()
+        print(f"🪞 미러 동기화 완료: {self.repository} (색인 변경 파일: {changed}개)")
+    
+    def list_files(self, recursive: bool) -> List[Dict[str, Any]]:
+        """HEAD 트리의 파일 목록 (contents API와 같은 형태)"""
+        with self.lock:
+            tree = self.repo.head.commit.tree
+            items = tree.traverse() if recursive else tree
+            return [
+                {
+                    "name": item.name,
+                    "path": item.path,
+                    "type": "file" if item.type == "blob" else "dir",
+                    "size": item.size if item.type == "blob" else 0
+                }
+                for item in items
+            ]
+    
+    def open_file(self, file_path: str) -> Tuple[str, int, BinaryIO]:
+        """파일 내용을 스풀 파일로 반환 (파일이 없으면 KeyError)"""
+        with self.lock:
+            commit = self.repo.head.commit
+            blob = commit.tree / file_path.strip("/")
+            if blob.type != "blob":
+                raise KeyError(file_path)
+            if blob.size > GITHUB_DOWNLOAD_MAX_BYTES:
+                raise ValueError(f"파일 크기 제한 초과: {blob.size} > {GITHUB_DOWNLOAD_MAX_BYTES} bytes")
+            
+            spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+            blob.stream_data(spool)
+        
+        spool.seek(0)
+        return commit.hexsha, blob.size, spool
+
+# 저장소명 -> GitMirror (로컬 미러 모드에서만 채워짐)
+GIT_MIRRORS: Dict[str, GitMirror] = {}
+
+def get_git_mirror(repository: str) -> Optional[GitMirror]:
+    """동기화가 끝난 미러가 있으면 반환"""
+    mirror = GIT_MIRRORS.get(repository)
+    if mirror is not None and mirror.ready:
+        return mirror
+    return None
+
+def mirror_git_env() -> Dict[str, str]:
+    """미러 clone/fetch용 git 환경 변수
+    
+    토큰은 명령 실행 시 http.extraHeader로만 넘기고 원격 URL이나 미러 config 파일에는 저장하지 않음
+    """
+    token = os.getenv("GITHUB_TOKEN")
+    if not token:
+        return {}
+    username = os.getenv("GITHUB_USERNAME", "x-access-token")
+    credential = base64.b64encode(f"{username}:{token}".encode()).decode()
+    return {
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": "http.extraHeader",
+        "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credential}"
+    }
+
+# 호출자별 미러 접근 확인 결과 (인증 정보+저장소 해시 -> 만료 시각)
+mirror_access_cache: Dict[str, float] = {}
+
+async def check_mirror_access(repository: str, headers: Dict[str, str]) -> Optional[str]:
+    """미러 데이터를 주기 전에 호출자의 GitHub 저장소 접근 권한 확인 (통과하면 None, 아니면 에러 메시지)
+    
+    미러는 서버의 GITHUB_TOKEN으로 받아 두므로 호출자 인증 정보를 따로 확인해야 함.
+    결과는 GIT_MIRROR_ACCESS_TTL_SECONDS 동안 캐시 (shared 모드는 확인하지 않음)
+    """
+    if GIT_MIRROR_ACCESS == "shared":
+        return None
+    key = hashlib.sha256(f"{headers.get('Authorization', '')}\n{repository}".encode()).hexdigest()
+    now = time.time()
+    if mirror_access_cache.get(key, 0) > now:
+        return None
+    
+    response = await github_scheduler.get(f"https://api.github.com/repos/{repository}", headers, priority=GITHUB_PRIORITY_HIGH)
+    if response.status_code == 401:
+        return "GitHub 인증 실패"
+    if response.status_code in (403, 404):
+        return "저장소를 찾을 수 없습니다"
+    if response.status_code != 200:
+        raise HTTPException(status_code=response.status_code, detail=github_error_detail(response))
+    
+    if len(mirror_access_cache) >= 1024:
+        for expired in [k for k, expires_at in mirror_access_cache.items() if expires_at <= now]:
+            del mirror_access_cache[expired]
+    mirror_access_cache[key] = now + GIT_MIRROR_ACCESS_TTL_SECONDS
+    return None
+
+async def git_mirror_refresh_loop():
+    """주기적으로 모든 미러를 git fetch"""
+    while True:
+        for mirror in GIT_MIRRORS.values():
+            try:
+                await asyncio.to_thread(mirror.sync)
+            except Exception as e:
+                print(f"💥 미러 동기화 실패 ({mirror.repository}): {e}")
+        await asyncio.sleep(GIT_MIRROR_REFRESH_SECONDS)
+
+async def start_git_mirrors():
+    """로컬 미러 모드가 켜져 있으면 미러 등록 후 백그라운드 갱신 시작"""
+    if not GIT_MIRROR_ENABLED:
+        return
+    if git is None:
+        print("⚠️ gitpython을 사용할 수 없어 로컬 미러 모드를 비활성화합니다")
+        return
+    
+    GIT_MIRROR_PATH.mkdir(parents=True, exist_ok=True)
+    for repository in GIT_MIRROR_REPOSITORIES:
+        GIT_MIRRORS[repository] = GitMirror(repository, GIT_MIRROR_REMOTE_URL.format(repository=repository), GIT_MIRROR_PATH)
+    
+    print(f"🪞 로컬 미러 모드: {list(GIT_MIRRORS)} ({GIT_MIRROR_REFRESH_SECONDS}초마다 갱신, 접근 확인: {GIT_MIRROR_ACCESS})")
+    app.state.git_mirror_task = asyncio.create_task(git_mirror_refresh_loop())
+
+# 미러에서 파일 하나 읽기
+async def read_mirror_file(mirror: GitMirror, file_path: str) -> Dict[str, Any]:
+    try:
+        commit_sha, size, spool = await asyncio.to_thread(mirror.open_file, file_path)
+    except KeyError:
+        return {"ok": False, "error": f"파일을 찾을 수 없습니다: {file_path}"}
+    
+    with spool:
+        content = await process_file_content(spool, file_path)
+    
+    return {
+        "ok": True,
+        "data": {
+            "repository": mirror.repository,
+            "file": file_path,
+            "content": content,
+            "size": size,
+            "commit": commit_sha
+        }
+    }
+
+# GitHub 단일 파일 조회 함수
+async def fetch_github_file(repository: str, file_path: str, headers: Dict[str, str], priority: int = GITHUB_PRIORITY_NORMAL) -> Dict[str, Any]:
+    """GitHub 저장소의 파일 하나를 가져와 API 응답 형태로 반환"""
+    # 로컬 미러가 있으면 GitHub API 대신 미러에서 읽기
+    mirror = get_git_mirror(repository)
+    if mirror is not None:
+        access_error = await check_mirror_access(repository, headers)
+        if access_error:
+            return {"ok": False, "error": access_error}
+        return await read_mirror_file(mirror, file_path)
+    
+    api_url = f"https://api.github.com/repos/{repository}/contents/{file_path}"
+    
+    response = await github_scheduler.get(api_url, headers, priority=priority)
+    
+    if response.status_code == 404:
+        return {"ok": False, "error": f"파일을 찾을 수 없습니다: {file_path}"}
+    elif response.status_code == 401:
+        return {"ok": False, "error": "GitHub 인증 실패"}
+    elif response.status_code != 200:
+        raise HTTPException(status_code=response.status_code, detail=github_error_detail(response))
+    
+    file_data = response.json()
+    
+    # GitHub API 응답 디버깅
+    print(f"🔍 GitHub API 응답 구조:")
+    print(f"   - encoding: {file_data.get('encoding')}")
+    print(f"   - content 길이: {len(file_data.get('content', ''))}")
+    print(f"   - size: {file_data.get('size')}")
+    print(f"   - type: {file_data.get('type')}")
+    print(f"   - path: {file_data.get('path')}")
+    
+    # 파일 내용 추출
+    if file_data.get("encoding") == "base64":
+        # Base64로 인코딩된 파일 내용
+        file_bytes = base64.b64decode(file_data["content"])
+        print(f"🔍 Base64 인코딩 파일 처리: {file_path}")
+        print(f"📏 파일 크기: {len(file_bytes)} bytes")
+        
+        content = await process_file_content(file_bytes, file_path)
+        
+    elif file_data.get("encoding") == "none":
+        # 파일이 너무 커서 content가 없는 경우 (1MB 이상)
+        print(f"🔍 큰 파일 처리 (encoding: none): {file_path}")
+        print(f"📏 파일 크기: {file_data.get('size')} bytes")
+        
+        # 별도 API 호출로 파일 내용 가져오기
+        download_url = file_data.get("download_url")
+        if download_url:
+            print(f"📥 다운로드 URL로 파일 내용 가져오기: {download_url}")
+            try:
+                download_response = await github_scheduler.get(download_url, headers, priority=GITHUB_PRIORITY_LOW, stream=True)
+                status_code, spool = await asyncio.to_thread(download_to_spool, download_response)
+                if spool is not None:
+                    with spool:
+                        print(f"📥 다운로드 완료: {spool.seek(0, io.SEEK_END)} bytes")
+                        content = await process_file_content(spool, file_path)
+                else:
+                    content = f"[파일 다운로드 실패: HTTP {status_code}]"
+                    print(f"💥 파일 다운로드 실패: {status_code}")
+            except Exception as download_error:
+                content = f"[파일 다운로드 오류: {str(download_error)}]"
+                print(f"💥 파일 다운로드 오류: {str(download_error)}")
+        else:
+            content = "[파일이 너무 커서 내용을 가져올 수 없습니다. GitHub 웹에서 직접 확인해주세요.]"
+            print("⚠️ 다운로드 URL이 없음")
+    else:
+        content = file_data.get("content", "")
+        print(f"⚠️ 알 수 없는 인코딩: {file_data.get('encoding')}")
+    
+    return {
+        "ok": True,
+        "data": {
+            "repository": repository,
+            "file": file_path,
+            "content": content,
+            "size": file_data.get("size", 0)
+        }
+    }
+
+# GitHub 여러 파일 동시 조회 함수
+async def fetch_github_files(repository: str, file_paths: List[str], headers: Dict[str, str]) -> List[Dict[str, Any]]:
+    """여러 파일을 동시에 가져오되 GITHUB_BATCH_CONCURRENCY 개수로 제한"""
+    semaphore = asyncio.Semaphore(GITHUB_BATCH_CONCURRENCY)
+    
+    async def fetch_one(file_path: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                result = await fetch_github_file(repository, file_path, headers, priority=GITHUB_PRIORITY_LOW)
+            except Exception as e:
+                return {"file": file_path, "ok": False, "error": f"GitHub 연결 오류: {str(e)}"}
+        if not result["ok"]:
+            return {"file": file_path, "ok": False, "error": result["error"]}
+        data = result["data"]
+        return {"file": file_path, "ok": True, "content": data["content"], "size": data["size"]}
+    
+    # 입력 순서대로 결과 반환 (파일별 오류는 개별 처리)
+    return await asyncio.gather(*(fetch_one(path) for path in file_paths))
+
+# GitHub 저장소 전체 트리 조회 함수 (Git Trees API 1회 호출)
+async def fetch_github_tree(repository: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """저장소의 모든 파일/디렉토리를 재귀적으로 가져오기"""
+    api_url = f"https://api.github.com/repos/{repository}/git/trees/HEAD?recursive=1"
+    
+    response = await github_scheduler.get(api_url, headers, priority=GITHUB_PRIORITY_HIGH)
+    
+    if response.status_code == 401:
+        return {"ok": False, "error": "GitHub 인증 실패"}
+    elif response.status_code == 404:
+        return {"ok": False, "error": "저장소를 찾을 수 없습니다"}
+    elif response.status_code != 200:
+        raise HTTPException(status_code=response.status_code, detail=github_error_detail(response))
+    
+    tree_data = response.json()
+    files = []
+    
+    for item in tree_data.get("tree", []):
+        files.append({
+            "name": item["path"].rsplit("/", 1)[-1],
+            "path": item["path"],
+            "type": "dir" if item["type"] == "tree" else "file",  # contents API와 동일한 표기
+            "size": item.get("size", 0)
+        })
+    
+    # 항목이 너무 많으면 GitHub이 결과를 잘라서 반환함
+    if tree_data.get("truncated"):
+        print(f"⚠️ 트리 결과가 잘림: {repository}")
+    
+    return {
+        "ok": True,
+        "data": {
+            "repository": repository,
+            "files": files,
+            "truncated": tree_data.get("truncated", False)
+        }
+    }
 
 # API 엔드포인트들
 @app.get("/")
 async def root():
     return {"message": "MCP Backend API Server", "version": "1.0.0"}
 
+def github_auth_headers(username: str, password: str) -> Dict[str, str]:
+    """GitHub API Basic 인증 헤더"""
+    auth_str = base64.b64encode(f"{username}:{password}".encode()).decode()
+    return {
+        "Authorization": f"Basic {auth_str}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+
 @app.post("/api/github")
 async def get_github_content(request: GithubRequest):
     """GitHub 저장소에서 소스코드 가져오기"""
@@ -315,96 +1266,53 @@ async def get_github_content(request: GithubRequest):
             raise HTTPException(status_code=400, detail="Password/Token is required")
             
         # GitHub API 인증 헤더
-        auth_str = base64.b64encode(f"{request.username}:{request.password}".encode()).decode()
-        headers = {
-            "Authorization": f"Basic {auth_str}",
-            "Accept": "application/vnd.github.v3+json"
-        }
+        headers = github_auth_headers(request.username, request.password)
+        
+        mirror = get_git_mirror(request.repository)
+        if mirror is not None:
+            # 미러 데이터는 호출자가 GitHub에서 읽을 수 있는 저장소일 때만 제공
+            access_error = await check_mirror_access(request.repository, headers)
+            if access_error:
+                return {"ok": False, "error": access_error}
         
-        if request.file_path:
+        if request.file_paths:
+            # 여러 파일 내용 동시에 가져오기
+            results = await fetch_github_files(request.repository, request.file_paths, headers)
+            return {
+                "ok": True,
+                "data": {
+                    "repository": request.repository,
+                    "files": results
+                }
+            }
+        elif request.file_path:
             # 특정 파일 내용 가져오기
-            api_url = f"https://api.github.com/repos/{request.repository}/contents/{request.file_path}"
-            
-            # SSL 검증 우회 (로컬 환경에서 인증서 문제 해결)
-            response = requests.get(api_url, headers=headers, verify=False)
-            
-            if response.status_code == 404:
-                return {"ok": False, "error": f"파일을 찾을 수 없습니다: {request.file_path}"}
-            elif response.status_code == 401:
-                return {"ok": False, "error": "GitHub 인증 실패"}
-            elif response.status_code != 200:
-                raise HTTPException(status_code=response.status_code, detail="GitHub API 오류")
-            
-            file_data = response.json()
-            
-            # GitHub API 응답 디버깅
-            print(f"🔍 GitHub API 응답 구조:")
-            print(f"   - encoding: {file_data.get('encoding')}")
-            print(f"   - content 길이: {len(file_data.get('content', ''))}")
-            print(f"   - size: {file_data.get('size')}")
-            print(f"   - type: {file_data.get('type')}")
-            print(f"   - path: {file_data.get('path')}")
-            
-            # 파일 내용 추출
-            if file_data.get("encoding") == "base64":
-                # Base64로 인코딩된 파일 내용
-                file_bytes = base64.b64decode(file_data["content"])
-                print(f"🔍 Base64 인코딩 파일 처리: {request.file_path}")
-                print(f"📏 파일 크기: {len(file_bytes)} bytes")
-                
-                content = await process_file_content(file_bytes, request.file_path)
-                
-            elif file_data.get("encoding") == "none":
-                # 파일이 너무 커서 content가 없는 경우 (1MB 이상)
-                print(f"🔍 큰 파일 처리 (encoding: none): {request.file_path}")
-                print(f"📏 파일 크기: {file_data.get('size')} bytes")
-                
-                # 별도 API 호출로 파일 내용 가져오기
-                download_url = file_data.get("download_url")
-                if download_url:
-                    print(f"📥 다운로드 URL로 파일 내용 가져오기: {download_url}")
-                    try:
-                        # SSL 검증 우회 (로컬 환경에서 인증서 문제 해결)
-                        download_response = requests.get(download_url, headers=headers, verify=False)
-                        if download_response.status_code == 200:
-                            file_bytes = download_response.content
-                            print(f"📥 다운로드 완료: {len(file_bytes)} bytes")
-                            content = await process_file_content(file_bytes, request.file_path)
-                        else:
-                            content = f"[파일 다운로드 실패: HTTP {download_response.status_code}]"
-                            print(f"💥 파일 다운로드 실패: {download_response.status_code}")
-                    except Exception as download_error:
-                        content = f"[파일 다운로드 오류: {str(download_error)}]"
-                        print(f"💥 파일 다운로드 오류: {str(download_error)}")
-                else:
-                    content = "[파일이 너무 커서 내용을 가져올 수 없습니다. GitHub 웹에서 직접 확인해주세요.]"
-                    print("⚠️ 다운로드 URL이 없음")
-            else:
-                content = file_data.get("content", "")
-                print(f"⚠️ 알 수 없는 인코딩: {file_data.get('encoding')}")
-            
+            return await fetch_github_file(request.repository, request.file_path, headers)
+        elif mirror is not None:
+            # 로컬 미러에서 파일 목록 가져오기
+            files = await asyncio.to_thread(mirror.list_files, bool(request.recursive))
             return {
                 "ok": True,
                 "data": {
                     "repository": request.repository,
-                    "file": request.file_path,
-                    "content": content,
-                    "size": file_data.get("size", 0)
+                    "files": files
                 }
             }
+        elif request.recursive:
+            # 저장소 전체 트리 가져오기
+            return await fetch_github_tree(request.repository, headers)
         else:
             # 저장소 파일 목록 가져오기
             api_url = f"https://api.github.com/repos/{request.repository}/contents"
             
-            # SSL 검증 우회 (로컬 환경에서 인증서 문제 해결)
-            response = requests.get(api_url, headers=headers, verify=False)
+            response = await github_scheduler.get(api_url, headers, priority=GITHUB_PRIORITY_HIGH)
             
             if response.status_code == 401:
                 return {"ok": False, "error": "GitHub 인증 실패"}
             elif response.status_code == 404:
                 return {"ok": False, "error": "저장소를 찾을 수 없습니다"}
             elif response.status_code != 200:
-                raise HTTPException(status_code=response.status_code, detail="GitHub API 오류")
+                raise HTTPException(status_code=response.status_code, detail=github_error_detail(response))
             
             files_data = response.json()
             files = []
@@ -508,11 +1416,35 @@ async def get_database_content(request: DatabaseRequest):
     except Exception as e:
         return {"ok": False, "error": f"데이터베이스 오류: {str(e)}"}
 
+@app.post("/api/resources/list")
+async def get_resource_list():
+    """MCP 리소스 목록 (PDF 문서/페이지, DB 테이블)"""
+    try:
+        resources = await asyncio.to_thread(list_resources)
+        return {"ok": True, "data": {"resources": resources}}
+    except Exception as e:
+        return {"ok": False, "error": f"리소스 목록 오류: {str(e)}"}
+
+@app.post("/api/resources/read")
+async def get_resource(request: ResourceReadRequest):
+    """MCP 리소스 읽기 (페이지/행/바이트 범위)"""
+    try:
+        contents = await asyncio.to_thread(read_resource, request.uri)
+        return {"ok": True, "data": {"contents": contents}}
+    except HTTPException as e:
+        return {"ok": False, "error": e.detail, "status": e.status_code}
+    except Exception as e:
+        return {"ok": False, "error": f"리소스 읽기 오류: {str(e)}"}
 
 # 헬스체크
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "pdf_path": str(PDF_STORAGE_PATH.absolute())}
+    # capabilities: MCP 서버가 도구 노출 여부를 정할 때 사용 (code_search는 준비된 로컬 미러가 있을 때만)
+    return {
+        "status": "healthy",
+        "pdf_path": str(PDF_STORAGE_PATH.absolute()),
+        "capabilities": {"code_search": any(mirror.ready for mirror in GIT_MIRRORS.values())}
+    }
 
 @app.post("/health")
 async def health_check_post():
@@ -523,6 +1455,61 @@ async def health_check_post():
 async def api_health_check():
     return {"ok": True, "data": {"status": "healthy", "pdf_path": str(PDF_STORAGE_PATH.absolute())}}
 
+@app.post("/api/search")
+async def search_code(request: SearchRequest):
+    """미러 저장소 코드 검색 (트라이그램 색인)"""
+    # 빈 검색어는 모든 줄과 일치하고, 0 이하 limit은 의미가 없으므로 색인 조회 전에 거절
+    if not request.query.strip():
+        raise HTTPException(status_code=400, detail="Query is required")
+    if request.limit is not None and request.limit <= 0:
+        raise HTTPException(status_code=400, detail="Limit must be a positive integer")
+    try:
+        if request.repository:
+            mirror = get_git_mirror(request.repository)
+            mirrors = [mirror] if mirror is not None else []
+        else:
+            mirrors = [m for m in GIT_MIRRORS.values() if m.ready]
+        
+        if mirrors and GIT_MIRROR_ACCESS != "shared":
+            # 호출자가 GitHub에서 읽을 수 있는 저장소만 검색
+            if not (request.username and request.password):
+                return {"ok": False, "error": "미러 저장소 검색에는 GitHub 인증 정보(username, password)가 필요합니다"}
+            headers = github_auth_headers(request.username, request.password)
+            allowed = []
+            for mirror in mirrors:
+                if await check_mirror_access(mirror.repository, headers) is None:
+                    allowed.append(mirror)
+            mirrors = allowed
+        
+        if not mirrors:
+            return {"ok": False, "error": "검색 가능한 저장소가 없습니다 (로컬 미러 모드가 필요합니다)"}
+        
+        started = time.perf_counter()
+        limit = request.limit or CODE_SEARCH_DEFAULT_LIMIT
+        matches = []
+        for mirror in mirrors:
+            for match in mirror.index.search(request.query, limit - len(matches)):
+                matches.append({"repository": mirror.repository, **match})
+            if len(matches) >= limit:
+                break
+        
+        return {
+            "ok": True,
+            "data": {
+                "query": request.query,
+                "matches": matches,
+                "count": len(matches),
+                "took_ms": round((time.perf_counter() - started) * 1000, 2)
+            }
+        }
+    except Exception as e:
+        return {"ok": False, "error": f"코드 검색 오류: {str(e)}"}
+
+# GitHub 요청 스케줄러 상태 (큐 깊이, rate limit)
+@app.get("/api/github/scheduler")
+async def github_scheduler_status():
+    return {"ok": True, "data": github_scheduler.snapshot()}
+
 # MCP API 엔드포인트들
 @app.get("/api/mcp/tools")
 async def get_mcp_tools_endpoint():
@@ -541,6 +1528,11 @@ async def get_mcp_tools_endpoint():
         print(f"MCP 도구 목록 조회 API 에러: {e}")
         return {"ok": False, "error": f"MCP 서버 연결 실패: {str(e)}"}
 
+@app.get("/api/mcp/pool")
+async def get_mcp_pool_status():
+    """MCP 세션 풀 상태"""
+    return {"ok": True, "data": {"sessions": mcp_pool.snapshot(), "tools_cached": mcp_pool.tools_cache is not None}}
+
 @app.post("/api/mcp/call")
 async def call_mcp_tool_endpoint(request: dict):
     """MCP 서버의 도구를 실행합니다"""
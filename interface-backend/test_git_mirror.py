@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+로컬 git 미러 모드 오프라인 테스트 (그 자리에서 만든 저장소 사용, 네트워크 불필요)
+
+    python -m pytest test_git_mirror.py
+"""
+
+import time
+from pathlib import Path
+
+import git
+from fastapi.testclient import TestClient
+
+REPOSITORY = "owner/demo"
+TOKEN = "server-token-must-not-be-saved"
+
+
+def make_source_repo(root: Path) -> Path:
+    """미러 원본으로 쓸 로컬 저장소 생성"""
+    path = root / "source"
+    repo = git.Repo.init(path)
+    (path / "src").mkdir()
+    (path / "README.md").write_text("# 데모 저장소\n", encoding="utf-8")
+    (path / "src" / "settings.py").write_text("DB_HOST = 'localhost'\nDB_PORT = 5432\n", encoding="utf-8")
+    repo.index.add(["README.md", "src/settings.py"])
+    actor = git.Actor("tester", "tester@example.com")
+    repo.index.commit("init", author=actor, committer=actor)
+    return path
+
+
+def load_mirror_backend(load_backend, root: Path, access: str):
+    """미러 모드 환경 변수로 main 모듈 로드"""
+    return load_backend(
+        GIT_MIRROR_ENABLED="true",
+        GIT_MIRROR_PATH=str(root / f"mirrors-{access}"),
+        GIT_MIRROR_REPOSITORIES=REPOSITORY,
+        GIT_MIRROR_REMOTE_URL=str(root / "source"),
+        GIT_MIRROR_ACCESS=access,
+        GITHUB_TOKEN=TOKEN,
+    )
+
+
+def wait_for_mirror(main):
+    for _ in range(100):
+        mirror = main.get_git_mirror(REPOSITORY)
+        if mirror is not None:
+            return mirror
+        time.sleep(0.1)
+    raise AssertionError("미러가 준비되지 않았습니다")
+
+
+def github_request(**extra):
+    return {"repository": REPOSITORY, "username": "tester", "password": "ghp_caller", **extra}
+
+
+def test_shared_mode(load_backend, tmp_path):
+    make_source_repo(tmp_path)
+    main = load_mirror_backend(load_backend, tmp_path, "shared")
+    with TestClient(main.app) as client:
+        mirror = wait_for_mirror(main)
+        assert client.get("/health").json()["capabilities"] == {"code_search": True}
+
+        listing = client.post("/api/github", json=github_request(recursive=True)).json()
+        assert listing["ok"], listing
+        assert {f["path"] for f in listing["data"]["files"]} >= {"README.md", "src/settings.py"}
+
+        file_data = client.post("/api/github", json=github_request(file_path="src/settings.py")).json()
+        assert file_data["ok"], file_data
+        assert "DB_HOST" in file_data["data"]["content"]
+        assert file_data["data"]["commit"] == mirror.repo.head.commit.hexsha
+
+        search = client.post("/api/search", json={"query": "db_host"}).json()
+        assert search["ok"] and search["data"]["matches"][0]["path"] == "src/settings.py", search
+
+        # 빈 검색어와 0 이하 limit은 400
+        assert client.post("/api/search", json={"query": "  "}).status_code == 400
+        assert client.post("/api/search", json={"query": "db_host", "limit": 0}).status_code == 400
+        assert client.post("/api/search", json={"query": "db_host", "limit": -1}).status_code == 400
+
+        # 서버 토큰은 미러 config에 남지 않아야 함
+        assert TOKEN not in (mirror.path / "config").read_text()
+
+
+def test_verify_mode(load_backend, monkeypatch, tmp_path):
+    make_source_repo(tmp_path)
+    main = load_mirror_backend(load_backend, tmp_path, "verify")
+
+    # GitHub 권한 확인 응답 흉내 (ghp_caller만 저장소를 읽을 수 있음)
+    checked = []
+
+    class Response:
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    async def fake_get(url, headers, priority=None):
+        checked.append(url)
+        allowed = headers == main.github_auth_headers("tester", "ghp_caller")
+        return Response(200 if allowed else 401)
+
+    monkeypatch.setattr(main.github_scheduler, "get", fake_get)
+
+    with TestClient(main.app) as client:
+        wait_for_mirror(main)
+
+        denied = client.post("/api/github", json=github_request(file_path="README.md", password="ghp_wrong")).json()
+        assert denied == {"ok": False, "error": "GitHub 인증 실패"}, denied
+
+        allowed = client.post("/api/github", json=github_request(file_path="README.md")).json()
+        assert allowed["ok"], allowed
+        client.post("/api/github", json=github_request(file_path="src/settings.py"))
+        assert checked.count(f"https://api.github.com/repos/{REPOSITORY}") == 2  # 통과한 인증 정보는 캐시
+
+        no_credentials = client.post("/api/search", json={"query": "db_host"}).json()
+        assert not no_credentials["ok"], no_credentials
+
+        search = client.post("/api/search", json={"query": "db_host", "username": "tester", "password": "ghp_caller"}).json()
+        assert search["ok"] and search["data"]["count"] == 1, search
+
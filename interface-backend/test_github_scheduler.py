@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+GitHub 요청 스케줄러 오프라인 테스트 (requests.get 응답 흉내, 네트워크 불필요)
+
+    python -m pytest test_github_scheduler.py
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from requests.structures import CaseInsensitiveDict
+
+URL = "https://api.github.com/repos/owner/demo"
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers=None, text: str = ""):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.text = text
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def stub_github(monkeypatch, main, responses, delay: float = 0.0):
+    """requests.get을 흉내 (responses를 순서대로 돌려주고 호출 시각과 인증 헤더를 기록)"""
+    calls = []
+    lock = threading.Lock()
+
+    def fake_get(url, headers, stream, timeout, **kwargs):
+        time.sleep(delay)
+        with lock:
+            calls.append((time.time(), headers.get("Authorization")))
+            return responses.pop(0)
+
+    monkeypatch.setattr(main.requests, "get", fake_get)
+    return calls
+
+
+def make_scheduler(main):
+    return main.GitHubScheduler(workers=2, max_retries=2, max_wait=5.0, queue_timeout=5.0)
+
+
+def test_parse_retry_after_accepts_seconds_and_http_date(load_backend):
+    main = load_backend()
+    assert main.parse_retry_after("3") == 3.0
+    assert main.parse_retry_after("-1") == 0.0
+    assert main.parse_retry_after("not a date") is None
+
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 28 <= main.parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+    assert main.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # 지난 시각은 바로 재시도
+
+
+def test_429_waits_for_retry_after(load_backend, monkeypatch):
+    main = load_backend()
+    retry_at = (datetime.now(timezone.utc) + timedelta(seconds=1.5)).replace(microsecond=0)
+    limited = FakeResponse(429, {"Retry-After": format_datetime(retry_at, usegmt=True)})
+    calls = stub_github(monkeypatch, main, [limited, FakeResponse(200)])
+    scheduler = make_scheduler(main)
+
+    response = asyncio.run(scheduler.get(URL, {"Authorization": "token a"}))
+
+    # HTTP-date 형식의 Retry-After까지 기다렸다가 다시 요청하고, 한도 응답은 닫음
+    assert response.status_code == 200
+    assert len(calls) == 2 and calls[1][0] >= retry_at.timestamp() - 0.01
+    assert limited.closed
+    assert scheduler.stats["rate_limited"] == 1 and scheduler.stats["retries"] == 1
+
+
+def test_exhausted_rate_limit_defers_only_that_credential(load_backend, monkeypatch):
+    main = load_backend()
+    reset = time.time() + 0.5
+    exhausted = FakeResponse(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)})
+    calls = stub_github(monkeypatch, main, [exhausted, FakeResponse(200), FakeResponse(200)])
+    scheduler = make_scheduler(main)
+
+    async def run():
+        first = await scheduler.get(URL, {"Authorization": "token a"})
+        # 한도가 0인 인증 정보의 다음 요청은 reset까지 미뤄지고, 다른 인증 정보는 바로 처리
+        blocked = asyncio.ensure_future(scheduler.get(f"{URL}/contents", {"Authorization": "token a"}))
+        other = await scheduler.get(f"{URL}/contents", {"Authorization": "token b"})
+        assert not blocked.done() and scheduler.deferred == 1
+        return first, other, await blocked
+
+    first, other, blocked = asyncio.run(run())
+
+    assert [response.status_code for response in (first, other, blocked)] == [200, 200, 200]
+    assert [authorization for _, authorization in calls] == ["token a", "token b", "token a"]
+    assert calls[2][0] >= reset - 0.01
+    assert scheduler.deferred == 0
+
+
+def test_duplicate_requests_are_coalesced(load_backend, monkeypatch):
+    main = load_backend()
+    calls = stub_github(monkeypatch, main, [FakeResponse(200), FakeResponse(200)], delay=0.1)
+    scheduler = make_scheduler(main)
+
+    async def run():
+        same = [scheduler.get(URL, {"Authorization": "token a"}) for _ in range(3)]
+        other_credential = scheduler.get(URL, {"Authorization": "token b"})
+        return await asyncio.gather(*same, other_credential)
+
+    responses = asyncio.run(run())
+
+    # 같은 인증 정보의 같은 URL은 한 번만 요청하고 응답을 공유 (인증 정보가 다르면 따로 요청)
+    assert len(calls) == 2
+    assert responses[0] is responses[1] is responses[2]
+    assert responses[3] is not responses[0]
+    assert scheduler.stats["coalesced"] == 2
+    assert scheduler.inflight == {}
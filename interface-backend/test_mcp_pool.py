@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+MCP 세션 풀 하위 프로세스 설정 테스트 (MCP 서버 대신 환경 변수를 기록하는 스크립트 실행)
+
+    python -m pytest test_mcp_pool.py
+"""
+
+import asyncio
+import json
+
+from mcp.client.stdio import stdio_client
+
+PROBE_SCRIPT = """
+import json, os, sys
+keys = ["INTERFACE_BACKEND_URL", "GITHUB_TOKEN", "BREAKER_OPEN_SECONDS"]
+with open(os.environ["ENV_PROBE_OUTPUT"], "w") as f:
+    json.dump({"args": sys.argv[1:], "env": {key: os.environ.get(key) for key in keys}}, f)
+"""
+
+
+def test_child_process_inherits_server_settings(load_backend, tmp_path):
+    script = tmp_path / "probe.py"
+    script.write_text(PROBE_SCRIPT, encoding="utf-8")
+    output = tmp_path / "env.json"
+    main = load_backend(
+        MCP_SERVER_PATH=str(script),
+        ENV_PROBE_OUTPUT=str(output),
+        INTERFACE_BACKEND_URL="http://localhost:9102",
+        GITHUB_TOKEN="ghp_parent",
+        BREAKER_OPEN_SECONDS="3",
+    )
+
+    async def run():
+        async with stdio_client(main.mcp_server_params()):
+            for _ in range(100):
+                if output.exists() and output.stat().st_size:
+                    return json.loads(output.read_text(encoding="utf-8"))
+                await asyncio.sleep(0.05)
+        raise AssertionError("하위 프로세스가 실행되지 않았습니다")
+
+    # 부모 프로세스의 MCP 서버 설정이 풀의 하위 프로세스까지 전달됨
+    probe = asyncio.run(run())
+    assert probe["args"] == ["--stdio"]
+    assert probe["env"] == {
+        "INTERFACE_BACKEND_URL": "http://localhost:9102",
+        "GITHUB_TOKEN": "ghp_parent",
+        "BREAKER_OPEN_SECONDS": "3",
+    }
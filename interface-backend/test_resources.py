@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+MCP 리소스 범위 해석과 읽기 오프라인 테스트 (임시 디렉터리의 PDF/DB 사용)
+
+    python -m pytest test_resources.py
+"""
+
+import sqlite3
+
+import pytest
+from fastapi import HTTPException
+
+
+def range_status(main, value: str, total: int, base: int) -> int:
+    with pytest.raises(HTTPException) as error:
+        main.parse_range(value, total, base)
+    return error.value.status_code
+
+
+def test_parse_range_forms(load_backend):
+    main = load_backend()
+    # 페이지/행 (1부터)
+    assert main.parse_range("3", 10, 1) == (3, 3)
+    assert main.parse_range("2-4", 10, 1) == (2, 4)
+    assert main.parse_range("5-", 10, 1) == (5, 10)
+    assert main.parse_range("-3", 10, 1) == (8, 10)
+    assert main.parse_range("-30", 10, 1) == (1, 10)  # 전체보다 많으면 전체
+    assert main.parse_range("8-20", 10, 1) == (8, 10)  # 끝은 전체 범위로 자름
+    # 바이트 (0부터)
+    assert main.parse_range("0-1023", 100, 0) == (0, 99)
+    assert main.parse_range("-10", 100, 0) == (90, 99)
+    assert main.parse_range("99-", 100, 0) == (99, 99)
+
+
+@pytest.mark.parametrize("value", ["0", "11", "11-", "5-3", "0-2", "-0", "abc", "1-x", "--3", "1-2-3"])
+def test_parse_range_rejects_out_of_range_and_malformed(load_backend, value):
+    main = load_backend()
+    assert range_status(main, value, 10, 1) == 416
+
+
+def test_read_resource_slices_pages_rows_and_bytes(load_backend, monkeypatch, tmp_path):
+    main = load_backend()
+    pages = ["첫 페이지", "둘째 페이지", "셋째 페이지"]
+    monkeypatch.setattr(main, "load_pdf_pages", lambda filename: (pages, "digest"))
+
+    contents = main.read_resource("pdf:///guide.pdf?pages=-2")
+    assert [item["_meta"]["page"] for item in contents] == [2, 3]
+    assert contents[0]["text"] == "둘째 페이지" and contents[0]["uri"] == "pdf:///guide.pdf?pages=2"
+
+    # 바이트 범위는 UTF-8 기준, 잘린 문자는 버림
+    contents = main.read_resource("pdf:///guide.pdf?pages=1&bytes=0-4")
+    assert contents[0]["text"] == "첫 " and contents[0]["_meta"]["bytes"] == "0-4"  # "페"의 첫 바이트만 남으므로 버림
+
+    db_path = tmp_path / "resources.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE items (id INTEGER, name TEXT)")
+    conn.executemany("INSERT INTO items VALUES (?, ?)", [(number, f"item-{number}") for number in range(1, 6)])
+    conn.execute("CREATE TABLE empty (id INTEGER)")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(main, "DB_PATH", db_path)
+
+    contents = main.read_resource("db:///items?rows=2-3")
+    assert contents[0]["_meta"]["rows"] == "2-3" and contents[0]["_meta"]["totalRows"] == 5
+    assert '"item-2"' in contents[0]["text"] and '"item-4"' not in contents[0]["text"]
+    assert main.read_resource("db:///items?rows=-1")[0]["_meta"]["rows"] == "5-5"
+
+    for uri in ("db:///items?rows=6", "db:///empty?rows=1", "pdf:///guide.pdf?pages=4"):
+        with pytest.raises(HTTPException) as error:
+            main.read_resource(uri)
+        assert error.value.status_code == 416, uri
+
+
+@pytest.mark.parametrize("uri", [
+    "pdf:///../secret.pdf",
+    "pdf:///%2E%2E/secret.pdf",
+    "pdf:///..%2Fsecret.pdf",
+    "pdf:///nested/inner.pdf",
+    "pdf:///%2Ftmp%2Fsecret.pdf",
+    "db:///sqlite_master",
+    "ftp:///secret.pdf",
+])
+def test_read_resource_rejects_paths_outside_storage(load_backend, monkeypatch, tmp_path, uri):
+    main = load_backend()
+    storage = tmp_path / "pdfs"
+    (storage / "nested").mkdir(parents=True)
+    (storage / "nested" / "inner.pdf").write_bytes(b"%PDF-1.4")
+    (tmp_path / "secret.pdf").write_bytes(b"%PDF-1.4")
+    monkeypatch.setattr(main, "PDF_STORAGE_PATH", storage)
+    monkeypatch.setattr(main, "DB_PATH", tmp_path / "empty.db")
+
+    # 저장 디렉터리 밖이나 하위 디렉터리 파일, 시스템 테이블, 모르는 scheme은 모두 404
+    with pytest.raises(HTTPException) as error:
+        main.read_resource(uri)
+    assert error.value.status_code == 404
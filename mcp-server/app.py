@@ -2,18 +2,178 @@
 Standard MCP Server with JSON-RPC 2.0 Protocol
 Implements Model Context Protocol specification
 """
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Any, Dict, List, Optional, Union
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional, Union, Tuple
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from collections import OrderedDict, deque
+from urllib.parse import parse_qsl, urlencode, quote, urlparse, unquote
 import json
+import asyncio
+import codecs
+import hashlib
+import math
+import random
 import httpx
 import uuid
 import os
+import sys
+import time
 import traceback
 
+try:
+    import orjson  # 빠른 JSON 파서/직렬화 (선택)
+except ImportError:
+    orjson = None
+
+# 업스트림(내부 API 서버) 설정 - 복제본이 여러 개면 쉼표로 구분
+UPSTREAMS = {
+    "interface": [
+        url.strip()
+        for url in os.getenv("INTERFACE_BACKEND_URLS", os.getenv("INTERFACE_BACKEND_URL", "http://localhost:9002")).split(",")
+        if url.strip()
+    ],
+}
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "30"))
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "5"))
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+UPSTREAM_MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "20"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+
+# 복제본 헬스체크 (GET /health 주기, 연속 실패 몇 번이면 제외할지)
+UPSTREAM_HEALTH_CHECK_SECONDS = float(os.getenv("UPSTREAM_HEALTH_CHECK_SECONDS", "10"))
+UPSTREAM_HEALTH_TIMEOUT = float(os.getenv("UPSTREAM_HEALTH_TIMEOUT", "3"))
+UPSTREAM_HEALTH_FAILURES = int(os.getenv("UPSTREAM_HEALTH_FAILURES", "2"))
+
+# JSON-RPC 배치 요청 동시 처리 수 제한
+JSONRPC_BATCH_CONCURRENCY = int(os.getenv("JSONRPC_BATCH_CONCURRENCY", "8"))
+
+# SSE 스트리밍 응답에서 진행 상황 알림 간격 (초)
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "1"))
+
+# structuredContent가 있을 때 text 블록에 넣을 최대 글자 수 (전체 결과는 structuredContent로만 보냄)
+# initialize에서 capabilities.experimental.fullTextContent를 보낸 클라이언트는 text에도 전체 본문을 받음
+TOOL_TEXT_SUMMARY_CHARS = int(os.getenv("TOOL_TEXT_SUMMARY_CHARS", "1000"))
+
+# 도구 결과 캐시 메모리 한도 (text + structuredContent 직렬화 크기 기준 근사치)
+TOOL_CACHE_MAX_BYTES = int(os.getenv("TOOL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# 도구별 동시 실행 제한 기본값 (TOOLS에 "limits"가 없는 도구에 적용)
+TOOL_DEFAULT_CONCURRENCY = int(os.getenv("TOOL_DEFAULT_CONCURRENCY", "8"))
+TOOL_DEFAULT_QUEUE_SIZE = int(os.getenv("TOOL_DEFAULT_QUEUE_SIZE", "32"))
+TOOL_DEFAULT_MAX_WAIT_SECONDS = float(os.getenv("TOOL_DEFAULT_MAX_WAIT_SECONDS", "10"))
+
+# 업스트림별 서킷 브레이커 (최근 호출 중 실패/느린 호출 비율이 높으면 잠시 차단)
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "10"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "15"))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "1"))
+
+# 멱등 도구 헤지 요청 (첫 요청이 p95보다 늦으면 같은 요청을 한 번 더 보내고 먼저 온 응답 사용)
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "true").lower() == "true"
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "0.05"))
+
+# HTTP 세션(Mcp-Session-Id) 유휴 만료 시간 (초)
+HTTP_SESSION_IDLE_SECONDS = float(os.getenv("HTTP_SESSION_IDLE_SECONDS", "3600"))
+
+# 같은 호스트의 클라이언트용 Unix 도메인 소켓 경로 (비어 있으면 사용 안 함)
+MCP_UNIX_SOCKET = os.getenv("MCP_UNIX_SOCKET", "")
+
+# stdio / Unix 소켓 전송에서 메시지(한 줄) 최대 크기
+MCP_STREAM_LIMIT = int(os.getenv("MCP_STREAM_LIMIT", str(64 * 1024 * 1024)))
+
+# 도구별 위임 대상 (업스트림 이름, 경로)
+TOOL_ROUTES = {
+    "read_pdf": ("interface", "/api/pdf"),
+    "query_database": ("interface", "/api/database"),
+    "github_repository_info": ("interface", "/api/github"),
+    "search_code": ("interface", "/api/search"),
+    "system_health": ("interface", "/api/health"),
+}
+
+# GitHub 인증 정보(username, password)를 인자로 받는 도구 (<GITHUB_USERNAME>, <GITHUB_PAT> 플레이스홀더를 서버에서 치환)
+GITHUB_CREDENTIAL_TOOLS = {"github_repository_info", "search_code"}
+
+# 같은 인자 값이면 같은 복제본으로 보내는 도구 (복제본별 PDF 캐시 적중률 유지)
+TOOL_AFFINITY_ARGS = {
+    "read_pdf": "filename",
+}
+
+# 리소스 메서드별 위임 대상 (업스트림 이름, 경로)
+RESOURCE_ROUTES = {
+    "resources/list": ("interface", "/api/resources/list"),
+    "resources/read": ("interface", "/api/resources/read"),
+}
+
+# 리소스 URI 템플릿 (RFC 6570)
+RESOURCE_TEMPLATES = [
+    {
+        "uriTemplate": "pdf:///{filename}{?pages,bytes}",
+        "name": "PDF 문서 / 페이지 범위",
+        "description": "PDF 텍스트. pages=3 또는 pages=2-4로 페이지 범위를, bytes=0-4095로 UTF-8 바이트 범위를 지정 (바이트 범위가 없으면 페이지별 항목으로 반환)",
+        "mimeType": "text/plain"
+    },
+    {
+        "uriTemplate": "db:///{table}{?rows,bytes}",
+        "name": "DB 테이블 / 행 범위",
+        "description": "테이블 행(JSON 배열). rows=1-10으로 행 범위를, bytes로 UTF-8 바이트 범위를 지정",
+        "mimeType": "application/json"
+    }
+]
+
+# 복제본별 공용 HTTP 클라이언트 생성/정리 (연결 재사용) + 주기적 헬스체크
+@asynccontextmanager
+async def upstream_clients():
+    limits = httpx.Limits(
+        max_connections=UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+        keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY
+    )
+    timeout = httpx.Timeout(UPSTREAM_TIMEOUT, connect=UPSTREAM_CONNECT_TIMEOUT)
+    replicas = [replica for group in upstream_replicas.values() for replica in group]
+    for replica in replicas:
+        replica.client = httpx.AsyncClient(base_url=replica.url, limits=limits, timeout=timeout)
+    
+    async def probe_loop():
+        while True:
+            before = [tool["name"] for tool in advertised_tools()]
+            await asyncio.gather(*(replica.probe() for replica in replicas))
+            after = [tool["name"] for tool in advertised_tools()]
+            if after != before:
+                print(f"🔧 도구 목록 변경: {after}")
+                notify_tools_list_changed()
+            await asyncio.sleep(UPSTREAM_HEALTH_CHECK_SECONDS)
+    
+    probe_task = asyncio.create_task(probe_loop())
+    try:
+        yield
+    finally:
+        probe_task.cancel()
+        for replica in replicas:
+            await replica.client.aclose()
+            replica.client = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with upstream_clients():
+        # HTTP와 함께 같은 디스패처를 Unix 도메인 소켓으로도 제공
+        unix_server = await start_unix_server(MCP_UNIX_SOCKET) if MCP_UNIX_SOCKET else None
+        try:
+            yield
+        finally:
+            if unix_server is not None:
+                unix_server.close()
+                await unix_server.wait_closed()
+                if os.path.exists(MCP_UNIX_SOCKET):
+                    os.unlink(MCP_UNIX_SOCKET)
+
 # FastAPI 앱 생성
-app = FastAPI(title="MCP Server (JSON-RPC 2.0)", version="2.0.0")
+app = FastAPI(title="MCP Server (JSON-RPC 2.0)", version="2.0.0", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -22,20 +182,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Mcp-Session-Id"],
 )
 
-# JSON-RPC 2.0 요청/응답 모델
-class JSONRPCRequest(BaseModel):
-    jsonrpc: str = "2.0"
-    method: str
-    params: Optional[Dict[str, Any]] = {}
-    id: Optional[Union[str, int]] = None
+# JSON 처리 (orjson이 있으면 사용, 없으면 표준 json)
+def json_loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys).encode()
 
-class JSONRPCResponse(BaseModel):
-    jsonrpc: str = "2.0"
-    result: Optional[Any] = None
-    error: Optional[Dict[str, Any]] = None
-    id: Optional[Union[str, int]] = None
+def json_response(obj: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """jsonable_encoder를 거치지 않고 바로 직렬화한 JSON 응답"""
+    return Response(content=json_dumps(obj), media_type="application/json", status_code=status_code, headers=headers)
 
 # MCP 표준 도구 정의 (OpenAI 호환 형식 유지)
 TOOLS = [
@@ -52,7 +215,10 @@ TOOLS = [
                 }
             },
             "required": ["filename"]
-        }
+        },
+        "cache": {"ttl": 600},
+        "limits": {"concurrency": 4, "queue": 16, "max_wait": 10},
+        "idempotent": True
     },
     {
         "name": "query_database",
@@ -72,7 +238,10 @@ TOOLS = [
                 }
             },
             "required": ["table"]
-        }
+        },
+        "cache": {"ttl": 60},
+        "limits": {"concurrency": 8, "queue": 32, "max_wait": 5},
+        "idempotent": True
     },
     {
         "name": "github_repository_info",
@@ -95,10 +264,57 @@ TOOLS = [
                 "file_path": {
                     "type": "string",
                     "description": "읽을 파일 경로 (예: API_가이드, GIT_가이드)"
+                },
+                "file_paths": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "동시에 읽을 여러 파일 경로 목록 (file_path 대신 사용)"
+                },
+                "recursive": {
+                    "type": "boolean",
+                    "description": "true이면 file_path 없이 저장소 전체 파일 트리를 조회"
                 }
             },
             "required": ["repository", "username", "password"]
-        }
+        },
+        # 인증 정보가 캐시 키에 포함되므로 다른 자격 증명 간에는 공유되지 않음
+        "cache": {"ttl": 120},
+        "limits": {"concurrency": 4, "queue": 32, "max_wait": 15}
+    },
+    {
+        "name": "search_code",
+        "description": "미러링된 GitHub 저장소의 코드에서 문자열을 검색합니다 (경로, 줄 번호, 해당 줄 반환)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "검색할 문자열 (대소문자 구분 없음)"
+                },
+                "repository": {
+                    "type": "string",
+                    "description": "검색할 저장소명 (생략 시 전체 저장소, 예: hli-yohan-lee/dev-guide)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "최대 결과 수 (기본 50)"
+                },
+                "username": {
+                    "type": "string",
+                    "description": "GitHub 사용자명 (저장소 접근 권한 확인용)"
+                },
+                "password": {
+                    "type": "string",
+                    "description": "GitHub Personal Access Token"
+                }
+            },
+            "required": ["query"]
+        },
+        # 인증 정보가 인자에 들어가므로 GET 디스패치/헤지 대상(멱등 도구)에서는 제외
+        "cache": {"ttl": 60},
+        "limits": {"concurrency": 4, "queue": 16, "max_wait": 5},
+        # 업스트림 /health가 code_search 기능(준비된 로컬 미러)을 알릴 때만 목록에 노출
+        "requires": "code_search"
     },
     {
         "name": "system_health",
@@ -107,15 +323,259 @@ TOOLS = [
             "type": "object",
             "properties": {},
             "additionalProperties": False
-        }
+        },
+        "cache": {"ttl": 5},
+        "limits": {"concurrency": 16, "queue": 64, "max_wait": 1},
+        "idempotent": True
     }
 ]
 
+# JSON Schema 타입 검사 (도구 inputSchema에서 쓰는 부분집합)
+JSON_SCHEMA_TYPES = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+def compile_schema(schema: Dict[str, Any], path: str = "arguments"):
+    """inputSchema를 검사 함수로 한 번만 변환 (문제가 있으면 오류 메시지, 없으면 None 반환)"""
+    type_name = schema.get("type")
+    type_check = JSON_SCHEMA_TYPES.get(type_name)
+    enum = schema.get("enum")
+    required = schema.get("required", [])
+    properties = {name: compile_schema(sub, f"{path}.{name}") for name, sub in schema.get("properties", {}).items()}
+    additional = schema.get("additionalProperties", True)
+    items = compile_schema(schema["items"], f"{path}[]") if "items" in schema else None
+    
+    def validate(value: Any) -> Optional[str]:
+        if type_check is not None and not type_check(value):
+            return f"{path} must be of type {type_name}"
+        if enum is not None and value not in enum:
+            return f"{path} must be one of {enum}"
+        if isinstance(value, dict):
+            for name in required:
+                if name not in value:
+                    return f"{path}.{name} is required"
+            for name, item in value.items():
+                check = properties.get(name)
+                if check is not None:
+                    error = check(item)
+                    if error:
+                        return error
+                elif additional is False:
+                    return f"{path}.{name} is not allowed"
+        if items is not None and isinstance(value, list):
+            for item in value:
+                error = items(item)
+                if error:
+                    return error
+        return None
+    
+    return validate
+
+# 도구별 인자 검사기 (시작 시 한 번 컴파일)
+TOOL_VALIDATORS = {tool["name"]: compile_schema(tool["inputSchema"]) for tool in TOOLS}
+
+# 도구별 캐시 정책 ("cache"가 없거나 None이면 캐시하지 않음)
+TOOL_CACHE_POLICIES = {tool["name"]: tool.get("cache") for tool in TOOLS}
+
+# 클라이언트에 노출하는 도구 정의 (캐시 정책, 동시 실행 제한, 멱등 여부 등 내부 설정 제외)
+PUBLIC_TOOLS = [{key: value for key, value in tool.items() if key not in ("cache", "limits", "idempotent", "requires")} for tool in TOOLS]
+
+# 도구별 필요한 업스트림 기능 (없으면 항상 노출)
+TOOL_REQUIREMENTS = {tool["name"]: tool["requires"] for tool in TOOLS if "requires" in tool}
+
+class ToolResultCache:
+    """도구 결과 TTL 캐시 (메모리 한도 초과 시 LRU 제거)"""
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (만료 시각, 크기, 결과)
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+    
+    @staticmethod
+    def make_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        """도구명 + 정렬된 인자로 키 생성 (인증 정보가 키에 그대로 남지 않도록 해시)"""
+        return hashlib.sha256(json_dumps([tool_name, arguments], sort_keys=True)).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[2]
+    
+    def put(self, key: str, result: Dict[str, Any], ttl: float):
+        # text 블록과 structuredContent(직렬화 크기) 양쪽을 모두 계산
+        size = sum(len(item.get("text", "")) for item in result.get("content", []))
+        if "structuredContent" in result:
+            size += len(json_dumps(result["structuredContent"]))
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (time.monotonic() + ttl, size, result)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+    
+    def _remove(self, key: str):
+        _, size, _ = self.entries.pop(key)
+        self.total_bytes -= size
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {"entries": len(self.entries), "bytes": self.total_bytes, "max_bytes": self.max_bytes, **self.stats}
+
+tool_cache = ToolResultCache(TOOL_CACHE_MAX_BYTES)
+
+class SingleFlight:
+    """같은 키의 호출이 진행 중이면 새로 실행하지 않고 첫 호출 결과를 함께 기다림"""
+    
+    def __init__(self):
+        self.calls: Dict[str, Dict[str, Any]] = {}  # key -> {"task", "waiters"}
+        self.stats = {"leaders": 0, "coalesced": 0, "cancelled": 0}
+    
+    async def run(self, key: str, factory):
+        entry = self.calls.get(key)
+        if entry is None:
+            entry = {"task": asyncio.ensure_future(factory()), "waiters": 0}
+            self.calls[key] = entry
+            entry["task"].add_done_callback(lambda _: self._forget(key, entry))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["coalesced"] += 1
+        
+        entry["waiters"] += 1
+        try:
+            # 한 호출자가 취소되어도 다른 호출자가 기다리는 작업은 계속 진행
+            return await asyncio.shield(entry["task"])
+        except asyncio.CancelledError:
+            # 마지막 호출자까지 취소되면 업스트림 작업도 취소
+            if entry["waiters"] == 1 and not entry["task"].done():
+                entry["task"].cancel()
+                self.stats["cancelled"] += 1
+            raise
+        finally:
+            entry["waiters"] -= 1
+    
+    def _forget(self, key: str, entry: Dict[str, Any]):
+        if self.calls.get(key) is entry:
+            del self.calls[key]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {"in_flight": len(self.calls), **self.stats}
+
+tool_single_flight = SingleFlight()
+
+class ServerBusyError(Exception):
+    """도구 대기열이 가득 찼거나 대기 시간이 초과됨 (JSON-RPC -32000으로 응답)"""
+    
+    def __init__(self, tool_name: str, reason: str, retry_after: float):
+        super().__init__(f"Server busy: {tool_name} ({reason})")
+        self.tool_name = tool_name
+        self.reason = reason
+        self.retry_after = retry_after
+
+class ToolAdmission:
+    """도구별 동시 실행 수 제한 + 대기열 길이/대기 시간 제한 (과부하 시 기다리지 않고 빠르게 거절)"""
+    
+    def __init__(self, tool_name: str, concurrency: int, queue_size: int, max_wait: float):
+        self.tool_name = tool_name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.avg_service = 0.0  # 실행 시간 이동 평균 (초)
+        self.total_wait = 0.0
+        self.max_waited = 0.0
+        self.stats = {"admitted": 0, "rejected": 0, "timed_out": 0}
+    
+    def retry_after(self) -> float:
+        """대기열이 빠지는 데 걸릴 시간 추정 (최소 1초)"""
+        estimate = self.avg_service * (self.waiting / self.concurrency + 1)
+        return max(1.0, round(estimate, 1))
+    
+    @asynccontextmanager
+    async def slot(self):
+        # 실행 중 + 대기 중인 호출 수로 판단 (세마포어 획득 전에 동기적으로 결정)
+        pending = self.active + self.waiting
+        if pending >= self.concurrency + self.queue_size:
+            self.stats["rejected"] += 1
+            raise ServerBusyError(self.tool_name, "queue_full", self.retry_after())
+        report = progress_reporter.get()
+        if pending >= self.concurrency and report is not None:
+            await report(f"대기열 대기 중 ({pending - self.concurrency + 1}번째)")
+        
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), self.max_wait)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            raise ServerBusyError(self.tool_name, "queue_timeout", self.retry_after())
+        finally:
+            self.waiting -= 1
+        
+        waited = time.monotonic() - started
+        self.total_wait += waited
+        self.max_waited = max(self.max_waited, waited)
+        self.stats["admitted"] += 1
+        self.active += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.avg_service = elapsed if self.avg_service == 0 else self.avg_service * 0.8 + elapsed * 0.2
+            self.active -= 1
+            self.semaphore.release()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        admitted = self.stats["admitted"]
+        return {
+            "active": self.active,
+            "concurrency": self.concurrency,
+            "queue_depth": self.waiting,
+            "queue_size": self.queue_size,
+            "max_wait_seconds": self.max_wait,
+            "avg_wait_ms": round(self.total_wait / admitted * 1000, 1) if admitted else 0.0,
+            "max_waited_ms": round(self.max_waited * 1000, 1),
+            "avg_service_ms": round(self.avg_service * 1000, 1),
+            **self.stats,
+        }
+
+def build_admission(tool: Dict[str, Any]) -> ToolAdmission:
+    limits = tool.get("limits") or {}
+    return ToolAdmission(
+        tool["name"],
+        limits.get("concurrency", TOOL_DEFAULT_CONCURRENCY),
+        limits.get("queue", TOOL_DEFAULT_QUEUE_SIZE),
+        limits.get("max_wait", TOOL_DEFAULT_MAX_WAIT_SECONDS),
+    )
+
+# 도구별 입장 제어 (무거운 read_pdf가 몰려도 system_health 같은 가벼운 호출은 영향 없음)
+tool_admissions = {tool["name"]: build_admission(tool) for tool in TOOLS}
+
 # MCP 서버 정보
 SERVER_INFO = {
     "protocolVersion": "2024-11-05",
     "capabilities": {
-        "tools": {}
+        "tools": {"listChanged": True},
+        "resources": {},
+        "experimental": {"fullTextContent": {}}
     },
     "serverInfo": {
         "name": "mcp-server",
@@ -124,12 +584,347 @@ SERVER_INFO = {
 }
 
 async def handle_initialize(params: Dict[str, Any]) -> Dict[str, Any]:
-    """MCP 초기화 처리"""
+    """MCP 초기화 처리 (클라이언트가 보낸 experimental.fullTextContent 기억)"""
+    experimental = (params.get("capabilities") or {}).get("experimental") or {}
+    # capability는 보통 빈 객체({})로 선언하므로 키가 있으면 요청한 것으로 봄
+    if experimental.get("fullTextContent", False) is not False:
+        full_text_scopes.add(request_scope.get())
+    else:
+        full_text_scopes.discard(request_scope.get())
     return SERVER_INFO
 
+def advertised_tools() -> List[Dict[str, Any]]:
+    """지금 호출할 수 있는 도구 목록 (필요한 기능을 가진 정상 복제본이 없는 도구는 제외)"""
+    tools = []
+    for tool in PUBLIC_TOOLS:
+        capability = TOOL_REQUIREMENTS.get(tool["name"])
+        if capability is not None:
+            upstream = TOOL_ROUTES[tool["name"]][0]
+            if not any(replica.healthy and replica.capabilities.get(capability) for replica in upstream_replicas[upstream]):
+                continue
+        tools.append(tool)
+    return tools
+
 async def handle_tools_list(params: Dict[str, Any]) -> Dict[str, Any]:
     """도구 목록 반환"""
-    return {"tools": TOOLS}
+    return {"tools": advertised_tools()}
+
+class ResourceError(Exception):
+    """리소스를 찾을 수 없거나 범위가 잘못됨 (업스트림 상태 코드를 JSON-RPC 오류 코드로 변환)"""
+    
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.code = -32002 if status == 404 else -32602
+
+async def call_resource_api(method: str, body: Dict[str, Any], affinity: Optional[str] = None) -> Dict[str, Any]:
+    """리소스 요청을 업스트림 복제본으로 위임 (서킷 브레이커 적용)"""
+    upstream, path = RESOURCE_ROUTES[method]
+    status_code, _, text_data = await require_replica(upstream, affinity).post(path, body)
+    if status_code != 200:
+        raise Exception(f"Internal API error: HTTP {status_code}")
+    payload = json_loads(text_data)
+    if not payload.get("ok"):
+        raise ResourceError(payload.get("error", "리소스 오류"), payload.get("status"))
+    return payload["data"]
+
+async def handle_resources_list(params: Dict[str, Any]) -> Dict[str, Any]:
+    """리소스 목록 (PDF 문서/페이지, DB 테이블과 각 sha256)"""
+    return await call_resource_api("resources/list", {})
+
+async def handle_resources_templates_list(params: Dict[str, Any]) -> Dict[str, Any]:
+    """리소스 URI 템플릿 목록"""
+    return {"resourceTemplates": RESOURCE_TEMPLATES}
+
+async def handle_resources_read(params: Dict[str, Any]) -> Dict[str, Any]:
+    """리소스 읽기 (pages/rows/bytes 범위, 항목별 sha256)"""
+    uri = params.get("uri")
+    if not isinstance(uri, str) or not uri:
+        raise ResourceError("uri is required")
+    # PDF는 read_pdf와 같은 복제본으로 (파일명 기준 일관 해싱)
+    parsed = urlparse(uri)
+    affinity = unquote(parsed.path.lstrip("/")) if parsed.scheme == "pdf" else None
+    return await call_resource_api("resources/read", {"uri": uri}, affinity)
+
+# 현재 요청의 진행 상황 보고 함수 (SSE 스트리밍 응답일 때만 설정됨)
+progress_reporter: ContextVar[Optional[Any]] = ContextVar("progress_reporter", default=None)
+
+async def post_upstream(client: httpx.AsyncClient, path: str, arguments: Dict[str, Any]) -> Tuple[int, str, str]:
+    """업스트림 POST 후 (상태 코드, content-type, 본문) 반환
+    
+    진행 상황 보고가 켜져 있으면 응답을 청크 단위로 읽으면서 수신량과 부분 내용을 보고
+    """
+    report = progress_reporter.get()
+    if report is None:
+        response = await client.post(path, json=arguments)
+        return response.status_code, response.headers.get('content-type', ''), response.content.decode('utf-8', errors='replace')
+    
+    await report("업스트림 요청 전송")
+    async with client.stream("POST", path, json=arguments) as response:
+        total = response.headers.get("content-length", "?")
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        parts = []
+        received = 0
+        async for chunk in response.aiter_bytes():
+            received += len(chunk)
+            text = decoder.decode(chunk)
+            parts.append(text)
+            await report(f"응답 수신 중 ({received}/{total} bytes)", partial=text if response.status_code == 200 else None)
+        parts.append(decoder.decode(b"", final=True))
+        return response.status_code, response.headers.get('content-type', ''), "".join(parts)
+
+class CircuitOpenError(Exception):
+    """업스트림 서킷이 열려 있어 호출하지 않음 (JSON-RPC -32001로 응답)"""
+    
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"Upstream unavailable: {upstream}")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """업스트림 서킷 브레이커 (closed -> open -> half_open -> closed)
+    
+    최근 BREAKER_WINDOW개 호출 중 실패(연결 오류, 5xx, BREAKER_SLOW_CALL_SECONDS 이상 걸린 호출)
+    비율이 BREAKER_FAILURE_RATE 이상이면 열고, BREAKER_OPEN_SECONDS 후 시험 호출로 복구 여부 확인
+    """
+    
+    def __init__(self, upstream: str):
+        self.upstream = upstream
+        self.state = "closed"
+        self.results: deque = deque(maxlen=BREAKER_WINDOW)  # 최근 호출 성공 여부
+        self.opened_at = 0.0
+        self.probes = 0
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+    
+    def _acquire(self) -> bool:
+        """호출 가능 여부 확인 (시험 호출이면 True)"""
+        if self.state == "open":
+            remaining = BREAKER_OPEN_SECONDS - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(self.upstream, max(1.0, round(remaining, 1)))
+            self.state = "half_open"
+            self.probes = 0
+            print(f"서킷 half-open: {self.upstream}")
+        if self.state == "half_open":
+            if self.probes >= BREAKER_HALF_OPEN_PROBES:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(self.upstream, 1.0)
+            self.probes += 1
+            return True
+        return False
+    
+    def available(self) -> bool:
+        """지금 호출을 보낼 수 있는지 (차단 시간이 지난 open은 시험 호출 가능)"""
+        if self.state == "open":
+            return time.monotonic() - self.opened_at >= BREAKER_OPEN_SECONDS
+        if self.state == "half_open":
+            return self.probes < BREAKER_HALF_OPEN_PROBES
+        return True
+    
+    def _record(self, success: bool, probe: bool):
+        self.stats["calls"] += 1
+        if not success:
+            self.stats["failures"] += 1
+        if probe:
+            self.probes -= 1
+            if self.state != "half_open":
+                return
+            if success:
+                self.state = "closed"
+                self.results.clear()
+                print(f"서킷 closed: {self.upstream}")
+            else:
+                self._open()
+            return
+        if self.state != "closed":
+            return
+        self.results.append(success)
+        failures = self.results.count(False)
+        if len(self.results) >= BREAKER_MIN_CALLS and failures / len(self.results) >= BREAKER_FAILURE_RATE:
+            self._open()
+    
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.stats["opened"] += 1
+        print(f"⚠️ 서킷 open: {self.upstream} ({BREAKER_OPEN_SECONDS:.0f}초 동안 호출 차단)")
+    
+    async def call(self, factory) -> Tuple[int, str, str]:
+        """서킷 상태를 확인하고 업스트림 호출 결과를 기록"""
+        probe = self._acquire()
+        started = time.monotonic()
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            # 헤지/취소로 중단된 호출은 이미 느렸던 경우에만 실패로 기록
+            elapsed = time.monotonic() - started
+            if elapsed >= BREAKER_SLOW_CALL_SECONDS:
+                self._record(False, probe)
+            elif probe:
+                self.probes -= 1
+            raise
+        except Exception:
+            # 연결 오류뿐 아니라 다른 예외도 실패로 기록 (시험 호출 자리가 남지 않도록)
+            self._record(False, probe)
+            raise
+        elapsed = time.monotonic() - started
+        self._record(result[0] < 500 and elapsed < BREAKER_SLOW_CALL_SECONDS, probe)
+        return result
+    
+    def snapshot(self) -> Dict[str, Any]:
+        failures = self.results.count(False)
+        return {
+            "state": self.state,
+            "window_calls": len(self.results),
+            "window_failure_rate": round(failures / len(self.results), 2) if self.results else 0.0,
+            **self.stats,
+        }
+
+class UpstreamReplica:
+    """업스트림 복제본 (HTTP 클라이언트, 서킷 브레이커, 진행 중 요청 수, 헬스체크 상태)"""
+    
+    def __init__(self, upstream: str, url: str):
+        self.upstream = upstream
+        self.url = url
+        self.client: Optional[httpx.AsyncClient] = None
+        self.breaker = CircuitBreaker(url)
+        self.outstanding = 0
+        self.healthy = True
+        self.probe_failures = 0
+        self.capabilities: Dict[str, bool] = {}
+    
+    def available(self) -> bool:
+        """헬스체크 통과 + 서킷이 호출을 허용하는 상태"""
+        return self.healthy and self.breaker.available()
+    
+    async def post(self, path: str, arguments: Dict[str, Any]) -> Tuple[int, str, str]:
+        self.outstanding += 1
+        try:
+            return await self.breaker.call(lambda: post_upstream(self.client, path, arguments))
+        finally:
+            self.outstanding -= 1
+    
+    async def probe(self):
+        """GET /health (연속 UPSTREAM_HEALTH_FAILURES번 실패하면 제외, 한 번 성공하면 다시 포함)"""
+        try:
+            response = await self.client.get("/health", timeout=UPSTREAM_HEALTH_TIMEOUT)
+            ok = response.status_code == 200
+            if ok:
+                capabilities = response.json().get("capabilities") or {}
+                if not isinstance(capabilities, dict):
+                    raise ValueError(f"capabilities must be an object: {capabilities!r}")
+                self.capabilities = capabilities
+        except (httpx.HTTPError, ValueError):
+            ok = False
+        except Exception as e:
+            # JSON 객체가 아닌 본문(프록시 오류 페이지 등)도 실패로 집계 (헬스체크 루프가 멈추지 않도록)
+            print(f"복제본 헬스체크 실패: {self.url} ({type(e).__name__}: {e})")
+            ok = False
+        self.probe_failures = 0 if ok else self.probe_failures + 1
+        healthy = self.probe_failures < UPSTREAM_HEALTH_FAILURES
+        if healthy != self.healthy:
+            print(f"{'✅ 복제본 복귀' if healthy else '⚠️ 복제본 제외'}: {self.url}")
+        self.healthy = healthy
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {"url": self.url, "healthy": self.healthy, "capabilities": self.capabilities, "outstanding": self.outstanding, "breaker": self.breaker.snapshot()}
+
+upstream_replicas: Dict[str, List[UpstreamReplica]] = {
+    name: [UpstreamReplica(name, url) for url in urls] for name, urls in UPSTREAMS.items()
+}
+
+def pick_replica(upstream: str, affinity: Optional[str] = None, exclude: Optional[UpstreamReplica] = None) -> Optional[UpstreamReplica]:
+    """호출할 복제본 선택 (사용 가능한 복제본이 없으면 None)
+    
+    affinity가 있으면 rendezvous 해시(일관 해싱)로 항상 같은 복제본을, 없으면 무작위 두 개 중 진행 중 요청이 적은 쪽 선택
+    """
+    candidates = [replica for replica in upstream_replicas[upstream] if replica is not exclude and replica.available()]
+    if not candidates:
+        return None
+    if affinity is not None:
+        return max(candidates, key=lambda replica: hashlib.md5(f"{affinity}|{replica.url}".encode()).digest())
+    if len(candidates) == 1:
+        return candidates[0]
+    return min(random.sample(candidates, 2), key=lambda replica: replica.outstanding)
+
+def require_replica(upstream: str, affinity: Optional[str] = None) -> UpstreamReplica:
+    replica = pick_replica(upstream, affinity)
+    if replica is None:
+        raise CircuitOpenError(upstream, UPSTREAM_HEALTH_CHECK_SECONDS)
+    return replica
+
+# 도구별 최근 응답 시간 (헤지 지연 계산용)
+tool_latencies: Dict[str, deque] = {tool["name"]: deque(maxlen=200) for tool in TOOLS}
+hedge_stats = {"hedged": 0, "hedge_wins": 0}
+# 같은 요청을 반복해도 안전한 조회 도구 (헤지 요청, GET /mcp/dispatch 대상)
+IDEMPOTENT_TOOLS = {tool["name"] for tool in TOOLS if tool.get("idempotent")}
+
+def hedge_delay(tool_name: str) -> Optional[float]:
+    """최근 응답 시간의 p95 (nearest-rank, 표본이 부족하면 None -> 헤지하지 않음)"""
+    samples = tool_latencies[tool_name]
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    return max(HEDGE_MIN_DELAY_SECONDS, ordered[max(0, math.ceil(len(ordered) * 95 / 100) - 1)])
+
+async def call_upstream(tool_name: str, upstream: str, path: str, arguments: Dict[str, Any]) -> Tuple[int, str, str]:
+    """복제본을 골라 서킷 브레이커를 거쳐 호출 (멱등 도구는 p95 지연 후 다른 복제본으로 헤지 요청)"""
+    affinity_arg = TOOL_AFFINITY_ARGS.get(tool_name)
+    affinity = str(arguments.get(affinity_arg)) if affinity_arg else None
+    replica = require_replica(upstream, affinity)
+    started = time.monotonic()
+    
+    # 진행 상황을 스트리밍 중이면 부분 내용이 섞이지 않도록, 다른 정상 복제본이 없으면 같은 복제본에 부하만 늘어나므로 헤지하지 않음
+    delay = hedge_delay(tool_name) if HEDGE_ENABLED and tool_name in IDEMPOTENT_TOOLS else None
+    if delay is None or progress_reporter.get() is not None or pick_replica(upstream, exclude=replica) is None:
+        result = await replica.post(path, arguments)
+        tool_latencies[tool_name].append(time.monotonic() - started)
+        return result
+    
+    primary = asyncio.ensure_future(replica.post(path, arguments))
+    tasks = [primary]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        # 헤지는 다른 정상 복제본으로만 (기다리는 동안 다른 복제본이 빠졌으면 첫 요청만 기다림)
+        hedge_replica = pick_replica(upstream, affinity, exclude=replica)
+        if not done and hedge_replica is not None and hedge_replica.breaker.state == "closed":
+            # 첫 요청이 평소(p95)보다 늦으면 같은 요청을 한 번 더 보내고 먼저 성공한 응답 사용
+            hedge_stats["hedged"] += 1
+            tasks.append(asyncio.ensure_future(hedge_replica.post(path, arguments)))
+        
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and task.result()[0] < 500:
+                    if task is not primary:
+                        hedge_stats["hedge_wins"] += 1
+                    tool_latencies[tool_name].append(time.monotonic() - started)
+                    return task.result()
+        # 모두 실패하면 첫 요청의 결과(또는 예외)를 그대로 전달
+        return primary.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+def summarize_text(text: str) -> str:
+    """structuredContent와 함께 보낼 text 블록 (길면 앞부분만 남기고 전체 길이 표시)"""
+    if len(text) <= TOOL_TEXT_SUMMARY_CHARS:
+        return text
+    return f"{text[:TOOL_TEXT_SUMMARY_CHARS]}… (전체 {len(text)}자 중 일부, 전체 결과는 structuredContent 참고)"
+
+def compact_tool_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """전체 결과가 structuredContent에 있으면 text 블록은 요약으로 (같은 본문을 두 번 보내지 않도록)
+    
+    캐시와 단일 비행으로 공유하는 결과는 그대로 두고 사본을 만듦
+    """
+    if "structuredContent" not in result or request_scope.get() in full_text_scopes:
+        return result
+    text = result["content"][0]["text"]
+    if len(text) <= TOOL_TEXT_SUMMARY_CHARS:
+        return result
+    return {**result, "content": [{"type": "text", "text": summarize_text(text)}]}
 
 async def handle_tools_call(params: Dict[str, Any]) -> Dict[str, Any]:
     """도구 실행"""
@@ -141,129 +936,375 @@ async def handle_tools_call(params: Dict[str, Any]) -> Dict[str, Any]:
     
     print(f"MCP 도구 호출: {tool_name} - {arguments}")
     
+    route = TOOL_ROUTES.get(tool_name)
+    if route is None:
+        raise ValueError(f"Unknown tool: {tool_name}")
+    upstream, path = route
+    
     try:
-        # 내부 API 서버로 위임
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            if tool_name == "read_pdf":
-                response = await client.post("http://localhost:9002/api/pdf", json=arguments)
-            elif tool_name == "query_database":
-                response = await client.post("http://localhost:9002/api/database", json=arguments)
-            elif tool_name == "github_repository_info":
-                # GitHub 플레이스홀더를 실제 값으로 대체
-                processed_args = arguments.copy() if arguments else {}
-                
-                if processed_args.get("username") == "<GITHUB_USERNAME>":
-                    processed_args["username"] = "hli.yohan.lee"
-                
-                if processed_args.get("password") == "<GITHUB_PAT>":
-                    github_token = os.getenv("GITHUB_TOKEN", "YOUR_GITHUB_TOKEN_HERE")
-                    processed_args["password"] = github_token
-                
-                response = await client.post("http://localhost:9002/api/github", json=processed_args)
-            elif tool_name == "system_health":
-                response = await client.post("http://localhost:9002/api/health", json=arguments)
-            else:
-                raise ValueError(f"Unknown tool: {tool_name}")
+        if tool_name in GITHUB_CREDENTIAL_TOOLS:
+            # GitHub 플레이스홀더를 실제 값으로 대체
+            arguments = arguments.copy() if arguments else {}
             
-            if response.status_code == 200:
-                # 응답 처리
-                content_type = response.headers.get('content-type', '')
-                
-                if 'application/json' in content_type:
-                    response.encoding = 'utf-8'
-                    result = response.json()
-                    return {"content": [{"type": "text", "text": json.dumps(result, ensure_ascii=False)}]}
-                else:
-                    response.encoding = 'utf-8'
-                    text_data = response.text
-                    return {"content": [{"type": "text", "text": text_data}]}
+            if arguments.get("username") == "<GITHUB_USERNAME>":
+                arguments["username"] = "hli.yohan.lee"
+            
+            if arguments.get("password") == "<GITHUB_PAT>":
+                github_token = os.getenv("GITHUB_TOKEN", "YOUR_GITHUB_TOKEN_HERE")
+                arguments["password"] = github_token
+        
+        # 멱등 조회 도구는 캐시 확인 (자격 증명 치환 후의 인자로 키 생성)
+        cache_policy = TOOL_CACHE_POLICIES.get(tool_name)
+        cache_key = ToolResultCache.make_key(tool_name, arguments or {}) if cache_policy else None
+        if cache_key:
+            cached = tool_cache.get(cache_key)
+            if cached is not None:
+                print(f"캐시 적중: {tool_name}")
+                return cached
+        
+        # 내부 API 서버로 위임 (도구별 동시 실행 제한 + 서킷 브레이커, 공용 클라이언트로 연결 재사용)
+        async with tool_admissions[tool_name].slot():
+            status_code, content_type, text_data = await call_upstream(tool_name, upstream, path, arguments)
+        
+        if status_code == 200:
+            # 응답 처리
+            if 'application/json' in content_type:
+                # 업스트림 JSON 본문은 다시 직렬화하지 않고 그대로 text로 전달,
+                # 파싱한 객체는 structuredContent로 함께 제공 (응답에서는 compact_tool_result가 text를 요약으로 줄임)
+                result = json_loads(text_data)
+                tool_result = {"content": [{"type": "text", "text": text_data}]}
+                if isinstance(result, dict):
+                    tool_result["structuredContent"] = result
+                # 실패 응답({"ok": false})은 캐시하지 않음
+                if cache_key and not (isinstance(result, dict) and result.get("ok") is False):
+                    tool_cache.put(cache_key, tool_result, cache_policy["ttl"])
+                return tool_result
             else:
-                error_msg = f"Internal API error: HTTP {response.status_code}"
-                raise Exception(error_msg)
-                
+                return {"content": [{"type": "text", "text": text_data}]}
+        else:
+            error_msg = f"Internal API error: HTTP {status_code}"
+            raise Exception(error_msg)
+            
     except Exception as e:
         print(f"도구 실행 오류: {e}")
         raise
 
-async def process_jsonrpc(request: JSONRPCRequest) -> JSONRPCResponse:
-    """JSON-RPC 요청 처리"""
+def jsonrpc_result(request_id: Any, result: Any) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "result": result, "id": request_id}
+
+def jsonrpc_error(request_id: Any, code: int, message: str, data: Any = None) -> Dict[str, Any]:
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "error": error, "id": request_id}
+
+def validate_jsonrpc_request(item: Any) -> Optional[str]:
+    """요청 envelope 형식 검사 (문제가 있으면 오류 메시지 반환)"""
+    if not isinstance(item, dict):
+        return "request must be an object"
+    if not isinstance(item.get("method"), str):
+        return "method must be a string"
+    if item.get("params") is not None and not isinstance(item["params"], dict):
+        return "params must be an object"
+    request_id = item.get("id")
+    if request_id is not None and (isinstance(request_id, bool) or not isinstance(request_id, (str, int))):
+        return "id must be a string or integer"
+    return None
+
+# 요청 id의 범위 (stdio/Unix 소켓은 연결마다, HTTP는 Mcp-Session-Id 세션마다, 세션이 없으면 HTTP 요청마다)
+# 취소는 같은 범위의 요청에만 적용되므로 다른 클라이언트의 요청을 취소할 수 없음
+request_scope: ContextVar[str] = ContextVar("request_scope", default="internal")
+
+# 진행 중인 tools/call 요청 ((범위, id) -> 처리 태스크), notifications/cancelled로 취소
+inflight_requests: Dict[Tuple[str, Any], asyncio.Task] = {}
+cancelled_requests: set = set()
+
+# initialize에서 도구 결과 text에 전체 본문을 요청한 범위
+full_text_scopes: set = set()
+
+# initialize로 발급한 HTTP 세션 (세션 id -> 마지막 사용 시각)
+http_sessions: Dict[str, float] = {}
+
+def close_http_session_scope(session_id: str):
+    http_sessions.pop(session_id, None)
+    full_text_scopes.discard(f"session:{session_id}")
+
+def open_http_session(initialize_scope: str) -> str:
+    """HTTP 세션 발급 (추측할 수 없는 임의 id, 유휴 세션은 이때 정리)
+    
+    initialize 요청 범위에서 정한 설정(fullTextContent)은 새 세션 범위로 옮김
+    """
+    now = time.monotonic()
+    for session_id, last_used in list(http_sessions.items()):
+        if now - last_used > HTTP_SESSION_IDLE_SECONDS:
+            close_http_session_scope(session_id)
+    session_id = uuid.uuid4().hex
+    http_sessions[session_id] = now
+    if initialize_scope in full_text_scopes:
+        full_text_scopes.discard(initialize_scope)
+        full_text_scopes.add(f"session:{session_id}")
+    return session_id
+
+def http_request_scope(request: Request) -> Optional[str]:
+    """HTTP 요청의 범위 결정 (알 수 없거나 만료된 세션 id면 None)"""
+    session_id = request.headers.get("mcp-session-id")
+    if session_id is None:
+        return f"request:{uuid.uuid4().hex}"
+    last_used = http_sessions.get(session_id)
+    if last_used is None or time.monotonic() - last_used > HTTP_SESSION_IDLE_SECONDS:
+        close_http_session_scope(session_id)
+        return None
+    http_sessions[session_id] = time.monotonic()
+    return f"session:{session_id}"
+
+def cancel_request(request_id: Any, reason: Optional[str] = None) -> bool:
+    """진행 중인 요청 취소 (단일 비행으로 공유 중인 업스트림 호출은 마지막 대기자가 취소될 때 함께 취소)"""
+    request_key = (request_scope.get(), request_id)
+    task = inflight_requests.get(request_key)
+    if task is None or task.done():
+        return False
+    cancelled_requests.add(request_key)
+    task.cancel()
+    print(f"요청 취소: {request_id} ({reason or '사유 없음'})")
+    return True
+
+async def process_jsonrpc(request: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-RPC 요청 처리 (검증된 dict 요청 -> dict 응답)"""
+    method = request["method"]
+    params = request.get("params") or {}
+    request_id = request.get("id")
     try:
         # 메서드별 처리
-        if request.method == "initialize":
-            result = await handle_initialize(request.params or {})
-        elif request.method == "tools/list":
-            result = await handle_tools_list(request.params or {})
-        elif request.method == "tools/call":
-            result = await handle_tools_call(request.params or {})
+        if method == "initialize":
+            result = await handle_initialize(params)
+        elif method == "ping":
+            result = {}
+        elif method == "notifications/cancelled":
+            cancel_request(params.get("requestId"), params.get("reason"))
+            result = {}
+        elif method == "tools/list":
+            result = await handle_tools_list(params)
+        elif method == "resources/list":
+            result = await handle_resources_list(params)
+        elif method == "resources/templates/list":
+            result = await handle_resources_templates_list(params)
+        elif method == "resources/read":
+            result = await handle_resources_read(params)
+        elif method == "tools/call":
+            # 미리 컴파일한 inputSchema 검사기로 잘못된 인자는 업스트림 호출 전에 거부
+            arguments = params.get("arguments") or {}
+            validator = TOOL_VALIDATORS.get(params.get("name"))
+            if validator is not None:
+                error = validator(arguments)
+                if error:
+                    return jsonrpc_error(request_id, -32602, f"Invalid params: {error}")
+            
+            # 동일한 도구 호출이 진행 중이면 그 결과를 공유
+            key = ToolResultCache.make_key(params.get("name"), arguments)
+            request_key = (request_scope.get(), request_id)
+            task = asyncio.current_task()
+            if request_id is not None:
+                # 같은 범위에서 진행 중인 id를 다시 쓰면 취소 대상이 모호해지므로 거부
+                if request_key in inflight_requests:
+                    return jsonrpc_error(request_id, -32600, "Invalid Request: id is already in use")
+                inflight_requests[request_key] = task
+            try:
+                result = compact_tool_result(await tool_single_flight.run(key, lambda: handle_tools_call(params)))
+            except asyncio.CancelledError:
+                if request_key not in cancelled_requests:
+                    raise
+                # 클라이언트가 취소한 요청 (HTTP는 응답이 필요하므로 취소 오류로 응답)
+                if hasattr(task, "uncancel"):
+                    task.uncancel()
+                return jsonrpc_error(request_id, -32800, "Request cancelled")
+            finally:
+                if inflight_requests.get(request_key) is task:
+                    del inflight_requests[request_key]
+                cancelled_requests.discard(request_key)
         else:
             # 메서드를 찾을 수 없음
-            return JSONRPCResponse(
-                jsonrpc="2.0",
-                error={
-                    "code": -32601,
-                    "message": f"Method not found: {request.method}"
-                },
-                id=request.id
-            )
+            return jsonrpc_error(request_id, -32601, f"Method not found: {method}")
         
-        return JSONRPCResponse(
-            jsonrpc="2.0",
-            result=result,
-            id=request.id
-        )
+        return jsonrpc_result(request_id, result)
         
+    except ServerBusyError as e:
+        # 과부하: 재시도 힌트와 함께 즉시 거절
+        return jsonrpc_error(request_id, -32000, "Server busy", {"tool": e.tool_name, "reason": e.reason, "retryAfter": e.retry_after})
+    except ResourceError as e:
+        return jsonrpc_error(request_id, e.code, str(e))
+    except CircuitOpenError as e:
+        # 업스트림 장애: 타임아웃까지 기다리지 않고 즉시 실패
+        return jsonrpc_error(request_id, -32001, "Upstream unavailable", {"upstream": e.upstream, "retryAfter": e.retry_after})
     except Exception as e:
         print(f"JSON-RPC 처리 오류: {e}")
-        return JSONRPCResponse(
-            jsonrpc="2.0",
-            error={
-                "code": -32603,
-                "message": str(e),
-                "data": traceback.format_exc()
-            },
-            id=request.id
-        )
+        return jsonrpc_error(request_id, -32603, str(e), traceback.format_exc())
+
+def sse_event(message: Dict[str, Any]) -> str:
+    return f"event: message\ndata: {json_dumps(message).decode()}\n\n"
+
+async def stream_jsonrpc(req: Dict[str, Any]):
+    """Streamable HTTP 응답: 진행 알림과 부분 내용을 SSE로 보내고 마지막에 JSON-RPC 응답 전송"""
+    progress_token = ((req.get("params") or {}).get("_meta") or {}).get("progressToken")
+    queue: asyncio.Queue = asyncio.Queue()
+    step = 0
+    chunk_index = 0
+    started = time.monotonic()
+    
+    def progress(message: str) -> Dict[str, Any]:
+        nonlocal step
+        step += 1
+        return {
+            "jsonrpc": "2.0",
+            "method": "notifications/progress",
+            "params": {"progressToken": progress_token, "progress": step, "message": message}
+        }
+    
+    async def report(message: str, partial: Optional[str] = None):
+        nonlocal chunk_index
+        if progress_token is None:
+            return
+        queue.put_nowait(progress(message))
+        if partial:
+            # 큰 결과의 앞부분을 완료 전에 먼저 전달
+            queue.put_nowait({
+                "jsonrpc": "2.0",
+                "method": "notifications/partial_content",
+                "params": {
+                    "progressToken": progress_token,
+                    "index": chunk_index,
+                    "content": [{"type": "text", "text": partial}]
+                }
+            })
+            chunk_index += 1
+    
+    async def run():
+        progress_reporter.set(report)
+        queue.put_nowait(await process_jsonrpc(req))
+        queue.put_nowait(None)
+    
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if progress_token is not None:
+                    yield sse_event(progress(f"처리 중 ({time.monotonic() - started:.0f}초 경과)"))
+                else:
+                    yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                break
+            yield sse_event(message)
+    finally:
+        # 클라이언트 연결이 끊기면 진행 중인 작업도 정리
+        if not task.done():
+            task.cancel()
+
+async def run_until_disconnected(request: Request, coro) -> Optional[Any]:
+    """HTTP 클라이언트 연결이 끊기면 처리 중인 작업(업스트림 호출 포함)을 취소하고 None 반환"""
+    task = asyncio.ensure_future(coro)
+    
+    async def wait_for_disconnect():
+        while True:
+            message = await request.receive()
+            if message["type"] == "http.disconnect":
+                return
+    
+    watcher = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+            print("클라이언트 연결 종료 - 진행 중인 요청 취소")
+    return task.result() if not task.cancelled() else None
+
+async def process_message(item: Any) -> Optional[Dict[str, Any]]:
+    """요청 하나 처리 (형식 오류는 -32600, 알림이면 응답 없음)"""
+    is_notification = isinstance(item, dict) and "id" not in item
+    error = validate_jsonrpc_request(item)
+    if error:
+        if is_notification:
+            return None
+        return jsonrpc_error(item.get("id") if isinstance(item, dict) else None, -32600, f"Invalid Request: {error}")
+    
+    resp = await process_jsonrpc(item)
+    return None if is_notification else resp
+
+async def process_batch(items: List[Any]) -> List[Dict[str, Any]]:
+    """배치 요청 처리 (동시 실행, 응답 순서는 요청 순서 유지, 알림은 응답에서 제외)"""
+    semaphore = asyncio.Semaphore(JSONRPC_BATCH_CONCURRENCY)
+    
+    async def run(item: Any) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            return await process_message(item)
+    
+    results = await asyncio.gather(*(run(item) for item in items))
+    return [resp for resp in results if resp is not None]
 
 @app.post("/")
 async def jsonrpc_endpoint(request: Request):
     """JSON-RPC 2.0 엔드포인트"""
     try:
+        # 요청 범위 설정 (취소 알림은 같은 세션의 요청에만 적용)
+        scope = http_request_scope(request)
+        if scope is None:
+            return json_response(jsonrpc_error(None, -32600, "Invalid Request: unknown or expired Mcp-Session-Id"), status_code=404)
+        request_scope.set(scope)
+        
         # Raw body 읽기
         body = await request.body()
-        data = json.loads(body)
+        data = json_loads(body)
         
-        # 배치 요청 처리
+        # 배치 요청 처리 (동시 실행, 응답 순서는 요청 순서 유지)
         if isinstance(data, list):
-            responses = []
-            for item in data:
-                req = JSONRPCRequest(**item)
-                resp = await process_jsonrpc(req)
-                responses.append(resp.dict(exclude_none=True))
-            return responses
+            if not data:
+                return json_response(jsonrpc_error(None, -32600, "Invalid Request: empty batch"))
+            
+            responses = await run_until_disconnected(request, process_batch(data))
+            if responses is None:
+                return Response(status_code=499)  # 클라이언트가 먼저 연결을 끊음
+            # 알림만 있는 배치는 응답 본문 없음
+            return json_response(responses) if responses else Response(status_code=202)
         else:
-            # 단일 요청 처리
-            req = JSONRPCRequest(**data)
-            resp = await process_jsonrpc(req)
-            return resp.dict(exclude_none=True)
+            # 단일 요청 처리 (Pydantic 모델 없이 dict 그대로 검사)
+            error = validate_jsonrpc_request(data)
+            if error:
+                request_id = data.get("id") if isinstance(data, dict) else None
+                return json_response(jsonrpc_error(request_id, -32600, f"Invalid Request: {error}"))
+            
+            # 클라이언트가 SSE를 받을 수 있으면 도구 호출은 스트리밍으로 응답
+            accept = request.headers.get("accept", "")
+            if "id" in data and data["method"] == "tools/call" and "text/event-stream" in accept:
+                return StreamingResponse(stream_jsonrpc(data), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+            resp = await run_until_disconnected(request, process_jsonrpc(data))
+            if resp is None:
+                return Response(status_code=499)  # 클라이언트가 먼저 연결을 끊음
+            if "id" not in data:
+                return Response(status_code=202)  # 알림(notification)은 응답하지 않음
+            # 과부하/업스트림 장애 거절이면 HTTP 클라이언트도 알 수 있게 Retry-After 헤더 추가
+            busy = resp.get("error", {}).get("code") in (-32000, -32001)
+            headers = {"Retry-After": str(math.ceil(resp["error"]["data"]["retryAfter"]))} if busy else None
+            # initialize 응답에 세션 id 발급 (이후 요청과 취소 알림에 Mcp-Session-Id 헤더로 보냄)
+            if data["method"] == "initialize" and "result" in resp:
+                headers = {"Mcp-Session-Id": open_http_session(scope)}
+            return json_response(resp, headers=headers)
             
     except json.JSONDecodeError:
-        return {
-            "jsonrpc": "2.0",
-            "error": {
-                "code": -32700,
-                "message": "Parse error"
-            },
-            "id": None
-        }
+        return json_response(jsonrpc_error(None, -32700, "Parse error"))
     except Exception as e:
-        return {
-            "jsonrpc": "2.0",
-            "error": {
-                "code": -32603,
-                "message": f"Internal error: {str(e)}"
-            },
-            "id": None
-        }
+        return json_response(jsonrpc_error(None, -32603, f"Internal error: {str(e)}"))
+
+@app.delete("/")
+async def close_http_session(request: Request):
+    """HTTP 세션 종료"""
+    session_id = request.headers.get("mcp-session-id", "")
+    if session_id not in http_sessions:
+        return Response(status_code=404)
+    close_http_session_scope(session_id)
+    return Response(status_code=204)
 
 # 기존 REST API 엔드포인트 (하위 호환성)
 @app.get("/mcp/tools")
@@ -271,7 +1312,7 @@ async def list_tools_legacy():
     """레거시 REST API - 도구 목록"""
     # OpenAI Function Calling 형식으로 변환
     openai_tools = []
-    for tool in TOOLS:
+    for tool in advertised_tools():
         openai_tool = {
             "type": "function",
             "function": {
@@ -287,37 +1328,243 @@ async def list_tools_legacy():
 async def call_tool_legacy(request: Dict[str, Any]):
     """레거시 REST API - 도구 호출"""
     # JSON-RPC로 변환하여 호출
-    jsonrpc_req = JSONRPCRequest(
-        method="tools/call",
-        params={
+    jsonrpc_req = {
+        "jsonrpc": "2.0",
+        "method": "tools/call",
+        "params": {
             "name": request.get("tool"),
             "arguments": request.get("arguments", {})
         },
-        id=str(uuid.uuid4())
-    )
+        "id": str(uuid.uuid4())
+    }
     
     response = await process_jsonrpc(jsonrpc_req)
     
-    if response.error:
-        return {"error": response.error["message"]}
+    if "error" in response:
+        return {"error": response["error"]["message"]}
     else:
+        result = response["result"]
+        # 구조화된 결과가 있으면 텍스트를 다시 파싱하지 않고 그대로 반환
+        if isinstance(result, dict) and "structuredContent" in result:
+            return json_response(result["structuredContent"])
         # content 배열에서 텍스트 추출
-        if isinstance(response.result, dict) and "content" in response.result:
-            content = response.result["content"]
+        if isinstance(result, dict) and "content" in result:
+            content = result["content"]
             if content and len(content) > 0:
                 text = content[0].get("text", "")
                 try:
-                    return json.loads(text)
+                    return json_response(json_loads(text))
                 except:
                     return {"data": text}
-        return response.result
+        return result
+
+def parse_query_arguments(tool_name: str, pairs: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """쿼리 문자열을 inputSchema 타입에 맞춰 도구 인자로 변환
+    
+    배열은 같은 키 반복(file_paths=a&file_paths=b), 객체는 점 표기(filters.role=backend)
+    """
+    properties = next(tool["inputSchema"] for tool in TOOLS if tool["name"] == tool_name).get("properties", {})
+    arguments: Dict[str, Any] = {}
+    for key, value in pairs:
+        name, _, sub_key = key.partition(".")
+        schema = properties.get(name, {})
+        kind = schema.get("type")
+        if kind == "object" and sub_key:
+            arguments.setdefault(name, {})[sub_key] = value
+        elif kind == "array":
+            arguments.setdefault(name, []).append(value)
+        elif kind == "integer":
+            arguments[name] = int(value)
+        elif kind == "number":
+            arguments[name] = float(value)
+        elif kind == "boolean":
+            arguments[name] = value.lower() in ("true", "1")
+        else:
+            arguments[name] = value
+    return arguments
+
+# JSON-RPC 오류 코드 -> GET /mcp/dispatch HTTP 상태 코드
+DISPATCH_ERROR_STATUS = {-32602: 400, -32601: 404, -32000: 503, -32001: 503, -32800: 499}
+
+@app.api_route("/mcp/dispatch", methods=["GET", "HEAD"])
+async def dispatch_get(request: Request):
+    """멱등 도구 GET 호출 (nginx proxy_cache 등 HTTP 캐시가 응답을 재사용할 수 있도록)
+    
+    예: GET /mcp/dispatch?filename=백엔드_가이드.pdf&tool=read_pdf
+    - 쿼리 인자는 키 이름순으로 정규화하며, 정규형이 아니면 308로 정규 URL에 리다이렉트 (캐시 키 하나로 모음)
+    - 응답 본문 해시로 ETag를 만들고 If-None-Match가 일치하면 304
+    - Cache-Control max-age는 도구 캐시 TTL과 같음
+    """
+    pairs = parse_qsl(request.url.query, keep_blank_values=True)
+    canonical = urlencode(sorted(pairs), quote_via=quote)
+    if canonical != request.url.query:
+        return Response(status_code=308, headers={"Location": f"{request.url.path}?{canonical}", "Cache-Control": "public, max-age=86400"})
+    
+    tool_name = dict(pairs).get("tool")
+    if tool_name not in IDEMPOTENT_TOOLS:
+        return json_response({"error": f"GET으로 호출할 수 없는 도구입니다: {tool_name}"}, status_code=404, headers={"Cache-Control": "no-store"})
+    try:
+        arguments = parse_query_arguments(tool_name, [(key, value) for key, value in pairs if key != "tool"])
+    except ValueError as e:
+        return json_response({"error": f"Invalid params: {e}"}, status_code=400, headers={"Cache-Control": "no-store"})
+    
+    response = await run_until_disconnected(request, process_jsonrpc({
+        "jsonrpc": "2.0",
+        "method": "tools/call",
+        "params": {"name": tool_name, "arguments": arguments},
+        "id": str(uuid.uuid4())
+    }))
+    if response is None:
+        return Response(status_code=499)  # 클라이언트가 먼저 연결을 끊음
+    if "error" in response:
+        error = response["error"]
+        headers = {"Cache-Control": "no-store"}
+        if isinstance(error.get("data"), dict) and "retryAfter" in error["data"]:
+            headers["Retry-After"] = str(math.ceil(error["data"]["retryAfter"]))
+        return json_response({"error": error["message"]}, status_code=DISPATCH_ERROR_STATUS.get(error["code"], 502), headers=headers)
+    
+    result = response["result"]
+    structured = result.get("structuredContent")
+    # text 블록은 요약일 수 있으므로 구조화된 결과가 있으면 그것을 직렬화해 본문으로 사용
+    body = json_dumps(structured) if structured is not None else result["content"][0]["text"].encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    # 실패 응답({"ok": false})은 캐시하지 않음
+    if isinstance(structured, dict) and structured.get("ok") is False:
+        cache_control = "no-store"
+    else:
+        cache_control = f"public, max-age={int(TOOL_CACHE_POLICIES[tool_name]['ttl'])}"
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    media_type = "application/json" if structured is not None else "text/plain; charset=utf-8"
+    return Response(content=body, media_type=media_type, headers=headers)
 
 @app.get("/health")
 async def health_check():
     """헬스체크"""
-    return {"status": "healthy", "service": "MCP Server (JSON-RPC 2.0)"}
+    return {
+        "status": "healthy",
+        "service": "MCP Server (JSON-RPC 2.0)",
+        "cache": tool_cache.snapshot(),
+        "single_flight": tool_single_flight.snapshot(),
+        "admission": {name: admission.snapshot() for name, admission in tool_admissions.items()},
+        "upstreams": {name: [replica.snapshot() for replica in replicas] for name, replicas in upstream_replicas.items()},
+        "hedging": {"enabled": HEDGE_ENABLED, **hedge_stats},
+        "http_sessions": len(http_sessions)
+    }
+
+# 줄 단위 연결(stdio, Unix 소켓)별 전송 함수 (서버가 먼저 보내는 알림용)
+stream_senders: set = set()
+background_tasks: set = set()
+
+def notify_tools_list_changed():
+    """연결된 클라이언트에 notifications/tools/list_changed 전송 (HTTP 클라이언트는 다음 tools/list에서 반영)"""
+    notification = {"jsonrpc": "2.0", "method": "notifications/tools/list_changed"}
+    for send in list(stream_senders):
+        task = asyncio.create_task(send(notification))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+async def serve_jsonrpc_lines(readline, write_line, cancel_on_close: bool = True):
+    """줄 단위(JSON 한 줄 = 메시지 하나) JSON-RPC 처리 (stdio, Unix 소켓 공용)
+    
+    요청은 도착하는 대로 동시에 처리하고 응답은 끝나는 순서대로 보냄 (id로 구분).
+    입력이 끝나면 진행 중인 요청을 취소하거나(cancel_on_close) 끝날 때까지 기다림
+    """
+    scope = uuid.uuid4().hex
+    request_scope.set(scope)
+    write_lock = asyncio.Lock()
+    tasks = set()
+    
+    async def send(message: Any):
+        async with write_lock:
+            await write_line(json_dumps(message) + b"\n")
+    
+    stream_senders.add(send)
+    
+    async def handle(line: bytes):
+        try:
+            data = json_loads(line)
+        except json.JSONDecodeError:
+            await send(jsonrpc_error(None, -32700, "Parse error"))
+            return
+        if isinstance(data, list):
+            response = await process_batch(data) if data else jsonrpc_error(None, -32600, "Invalid Request: empty batch")
+        else:
+            response = await process_message(data)
+            # 취소된 요청에는 응답하지 않음 (MCP notifications/cancelled 규약)
+            if response and response.get("error", {}).get("code") == -32800:
+                return
+        if response:
+            await send(response)
+    
+    try:
+        while True:
+            line = await readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.create_task(handle(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    finally:
+        stream_senders.discard(send)
+        full_text_scopes.discard(scope)
+        if cancel_on_close:
+            for task in tasks:
+                task.cancel()
+        elif tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+async def start_unix_server(path: str):
+    """Unix 도메인 소켓 서버 시작 (같은 호스트의 게이트웨이가 TCP 없이 접속)"""
+    if not hasattr(asyncio, "start_unix_server"):
+        print("⚠️ 이 플랫폼은 Unix 도메인 소켓을 지원하지 않습니다")
+        return None
+    if os.path.exists(path):
+        os.unlink(path)  # 이전 실행에서 남은 소켓 파일
+    
+    async def on_connect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def write_line(data: bytes):
+            writer.write(data)
+            await writer.drain()
+        try:
+            await serve_jsonrpc_lines(reader.readline, write_line)
+        except (ConnectionError, ValueError) as e:
+            print(f"Unix 소켓 연결 오류: {e}")
+        finally:
+            writer.close()
+    
+    server = await asyncio.start_unix_server(on_connect, path=path, limit=MCP_STREAM_LIMIT)
+    print(f"Unix socket endpoint: {path}")
+    return server
+
+async def run_stdio():
+    """stdio 전송으로 실행 (표준 입력으로 요청을 받고 표준 출력으로 응답)"""
+    # 표준 출력은 프로토콜 전용으로 쓰고 로그(print)는 표준 오류로 보냄
+    protocol_in = sys.stdin.buffer
+    protocol_out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    
+    async def write_line(data: bytes):
+        def write():
+            protocol_out.write(data)
+            protocol_out.flush()
+        await asyncio.to_thread(write)
+    
+    # Windows에서도 동작하도록 블로킹 읽기/쓰기는 스레드에서 실행
+    async with upstream_clients():
+        # stdin 종료는 정상 종료 신호이므로 이미 받은 요청은 끝까지 처리
+        await serve_jsonrpc_lines(lambda: asyncio.to_thread(protocol_in.readline), write_line, cancel_on_close=False)
 
 if __name__ == "__main__":
+    if "--stdio" in sys.argv:
+        asyncio.run(run_stdio())
+        sys.exit(0)
+    
     import uvicorn
     print("MCP Server (JSON-RPC 2.0) 시작...")
     print("JSON-RPC endpoint: http://localhost:9001/")
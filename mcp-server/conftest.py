@@ -0,0 +1,27 @@
+"""
+MCP 서버 테스트 공용 fixture
+
+    python -m pytest
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+async def wait_until(condition, rounds: int = 100):
+    """다른 태스크가 진행되도록 이벤트 루프를 돌리면서 condition이 참이 될 때까지 대기"""
+    for _ in range(rounds):
+        if condition():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("조건이 충족되지 않았습니다")
+
+
+@pytest.fixture
+def settle():
+    return wait_until
@@ -0,0 +1,800 @@
+#!/usr/bin/env python3
+"""
+MCP 서버 동시성 로직 오프라인 테스트 (업스트림 호출은 흉내, 네트워크 불필요)
+
+    python -m pytest test_app.py
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+import app
+
+
+def tool_result(text: str, structured=None):
+    result = {"content": [{"type": "text", "text": text}]}
+    if structured is not None:
+        result["structuredContent"] = structured
+    return result
+
+
+def test_cache_evicts_least_recently_used_by_size():
+    structured = {"data": "x" * 20}
+    structured_size = len(app.json_dumps(structured))
+    entry_size = 10 + structured_size
+    cache = app.ToolResultCache(max_bytes=entry_size * 2)
+
+    # text와 structuredContent 크기를 모두 계산
+    cache.put("a", tool_result("a" * 10, structured), ttl=60)
+    assert cache.total_bytes == entry_size
+    cache.put("b", tool_result("b" * 10, structured), ttl=60)
+    assert cache.get("a") is not None  # a를 최근 사용으로
+
+    # 한도를 넘으면 가장 오래 안 쓴 b부터 제거
+    cache.put("c", tool_result("c" * 10, structured), ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.total_bytes == entry_size * 2
+    assert cache.stats["evictions"] == 1
+
+    # 혼자서 한도를 넘는 결과는 저장하지 않음
+    cache.put("huge", tool_result("h", {"data": "x" * entry_size * 2}), ttl=60)
+    assert cache.get("huge") is None and len(cache.entries) == 2
+
+    # 만료된 항목은 조회 시 제거
+    cache.put("a", tool_result("a" * 10, structured), ttl=-1)
+    assert cache.get("a") is None
+    assert cache.total_bytes == entry_size
+
+
+def test_single_flight_follower_survives_cancelled_leader():
+    async def run():
+        flight = app.SingleFlight()
+        started = []
+        release = asyncio.Event()
+
+        async def factory():
+            started.append(1)
+            await release.wait()
+            return {"ok": True}
+
+        leader = asyncio.ensure_future(flight.run("key", factory))
+        follower = asyncio.ensure_future(flight.run("key", factory))
+        await asyncio.sleep(0)
+        assert flight.snapshot()["in_flight"] == 1
+
+        # 먼저 호출한 쪽이 취소되어도 함께 기다리던 호출은 결과를 받음
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await follower == {"ok": True}
+        assert leader.cancelled()
+        assert started == [1]
+        assert flight.stats == {"leaders": 1, "coalesced": 1, "cancelled": 0}
+        await asyncio.sleep(0)
+        assert flight.snapshot()["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_single_flight_cancels_work_when_all_callers_leave():
+    async def run():
+        flight = app.SingleFlight()
+        cancelled = []
+
+        async def factory():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+
+        callers = [asyncio.ensure_future(flight.run("key", factory)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert cancelled == [1]
+        assert flight.stats["cancelled"] == 1
+        assert flight.snapshot()["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_admission_rejects_with_retry_after(settle):
+    async def run():
+        admission = app.ToolAdmission("read_pdf", concurrency=1, queue_size=1, max_wait=0.05)
+        admission.avg_service = 3.0  # 최근 실행 시간 3초로 가정
+        release = asyncio.Event()
+
+        async def hold():
+            async with admission.slot():
+                await release.wait()
+
+        async def wait_for_slot():
+            async with admission.slot():
+                pass
+
+        holder = asyncio.ensure_future(hold())
+        await settle(lambda: admission.active == 1)
+        waiter = asyncio.ensure_future(wait_for_slot())
+        await settle(lambda: admission.waiting == 1)
+
+        # 실행 중 1 + 대기 1로 가득 차면 기다리지 않고 바로 거절
+        try:
+            await wait_for_slot()
+            raise AssertionError("queue_full이어야 합니다")
+        except app.ServerBusyError as e:
+            assert e.reason == "queue_full"
+            assert e.retry_after == 6.0  # 3초 * (대기 1 / 동시 1 + 1)
+
+        # 대기 중이던 호출은 max_wait가 지나면 거절
+        try:
+            await waiter
+            raise AssertionError("queue_timeout이어야 합니다")
+        except app.ServerBusyError as e:
+            assert e.reason == "queue_timeout"
+            assert e.retry_after >= 1.0
+
+        release.set()
+        await holder
+        assert admission.stats == {"admitted": 1, "rejected": 1, "timed_out": 1}
+        assert (admission.active, admission.waiting) == (0, 0)
+
+        # 자리가 나면 다시 입장 가능
+        await wait_for_slot()
+        assert admission.stats["admitted"] == 2
+
+    asyncio.run(run())
+
+
+def test_breaker_opens_probes_and_closes(monkeypatch, settle):
+    async def respond(status_code: int):
+        return status_code, "application/json", "{}"
+
+    async def run():
+        breaker = app.CircuitBreaker("http://replica-a")
+        await breaker.call(lambda: respond(200))
+        await breaker.call(lambda: respond(503))
+        assert breaker.state == "closed"  # 최소 호출 수 전에는 열지 않음
+
+        # 실패 비율이 한도를 넘으면 open, 그동안 호출은 보내지 않고 retryAfter와 함께 거절
+        await breaker.call(lambda: respond(503))
+        assert breaker.state == "open" and not breaker.available()
+        try:
+            await breaker.call(lambda: respond(200))
+            raise AssertionError("open 상태에서는 거절해야 합니다")
+        except app.CircuitOpenError as e:
+            assert e.retry_after >= 1.0
+
+        # 차단 시간이 지나면 시험 호출 하나만 허용 (half-open)
+        await asyncio.sleep(0.06)
+        assert breaker.available()
+        release = asyncio.Event()
+
+        async def slow_probe():
+            await release.wait()
+            return await respond(200)
+
+        probe = asyncio.ensure_future(breaker.call(slow_probe))
+        await settle(lambda: breaker.state == "half_open")
+        try:
+            await breaker.call(lambda: respond(200))
+            raise AssertionError("시험 호출 중에는 다른 호출을 거절해야 합니다")
+        except app.CircuitOpenError:
+            pass
+
+        # 시험 호출이 성공하면 closed로 복귀
+        release.set()
+        await probe
+        assert breaker.state == "closed" and breaker.available()
+        assert breaker.stats == {"calls": 4, "failures": 2, "rejected": 2, "opened": 1}
+
+        # 다시 open된 뒤 시험 호출이 실패하면 곧바로 다시 open
+        for _ in range(3):
+            await breaker.call(lambda: respond(503))
+        assert breaker.state == "open"
+        await asyncio.sleep(0.06)
+        await breaker.call(lambda: respond(502))
+        assert breaker.state == "open" and breaker.stats["opened"] == 3
+
+    monkeypatch.setattr(app, "BREAKER_WINDOW", 4)
+    monkeypatch.setattr(app, "BREAKER_MIN_CALLS", 3)
+    monkeypatch.setattr(app, "BREAKER_FAILURE_RATE", 0.5)
+    monkeypatch.setattr(app, "BREAKER_OPEN_SECONDS", 0.05)
+    asyncio.run(run())
+
+
+def test_hedge_wins_and_cancels_slow_request(monkeypatch):
+    calls = []
+    cancelled = []
+
+    def fake_post(replica):
+        async def post(path, arguments):
+            calls.append(replica.url)
+            if len(calls) == 1:
+                # 첫 요청은 멈춘 것처럼 오래 걸림
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(replica.url)
+                    raise
+            return 200, "application/json", f'{{"from": "{replica.url}"}}'
+        return post
+
+    replicas = [app.UpstreamReplica("interface", url) for url in ("http://replica-a", "http://replica-b")]
+    for replica in replicas:
+        replica.post = fake_post(replica)
+
+    async def run():
+        result = await app.call_upstream("read_pdf", "interface", "/api/pdf", {"filename": "백엔드_가이드.pdf"})
+        await asyncio.sleep(0)
+        return result
+
+    monkeypatch.setattr(app, "upstream_replicas", {"interface": replicas})
+    monkeypatch.setattr(app, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(app, "tool_latencies", {"read_pdf": app.deque([0.01] * app.HEDGE_MIN_SAMPLES, maxlen=200)})
+    monkeypatch.setattr(app, "hedge_stats", {"hedged": 0, "hedge_wins": 0})
+    status_code, _, body = asyncio.run(run())
+
+    # 헤지 요청은 다른 복제본으로 가고, 먼저 온 응답을 쓰고 느린 요청은 취소
+    assert status_code == 200
+    assert len(calls) == 2 and calls[0] != calls[1]
+    assert body == f'{{"from": "{calls[1]}"}}'
+    assert cancelled == [calls[0]]
+    assert app.hedge_stats == {"hedged": 1, "hedge_wins": 1}
+
+
+def test_breaker_releases_probe_on_unexpected_error(monkeypatch):
+    async def broken():
+        raise ValueError("응답 해석 실패")
+
+    async def ok():
+        return 200, "application/json", "{}"
+
+    async def run():
+        breaker = app.CircuitBreaker("http://replica-a")
+        breaker.state, breaker.opened_at = "open", 0.0
+
+        # 시험 호출이 예상 밖의 예외로 끝나도 실패로 기록하고 자리를 돌려줌
+        try:
+            await breaker.call(broken)
+            raise AssertionError("예외가 전달되어야 합니다")
+        except ValueError:
+            pass
+        assert breaker.state == "open" and breaker.probes == 0
+        assert breaker.stats["failures"] == 1
+
+        breaker.opened_at = 0.0
+        await breaker.call(ok)
+        assert breaker.state == "closed"
+
+    monkeypatch.setattr(app, "BREAKER_OPEN_SECONDS", 0.05)
+    asyncio.run(run())
+
+
+def test_hedge_delay_uses_nearest_rank_p95(monkeypatch):
+    monkeypatch.setattr(app, "HEDGE_MIN_SAMPLES", 10)
+    monkeypatch.setattr(app, "HEDGE_MIN_DELAY_SECONDS", 0.0)
+    monkeypatch.setattr(app, "tool_latencies", {"read_pdf": app.deque(maxlen=200)})
+    for samples in (range(1, 11), range(1, 21), range(1, 101)):
+        app.tool_latencies["read_pdf"] = app.deque([float(sample) for sample in samples], maxlen=200)
+        # 10개 -> 10번째, 20개 -> 19번째, 100개 -> 95번째 값
+        assert app.hedge_delay("read_pdf") == {10: 10.0, 20: 19.0, 100: 95.0}[len(samples)]
+    app.tool_latencies["read_pdf"] = app.deque([1.0] * 9, maxlen=200)
+    assert app.hedge_delay("read_pdf") is None
+
+
+def test_no_hedge_without_second_healthy_replica(monkeypatch):
+    calls = []
+
+    def fake_post(replica):
+        async def post(path, arguments):
+            calls.append(replica.url)
+            await asyncio.sleep(0.1)  # 헤지 지연(0.05초)보다 늦게 응답
+            return 200, "application/json", "{}"
+        return post
+
+    replicas = [app.UpstreamReplica("interface", url) for url in ("http://replica-a", "http://replica-b")]
+    for replica in replicas:
+        replica.post = fake_post(replica)
+    replicas[1].healthy = False
+
+    monkeypatch.setattr(app, "upstream_replicas", {"interface": replicas})
+    monkeypatch.setattr(app, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(app, "tool_latencies", {"system_health": app.deque([0.01] * app.HEDGE_MIN_SAMPLES, maxlen=200)})
+    monkeypatch.setattr(app, "hedge_stats", {"hedged": 0, "hedge_wins": 0})
+    status_code, _, _ = asyncio.run(app.call_upstream("system_health", "interface", "/api/health", {}))
+
+    # 정상 복제본이 하나뿐이면 같은 복제본에 중복 요청을 보내지 않음
+    assert status_code == 200
+    assert calls == ["http://replica-a"]
+    assert app.hedge_stats == {"hedged": 0, "hedge_wins": 0}
+
+
+def test_probe_counts_unexpected_health_body_as_failure():
+    bodies = [b'["not", "an", "object"]', b'{"status": "healthy", "capabilities": {"code_search": true}}']
+
+    def handler(request):
+        return app.httpx.Response(200, content=bodies.pop(0), headers={"content-type": "application/json"})
+
+    async def run():
+        replica = app.UpstreamReplica("interface", "http://replica-a")
+        replica.client = app.httpx.AsyncClient(base_url=replica.url, transport=app.httpx.MockTransport(handler))
+        try:
+            # 객체가 아닌 JSON 본문은 예외로 끝나지 않고 실패 한 번으로 집계
+            await replica.probe()
+            assert replica.probe_failures == 1 and replica.capabilities == {}
+            await replica.probe()
+            assert replica.probe_failures == 0 and replica.healthy
+            assert replica.capabilities == {"code_search": True}
+        finally:
+            await replica.client.aclose()
+
+    asyncio.run(run())
+
+
+def test_text_is_summary_unless_client_opts_in(monkeypatch):
+    structured = {"content": "가" * 500}
+    body = app.json_dumps(structured).decode("utf-8")
+
+    async def fake_tools_call(params):
+        return tool_result(body, structured)
+
+    def call(scope: str, request_id: int):
+        async def run():
+            app.request_scope.set(scope)
+            return await app.process_jsonrpc({
+                "jsonrpc": "2.0",
+                "method": "tools/call",
+                "params": {"name": "read_pdf", "arguments": {"filename": "백엔드_가이드.pdf"}},
+                "id": request_id,
+            })
+        return asyncio.run(run())["result"]
+
+    def initialize(scope: str, capabilities):
+        async def run():
+            app.request_scope.set(scope)
+            return await app.process_jsonrpc({"jsonrpc": "2.0", "method": "initialize", "params": {"capabilities": capabilities}, "id": 0})
+        return asyncio.run(run())
+
+    monkeypatch.setattr(app, "handle_tools_call", fake_tools_call)
+    monkeypatch.setattr(app, "TOOL_TEXT_SUMMARY_CHARS", 20)
+    monkeypatch.setattr(app, "full_text_scopes", set())
+
+    # 기본: 전체 결과는 structuredContent로만, text는 앞부분 요약
+    result = call("conn-a", 1)
+    assert result["structuredContent"] == structured
+    assert result["content"][0]["text"].startswith(body[:20]) and len(result["content"][0]["text"]) < len(body)
+    assert f"전체 {len(body)}자" in result["content"][0]["text"]
+
+    # initialize에서 fullTextContent를 보낸 범위만 text에 전체 본문
+    assert initialize("conn-a", {"experimental": {"fullTextContent": {}}})["result"]["capabilities"]["experimental"] == {"fullTextContent": {}}
+    assert call("conn-a", 2)["content"][0]["text"] == body
+    assert call("conn-b", 3)["content"][0]["text"] != body
+
+    # 다시 initialize하면서 빼면 요약으로 돌아감
+    initialize("conn-a", {})
+    assert call("conn-a", 4)["content"][0]["text"] != body
+
+
+def test_http_session_keeps_full_text_opt_in(monkeypatch):
+    monkeypatch.setattr(app, "full_text_scopes", {"request:init"})
+    monkeypatch.setattr(app, "http_sessions", {})
+
+    # initialize 요청 범위의 설정은 발급한 세션 범위로 옮기고, 세션을 닫으면 정리
+    session_id = app.open_http_session("request:init")
+    assert app.full_text_scopes == {f"session:{session_id}"}
+    app.close_http_session_scope(session_id)
+    assert app.full_text_scopes == set() and app.http_sessions == {}
+
+
+def test_github_placeholders_are_filled_for_search_code(monkeypatch):
+    sent = []
+
+    async def fake_upstream(tool_name, upstream, path, arguments):
+        sent.append((path, arguments))
+        return 200, "application/json", '{"ok": true, "data": {"matches": []}}'
+
+    monkeypatch.setattr(app, "call_upstream", fake_upstream)
+    monkeypatch.setenv("GITHUB_TOKEN", "ghp_server")
+    placeholders = {"username": "<GITHUB_USERNAME>", "password": "<GITHUB_PAT>"}
+    asyncio.run(app.handle_tools_call({"name": "search_code", "arguments": {"query": "db_host", **placeholders}}))
+
+    # github_repository_info와 같이 서버에서 실제 인증 정보로 치환해 업스트림에 전달
+    assert sent == [("/api/search", {"query": "db_host", "username": "hli.yohan.lee", "password": "ghp_server"})]
+
+
+def test_dispatch_get_redirects_caches_and_revalidates(monkeypatch):
+    calls = []
+
+    async def fake_tools_call(params):
+        calls.append(params)
+        structured = {"ok": True, "data": {"tool": params["name"], **params["arguments"]}}
+        return tool_result(app.json_dumps(structured).decode("utf-8"), structured)
+
+    monkeypatch.setattr(app, "handle_tools_call", fake_tools_call)
+    client = TestClient(app.app)
+
+    # 정규형(키 이름순)이 아니면 308로 정규 URL에 리다이렉트하고 도구는 호출하지 않음
+    redirect = client.get("/mcp/dispatch?tool=read_pdf&filename=백엔드_가이드.pdf", follow_redirects=False)
+    assert redirect.status_code == 308
+    assert redirect.headers["location"] == "/mcp/dispatch?filename=%EB%B0%B1%EC%97%94%EB%93%9C_%EA%B0%80%EC%9D%B4%EB%93%9C.pdf&tool=read_pdf"
+    assert calls == []
+
+    # 정규 URL은 도구 결과와 ETag, 도구별 TTL의 Cache-Control
+    response = client.get(redirect.headers["location"])
+    assert response.status_code == 200
+    assert response.json() == {"ok": True, "data": {"tool": "read_pdf", "filename": "백엔드_가이드.pdf"}}
+    assert response.headers["cache-control"] == "public, max-age=600"
+    etag = response.headers["etag"]
+
+    # If-None-Match가 같으면 본문 없이 304 (W/ 접두사와 목록도 허용)
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        revalidated = client.get(redirect.headers["location"], headers={"If-None-Match": if_none_match})
+        assert revalidated.status_code == 304 and revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+    assert client.get(redirect.headers["location"], headers={"If-None-Match": '"other"'}).status_code == 200
+
+    # Cache-Control max-age는 도구마다 다름
+    assert client.get("/mcp/dispatch?table=users&tool=query_database").headers["cache-control"] == "public, max-age=60"
+    assert client.get("/mcp/dispatch?tool=system_health").headers["cache-control"] == "public, max-age=5"
+
+    # 멱등 도구가 아니면 404, 캐시하지 않음
+    rejected = client.get("/mcp/dispatch?query=db&tool=search_code")
+    assert rejected.status_code == 404 and rejected.headers["cache-control"] == "no-store"
+
+
+def sse_messages(events):
+    """SSE 이벤트 문자열 목록 -> JSON-RPC 메시지 목록 (keep-alive 주석 제외)"""
+    return [app.json_loads(event.split("data: ", 1)[1]) for event in events if event.startswith("event: message")]
+
+
+def test_sse_streams_progress_and_partial_content(monkeypatch):
+    chunks = [b'{"ok": true, ', b'"data": {"status": ', b'"healthy"}}']
+
+    async def body():
+        for chunk in chunks:
+            yield chunk
+
+    def handler(request):
+        return app.httpx.Response(200, content=body(), headers={"content-type": "application/json"})
+
+    async def run():
+        replica = app.UpstreamReplica("interface", "http://replica-a")
+        replica.client = app.httpx.AsyncClient(base_url=replica.url, transport=app.httpx.MockTransport(handler))
+        monkeypatch.setattr(app, "upstream_replicas", {"interface": [replica]})
+        try:
+            request = {
+                "jsonrpc": "2.0",
+                "method": "tools/call",
+                "params": {"name": "system_health", "arguments": {}, "_meta": {"progressToken": "p-1"}},
+                "id": 7,
+            }
+            return [event async for event in app.stream_jsonrpc(request)]
+        finally:
+            await replica.client.aclose()
+
+    monkeypatch.setattr(app, "tool_cache", app.ToolResultCache(max_bytes=1024 * 1024))
+    messages = sse_messages(asyncio.run(run()))
+
+    # 진행 알림(단계 번호 증가)과 부분 내용이 먼저 오고, 마지막이 JSON-RPC 응답
+    progress = [message["params"] for message in messages if message.get("method") == "notifications/progress"]
+    partial = [message["params"] for message in messages if message.get("method") == "notifications/partial_content"]
+    assert [item["progress"] for item in progress] == list(range(1, len(chunks) + 2))
+    assert all(item["progressToken"] == "p-1" for item in progress + partial)
+    assert [item["index"] for item in partial] == [0, 1, 2]
+    assert "".join(item["content"][0]["text"] for item in partial) == b"".join(chunks).decode()
+    assert messages[-1]["id"] == 7 and messages[-1]["result"]["structuredContent"]["data"] == {"status": "healthy"}
+
+
+def test_sse_heartbeat_and_disconnect_cancels_work(monkeypatch):
+    cancelled = []
+
+    async def slow_tools_call(params):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(params["name"])
+            raise
+
+    async def run():
+        request = {"jsonrpc": "2.0", "method": "tools/call", "params": {"name": "system_health", "arguments": {}}, "id": 1}
+        stream = app.stream_jsonrpc(request)
+        # progressToken이 없으면 주석 keep-alive만 보냄
+        assert await stream.__anext__() == ": keep-alive\n\n"
+        # 클라이언트가 연결을 끊으면(스트림 종료) 진행 중인 도구 호출도 취소
+        await stream.aclose()
+        await asyncio.sleep(0)
+
+    monkeypatch.setattr(app, "handle_tools_call", slow_tools_call)
+    monkeypatch.setattr(app, "SSE_HEARTBEAT_SECONDS", 0.01)
+    asyncio.run(run())
+    assert cancelled == ["system_health"]
+
+
+class LinePipe:
+    """serve_jsonrpc_lines용 메모리 입출력 (readline은 보낸 줄을 차례로, 닫으면 EOF)"""
+
+    def __init__(self):
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.outgoing: asyncio.Queue = asyncio.Queue()
+
+    def send(self, message):
+        self.incoming.put_nowait(message if isinstance(message, bytes) else app.json_dumps(message) + b"\n")
+
+    def close(self):
+        self.incoming.put_nowait(b"")
+
+    async def readline(self) -> bytes:
+        return await self.incoming.get()
+
+    async def write_line(self, data: bytes):
+        self.outgoing.put_nowait(app.json_loads(data))
+
+    async def receive(self):
+        return await asyncio.wait_for(self.outgoing.get(), timeout=2)
+
+
+def test_line_transport_answers_as_requests_finish(monkeypatch):
+    release = asyncio.Event()
+
+    async def slow_tools_call(params):
+        await release.wait()
+        return tool_result("done")
+
+    async def run():
+        pipe = LinePipe()
+        server = asyncio.ensure_future(app.serve_jsonrpc_lines(pipe.readline, pipe.write_line))
+        pipe.send({"jsonrpc": "2.0", "method": "tools/call", "params": {"name": "system_health", "arguments": {}}, "id": 1})
+        pipe.send({"jsonrpc": "2.0", "method": "ping", "id": 2})
+        # 늦게 끝나는 요청이 뒤 요청을 막지 않음 (응답은 끝난 순서대로, id로 구분)
+        assert await pipe.receive() == {"jsonrpc": "2.0", "result": {}, "id": 2}
+        release.set()
+        assert (await pipe.receive())["id"] == 1
+
+        # 빈 줄과 알림은 응답하지 않고, 파싱 오류/빈 배치/배치는 한 줄로 응답
+        pipe.send(b"\n")
+        pipe.send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        pipe.send(b"{not json\n")
+        assert (await pipe.receive())["error"]["code"] == -32700
+        pipe.send([])
+        assert (await pipe.receive())["error"]["code"] == -32600
+        pipe.send([{"jsonrpc": "2.0", "method": "ping", "id": "a"}, {"jsonrpc": "2.0", "method": "ping", "id": "b"}])
+        assert [response["id"] for response in await pipe.receive()] == ["a", "b"]
+
+        pipe.close()
+        await asyncio.wait_for(server, timeout=2)
+        assert pipe.outgoing.empty()
+
+    monkeypatch.setattr(app, "handle_tools_call", slow_tools_call)
+    asyncio.run(run())
+
+
+def test_line_transport_close_cancels_or_drains(monkeypatch, settle):
+    cancelled = []
+    started = []
+
+    async def slow_tools_call(params):
+        started.append(params["name"])
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            cancelled.append(params["name"])
+            raise
+        return tool_result("done")
+
+    async def serve(cancel_on_close: bool):
+        pipe = LinePipe()
+        server = asyncio.ensure_future(app.serve_jsonrpc_lines(pipe.readline, pipe.write_line, cancel_on_close=cancel_on_close))
+        pipe.send({"jsonrpc": "2.0", "method": "tools/call", "params": {"name": "system_health", "arguments": {}}, "id": 1})
+        await settle(lambda: started)
+        started.clear()
+        pipe.close()
+        await server
+        await asyncio.sleep(0)
+        return pipe
+
+    monkeypatch.setattr(app, "handle_tools_call", slow_tools_call)
+
+    # Unix 소켓: 연결이 끊기면 진행 중인 요청을 취소
+    pipe = asyncio.run(serve(cancel_on_close=True))
+    assert cancelled == ["system_health"] and pipe.outgoing.empty()
+
+    # stdio: 입력이 끝나도 이미 받은 요청은 끝까지 처리하고 응답
+    pipe = asyncio.run(serve(cancel_on_close=False))
+    assert cancelled == ["system_health"]
+    assert pipe.outgoing.get_nowait()["result"]["content"][0]["text"] == "done"
+
+
+def test_unix_socket_transport(tmp_path):
+    async def run():
+        path = str(tmp_path / "mcp.sock")
+        server = await app.start_unix_server(path)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b'{"jsonrpc": "2.0", "method": "ping", "id": 1}\n')
+            await writer.drain()
+            response = app.json_loads(await asyncio.wait_for(reader.readline(), timeout=2))
+            writer.close()
+            await writer.wait_closed()
+            return response
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    assert asyncio.run(run()) == {"jsonrpc": "2.0", "result": {}, "id": 1}
+
+
+def test_stdio_transport_over_pipes():
+    # 업스트림은 닫힌 포트 (헬스체크만 실패하고 ping/initialize는 응답)
+    env = {**os.environ, "INTERFACE_BACKEND_URL": "http://127.0.0.1:9", "UPSTREAM_HEALTH_CHECK_SECONDS": "60"}
+    requests = [
+        {"jsonrpc": "2.0", "method": "initialize", "params": {"capabilities": {}}, "id": 1},
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        {"jsonrpc": "2.0", "method": "ping", "id": 2},
+    ]
+    stdin = b"".join(app.json_dumps(request) + b"\n" for request in requests)
+    result = subprocess.run(
+        [sys.executable, str(Path(app.__file__)), "--stdio"],
+        input=stdin, capture_output=True, timeout=30, env=env
+    )
+
+    # 표준 출력에는 JSON-RPC 응답만 (로그는 표준 오류), 입력이 끝나면 정상 종료
+    assert result.returncode == 0, result.stderr.decode(errors="replace")
+    responses = sorted((app.json_loads(line) for line in result.stdout.splitlines()), key=lambda response: response["id"])
+    assert [response["id"] for response in responses] == [1, 2]
+    assert responses[0]["result"]["serverInfo"]["name"] == "mcp-server"
+    assert responses[1]["result"] == {}
+
+
+def test_http_cancel_only_applies_within_session(monkeypatch):
+    cancelled = []
+
+    async def slow_tools_call(params):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(params["name"])
+            raise
+        return tool_result("done")
+
+    def wait_until(condition):
+        for _ in range(200):
+            if condition():
+                return
+            time.sleep(0.01)
+        raise AssertionError("조건이 충족되지 않았습니다")
+
+    def cancel(client, session_id=None):
+        headers = {"Mcp-Session-Id": session_id} if session_id else {}
+        notification = {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 1, "reason": "test"}}
+        return client.post("/", json=notification, headers=headers)
+
+    monkeypatch.setattr(app, "handle_tools_call", slow_tools_call)
+    monkeypatch.setattr(app, "http_sessions", {})
+    with TestClient(app.app) as client:
+        initialize = {"jsonrpc": "2.0", "method": "initialize", "params": {"capabilities": {}}, "id": 0}
+        session_a = client.post("/", json=initialize).headers["mcp-session-id"]
+        session_b = client.post("/", json=initialize).headers["mcp-session-id"]
+        assert session_a != session_b
+
+        responses = []
+        call = {"jsonrpc": "2.0", "method": "tools/call", "params": {"name": "system_health", "arguments": {}}, "id": 1}
+        caller = threading.Thread(target=lambda: responses.append(client.post("/", json=call, headers={"Mcp-Session-Id": session_a})))
+        caller.start()
+        wait_until(lambda: (f"session:{session_a}", 1) in app.inflight_requests)
+
+        # 다른 세션이나 세션 없는 요청의 같은 id 취소는 무시
+        assert cancel(client, session_b).status_code == 202
+        assert cancel(client).status_code == 202
+        time.sleep(0.05)
+        assert cancelled == [] and (f"session:{session_a}", 1) in app.inflight_requests
+
+        # 알 수 없는 세션 id는 404
+        assert cancel(client, "unknown").status_code == 404
+
+        # 같은 세션의 취소만 적용 (HTTP는 응답이 필요하므로 -32800으로 응답)
+        assert cancel(client, session_a).status_code == 202
+        caller.join(timeout=5)
+        assert cancelled == ["system_health"]
+        assert responses[0].json()["error"]["code"] == -32800
+        assert app.inflight_requests == {} and app.cancelled_requests == set()
+
+        # 세션을 닫으면 그 id로는 더 요청할 수 없음
+        assert client.delete("/", headers={"Mcp-Session-Id": session_a}).status_code == 204
+        assert cancel(client, session_a).status_code == 404
+
+
+def test_batch_runs_concurrently_and_keeps_request_order(monkeypatch):
+    delays = {"read_pdf": 0.05, "query_database": 0.02, "system_health": 0.0}
+    running = []
+    peak = []
+
+    async def fake_tools_call(params):
+        running.append(params["name"])
+        peak.append(len(running))
+        await asyncio.sleep(delays[params["name"]])
+        running.remove(params["name"])
+        return tool_result(params["name"])
+
+    def call(request_id, name: str, **arguments):
+        return {"jsonrpc": "2.0", "method": "tools/call", "params": {"name": name, "arguments": arguments}, "id": request_id}
+
+    monkeypatch.setattr(app, "handle_tools_call", fake_tools_call)
+    batch = [
+        call(1, "read_pdf", filename="백엔드_가이드.pdf"),
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        call("two", "query_database", table="users"),
+        "not a request",
+        call(3, "system_health"),
+        {"jsonrpc": "2.0", "method": "ping", "params": [1], "id": 4},
+    ]
+    responses = asyncio.run(app.process_batch(batch))
+
+    # 먼저 요청한 호출이 가장 늦게 끝나도 응답은 요청 순서, 알림은 빠지고 잘못된 항목은 -32600
+    assert max(peak) == 3
+    assert [response["id"] for response in responses] == [1, "two", None, 3, 4]
+    assert [response["result"]["content"][0]["text"] for response in responses if "result" in response] == ["read_pdf", "query_database", "system_health"]
+    assert [response["error"]["code"] for response in responses if "error" in response] == [-32600, -32600]
+
+
+def test_http_batch_edge_cases():
+    client = TestClient(app.app)
+    notification = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+
+    # 알림만 있는 배치는 본문 없이 202
+    response = client.post("/", json=[notification, notification])
+    assert response.status_code == 202 and response.content == b""
+
+    # 빈 배치는 -32600 하나, 응답이 있는 항목만 배열로
+    assert client.post("/", json=[]).json()["error"]["code"] == -32600
+    response = client.post("/", json=[notification, {"jsonrpc": "2.0", "method": "ping", "id": 9}])
+    assert response.json() == [{"jsonrpc": "2.0", "result": {}, "id": 9}]
+
+
+def test_compiled_validators_reject_invalid_params(monkeypatch):
+    calls = []
+
+    async def fake_tools_call(params):
+        calls.append(params["name"])
+        return tool_result("ok")
+
+    def call(name: str, arguments):
+        request = {"jsonrpc": "2.0", "method": "tools/call", "params": {"name": name, "arguments": arguments}, "id": 1}
+        return asyncio.run(app.process_jsonrpc(request))
+
+    monkeypatch.setattr(app, "handle_tools_call", fake_tools_call)
+    invalid = [
+        ("read_pdf", {}, "arguments.filename is required"),
+        ("read_pdf", {"filename": 3}, "arguments.filename must be of type string"),
+        ("read_pdf", {"filename": "없는_문서.pdf"}, "arguments.filename must be one of"),
+        ("query_database", {"table": "users", "filters": "role=backend"}, "arguments.filters must be of type object"),
+        ("search_code", {"query": "db", "limit": "10"}, "arguments.limit must be of type integer"),
+        ("search_code", {"query": "db", "limit": True}, "arguments.limit must be of type integer"),
+    ]
+    # 업스트림 호출 전에 -32602 Invalid params로 거절하고 어느 인자가 문제인지 알려줌
+    for name, arguments, message in invalid:
+        response = call(name, arguments)
+        assert response["error"]["code"] == -32602, (name, arguments)
+        assert response["error"]["message"].startswith(f"Invalid params: {message}"), response
+    assert calls == []
+
+    # 올바른 인자(스키마에 없는 추가 필터 포함)는 통과
+    assert "result" in call("query_database", {"table": "users", "filters": {"role": "backend"}})
+    assert "result" in call("search_code", {"query": "db", "limit": 10})
+    assert calls == ["query_database", "search_code"]
+
+    # additionalProperties: false면 모르는 인자도 거절
+    validate = app.compile_schema({"type": "object", "properties": {"a": {"type": "integer"}}, "additionalProperties": False})
+    assert validate({"a": 1}) is None
+    assert validate({"a": 1, "b": 2}) == "arguments.b is not allowed"
+    assert validate([1]) == "arguments must be of type object"